@@ -1,5 +1,15 @@
 from django.apps import AppConfig
+from django.core.signals import request_started
+from django.db.backends.signals import connection_created
 
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from core import tasks
+        from core.db import configure_sqlite
+        connection_created.connect(configure_sqlite)
+        request_started.connect(
+            tasks.start_thread, dispatch_uid='core.tasks.start_thread'
+        )
@@ -0,0 +1,152 @@
+"""ASGI-приложение поверх WSGI-обработчика Django.
+
+В Django 2.2 нет ни ASGI, ни асинхронных представлений, а соединение с
+БД принадлежит потоку. Поэтому приложение читает запрос и отдаёт ответ
+в цикле событий, а представление вместе с ORM выполняет целиком в пуле
+из ASGI_THREADS потоков. Медленный клиент занимает только сопрограмму:
+поток пула берётся, когда запрос уже прочитан, и освобождается до
+отправки ответа, а число соединений с БД не превышает размер пула.
+"""
+import asyncio
+import io
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+
+
+def build_environ(scope, body):
+    """Окружение WSGI для HTTP-запроса ASGI."""
+    server_name, server_port = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        # WSGI передаёт путь байтами, упакованными в latin-1
+        'PATH_INFO': scope['path'].encode().decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server_name,
+        'SERVER_PORT': str(server_port),
+        'SERVER_PROTOCOL': f'HTTP/{scope.get("http_version", "1.1")}',
+        'REMOTE_ADDR': (scope.get('client') or ('', 0))[0],
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            name = f'HTTP_{name}'
+        if name in environ:
+            value = f'{environ[name]},{value}'
+        environ[name] = value
+    return environ
+
+
+class AsgiHandler:
+    """ASGI 3.0-приложение, которое выполняет запросы Django в пуле."""
+
+    def __init__(self, wsgi_handler=None, threads=None):
+        self.wsgi_handler = wsgi_handler or WSGIHandler()
+        self.executor = ThreadPoolExecutor(
+            max_workers=threads or settings.ASGI_THREADS,
+            thread_name_prefix='asgi'
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            raise ValueError(f'тип соединения {scope["type"]!r} не поддержан')
+        body = await self.read_body(receive)
+        if body is None:
+            return
+        loop = asyncio.get_running_loop()
+        response = await loop.run_in_executor(
+            self.executor, self.run, build_environ(scope, body), loop, send
+        )
+        if response is not None:
+            status, headers, content = response
+            await send({
+                'type': 'http.response.start',
+                'status': status,
+                'headers': headers,
+            })
+            await send({'type': 'http.response.body', 'body': content})
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=True)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def read_body(self, receive):
+        """Тело запроса или None, если клиент отключился раньше."""
+        chunks = []
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return None
+            chunks.append(message.get('body', b''))
+            if not message.get('more_body'):
+                return b''.join(chunks)
+
+    def run(self, environ, loop, send):
+        """Выполняет запрос в потоке пула.
+
+        Обычный ответ возвращается целиком и отправляется уже в цикле
+        событий. Потоковый ответ (выгрузка) читает БД по мере отправки,
+        поэтому его части отправляются из того же потока, что открыл
+        соединение с БД.
+        """
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            started['status'] = int(status.split(' ', 1)[0])
+            started['headers'] = [
+                (name.lower().encode('latin-1'), value.encode('latin-1'))
+                for name, value in headers
+            ]
+
+        response = self.wsgi_handler(environ, start_response)
+        try:
+            if not getattr(response, 'streaming', False):
+                return (
+                    started['status'], started['headers'],
+                    b''.join(response)
+                )
+            self.send(loop, send, {
+                'type': 'http.response.start',
+                'status': started['status'],
+                'headers': started['headers'],
+            })
+            for chunk in response:
+                if chunk:
+                    self.send(loop, send, {
+                        'type': 'http.response.body',
+                        'body': chunk,
+                        'more_body': True,
+                    })
+            self.send(loop, send, {'type': 'http.response.body'})
+        finally:
+            # сигнал request_finished закрывает соединения с БД этого потока
+            response.close()
+
+    def send(self, loop, send, message):
+        asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+
+def get_asgi_application():
+    django.setup(set_prefix=False)
+    return AsgiHandler()
@@ -0,0 +1,606 @@
+"""Общие инструменты нагрузочных замеров: данные, маршруты, метрики."""
+import asyncio
+import json
+import math
+import random
+import re
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from http import HTTPStatus
+from http.client import HTTPConnection
+from http.cookies import SimpleCookie
+from urllib.parse import unquote, urlencode
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.tokens import default_token_generator
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from django.utils import timezone
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+from mixer.backend.django import mixer
+
+from posts import counters, search, timelines
+from posts import groups as group_directory
+from posts.importers import bulk_create_dated
+from posts.models import Group, Post
+
+User = get_user_model()
+
+# пространства имён, маршруты которых проходит замер
+NAMESPACES = ('posts', 'users', 'about')
+# страницы входа и сброса пароля смотрит только гость
+GUEST_ONLY = (
+    'users:signup', 'users:login', 'users:logged_out',
+    'users:password_reset', 'users:password_reset_done',
+    'users:password_reset_complete', 'users:password_reset_confirm',
+)
+# страницы только для авторизованного пользователя
+USER_ONLY = (
+    'posts:post_create', 'posts:post_edit', 'posts:export',
+    'users:password_change', 'users:password_change_done',
+)
+PERCENTILES = (50, 95, 99)
+BATCH = 1000
+# очередь соединений, ещё не принятых сервером
+BACKLOG = 128
+# скрытые поля формы поста, которые отправляются обратно
+HIDDEN_INPUT = re.compile(
+    r'<input type="hidden" name="(csrfmiddlewaretoken|idempotency_key)" '
+    r'value="([^"]*)"'
+)
+
+
+def _choices(values):
+    while True:
+        yield random.choice(values)
+
+
+def _dates(until, minutes):
+    while True:
+        yield until - timedelta(minutes=random.randrange(minutes))
+
+
+def seed(users=50, groups=10, posts=5000, seed=0):
+    """Заполняет базу пользователями, группами и постами через mixer.
+
+    Объекты собираются без сохранения и пишутся bulk_create, а счётчики
+    и поисковый индекс пересчитываются один раз в конце.
+    """
+    random.seed(seed)
+    mixer.faker.seed_instance(seed)
+    now = timezone.now()
+    with transaction.atomic(), mixer.ctx(commit=False):
+        User.objects.bulk_create(mixer.cycle(users).blend(
+            User, username=mixer.sequence('user{0}')
+        ))
+        Group.objects.bulk_create(mixer.cycle(groups).blend(
+            Group, slug=mixer.sequence('group{0}')
+        ))
+        author_ids = list(User.objects.values_list('pk', flat=True))
+        group_ids = list(Group.objects.values_list('pk', flat=True)) + [None]
+        for start in range(0, posts, BATCH):
+            bulk_create_dated(mixer.cycle(min(BATCH, posts - start)).blend(
+                Post,
+                author_id=_choices(author_ids),
+                group_id=_choices(group_ids),
+                pub_date=_dates(now, 10 ** 6),
+            ))
+        counters.rebuild()
+        search.rebuild()
+    timelines.invalidate_all()
+    # группы созданы в обход сигналов, справочник нужно перечитать
+    group_directory.invalidate()
+
+
+class Route:
+    """Адрес для замера и клиент, от имени которого он запрашивается."""
+
+    def __init__(self, name, url, user=None):
+        self.name = name
+        self.url = url
+        self.user = user
+
+    @property
+    def label(self):
+        return f'{self.name} ({"user" if self.user else "guest"})'
+
+
+def _url_names(resolver, namespace=None):
+    for pattern in resolver.url_patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _url_names(pattern, pattern.namespace or namespace)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            yield namespace, pattern.name
+
+
+def get_routes(user):
+    """Все маршруты NAMESPACES с аргументами из данных в базе.
+
+    user должен быть сотрудником и автором хотя бы одного поста.
+    """
+    post = user.posts.first()
+    group = Group.objects.first()
+    kwargs = {
+        'posts:group_list': {'slug': group.slug},
+        'posts:profile': {'username': user.username},
+        'posts:post_detail': {'post_id': post.pk},
+        'posts:post_edit': {'post_id': post.pk},
+        'posts:export': {'kind': 'posts', 'export_format': 'jsonl'},
+        'posts:api_group': {'slug': group.slug},
+        'posts:api_profile': {'username': user.username},
+        'posts:api_post_detail': {'post_id': post.pk},
+        'users:password_reset_confirm': {
+            'uidb64': urlsafe_base64_encode(force_bytes(user.pk)),
+            'token': default_token_generator.make_token(user),
+        },
+    }
+    routes = []
+    for namespace, name in _url_names(get_resolver()):
+        if namespace not in NAMESPACES:
+            continue
+        name = f'{namespace}:{name}'
+        url = reverse(name, kwargs=kwargs.get(name))
+        if name not in USER_ONLY:
+            routes.append(Route(name, url))
+        if name not in GUEST_ONLY:
+            routes.append(Route(name, url, user))
+    return routes
+
+
+def percentile(samples, percent):
+    """Перцентиль по ближайшему рангу."""
+    ordered = sorted(samples)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarize(timings):
+    """Перцентили задержки в миллисекундах."""
+    return {
+        f'p{percent}': round(percentile(timings, percent) * 1000, 3)
+        for percent in PERCENTILES
+    }
+
+
+def measure_client(route, requests=50, warmup=5):
+    """Замер через тестовый клиент: задержка, запросы к БД и выделения."""
+    client = Client()
+    if route.user:
+        client.force_login(route.user)
+    for _ in range(warmup):
+        client.get(route.url)
+    timings = []
+    queries = 0
+    for _ in range(requests):
+        with CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            response = b''.join(_content(client.get(route.url)))
+            timings.append(time.perf_counter() - started)
+        queries = max(queries, len(context.captured_queries))
+    # tracemalloc замедляет код, поэтому выделения меряются отдельно
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        _content(client.get(route.url))
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    allocated = sum(
+        stat.size_diff for stat in after.compare_to(before, 'filename')
+        if stat.size_diff > 0
+    )
+    result = summarize(timings)
+    result.update(
+        queries=queries,
+        allocated_kb=round(allocated / 1024, 1),
+        bytes=len(response),
+    )
+    return result
+
+
+def _content(response):
+    if response.streaming:
+        return list(response.streaming_content)
+    return [response.content]
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class PooledWSGIServer(WSGIServer):
+    """WSGI-сервер с пулом потоков фиксированного размера.
+
+    Так работают потоковые воркеры gunicorn и mod_wsgi: поток занят
+    соединением с момента приёма, в том числе пока клиент медленно
+    присылает запрос.
+    """
+    request_queue_size = BACKLOG
+
+    def __init__(self, address, handler_class, threads):
+        super().__init__(address, handler_class)
+        self.executor = ThreadPoolExecutor(max_workers=threads)
+
+    def process_request(self, request, client_address):
+        self.executor.submit(self.process_in_pool, request, client_address)
+
+    def process_in_pool(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=False)
+
+
+class LocalServer:
+    """WSGI-сервер проекта в отдельном потоке на свободном порту.
+
+    Без threads запросы обрабатываются по одному, с threads - в пуле
+    из threads потоков.
+    """
+
+    def __init__(self, app=None, threads=None):
+        if threads:
+            self.server = PooledWSGIServer(
+                ('127.0.0.1', 0), _QuietHandler, threads
+            )
+            self.server.set_app(app or WSGIHandler())
+        else:
+            self.server = make_server(
+                '127.0.0.1', 0, app or WSGIHandler(),
+                server_class=WSGIServer, handler_class=_QuietHandler
+            )
+        self.port = self.server.server_port
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, daemon=True
+        )
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class LocalAsgiServer:
+    """ASGI-приложение за простым HTTP/1.1-сервером asyncio.
+
+    Сервер нужен только для замеров: ASGI-серверов (uvicorn, daphne) в
+    зависимостях проекта нет. Цикл событий работает в отдельном потоке.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.loop = asyncio.new_event_loop()
+        self.server = self.loop.run_until_complete(
+            asyncio.start_server(
+                self.handle, '127.0.0.1', 0, backlog=BACKLOG
+            )
+        )
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.thread = threading.Thread(
+            target=self.loop.run_forever, daemon=True
+        )
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.loop.call_soon_threadsafe(self.server.close)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+    async def handle(self, reader, writer):
+        try:
+            while await self.handle_request(reader, writer):
+                pass
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def handle_request(self, reader, writer):
+        """Обрабатывает один запрос; True, если соединение остаётся."""
+        head = await reader.readuntil(b'\r\n\r\n')
+        request_line, *lines = head.decode('latin-1').split('\r\n')
+        method, target, version = request_line.split(' ')
+        headers = [
+            (name.strip().lower().encode('latin-1'),
+             value.strip().encode('latin-1'))
+            for name, value in (line.split(':', 1) for line in lines if line)
+        ]
+        values = dict(headers)
+        length = int(values.get(b'content-length', 0))
+        body = await reader.readexactly(length) if length else b''
+        path, _, query = target.partition('?')
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': version.split('/')[1],
+            'method': method,
+            'scheme': 'http',
+            'path': unquote(path),
+            'raw_path': path.encode('latin-1'),
+            'query_string': query.encode('latin-1'),
+            'root_path': '',
+            'headers': headers,
+            'server': ('127.0.0.1', self.port),
+            'client': writer.get_extra_info('peername')[:2],
+        }
+        state = {
+            'keep_alive': (
+                version == 'HTTP/1.1'
+                and values.get(b'connection') != b'close'
+            ),
+            'received': False,
+        }
+
+        async def receive():
+            if state['received']:
+                return {'type': 'http.disconnect'}
+            state['received'] = True
+            return {'type': 'http.request', 'body': body}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                status = HTTPStatus(message['status'])
+                response_headers = list(message.get('headers', []))
+                if not any(name == b'content-length'
+                           for name, _ in response_headers):
+                    state['keep_alive'] = False
+                if not state['keep_alive']:
+                    response_headers.append((b'connection', b'close'))
+                writer.write(
+                    f'HTTP/1.1 {status.value} {status.phrase}\r\n'.encode()
+                    + b''.join(
+                        name + b': ' + value + b'\r\n'
+                        for name, value in response_headers
+                    )
+                    + b'\r\n'
+                )
+            else:
+                writer.write(message.get('body', b''))
+            await writer.drain()
+
+        await self.app(scope, receive, send)
+        return state['keep_alive']
+
+
+def session_cookie(user):
+    """Заголовок Cookie с сессией пользователя."""
+    client = Client()
+    client.force_login(user)
+    name = settings.SESSION_COOKIE_NAME
+    return f'{name}={client.cookies[name].value}'
+
+
+def measure_server(server, route, requests=50, warmup=5):
+    """Замер через HTTP к локальному серверу."""
+    headers = {}
+    if route.user:
+        headers['Cookie'] = session_cookie(route.user)
+    http = HTTPConnection('127.0.0.1', server.port)
+    timings = []
+    try:
+        for number in range(warmup + requests):
+            started = time.perf_counter()
+            http.request('GET', route.url, headers=headers)
+            http.getresponse().read()
+            if number >= warmup:
+                timings.append(time.perf_counter() - started)
+    finally:
+        http.close()
+    return summarize(timings)
+
+
+async def _fetch(port, url, delay=0):
+    """GET с Connection: close; с delay конец заголовков приходит позже."""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        writer.write(f'GET {url} HTTP/1.1\r\nHost: 127.0.0.1\r\n'.encode())
+        await writer.drain()
+        if delay:
+            await asyncio.sleep(delay)
+        writer.write(b'Connection: close\r\n\r\n')
+        await writer.drain()
+        response = await reader.read()
+    finally:
+        writer.close()
+    return response.split(b'\r\n', 1)[0].split(b' ')[1:2] == [b'200']
+
+
+async def _slow_client(port, url, delay, stop):
+    while not stop.is_set():
+        try:
+            await _fetch(port, url, delay)
+        except OSError:
+            await asyncio.sleep(delay)
+
+
+async def _measure_slow_clients(port, url, slow_clients, requests,
+                                concurrency, delay):
+    stop = asyncio.Event()
+    slow = [
+        asyncio.ensure_future(_slow_client(port, url, delay, stop))
+        for _ in range(slow_clients)
+    ]
+    # медленные клиенты успевают занять соединения до замера
+    await asyncio.sleep(delay / 2)
+    timings = []
+    errors = []
+    numbers = iter(range(requests))
+
+    async def fast_client():
+        for _ in numbers:
+            started = time.perf_counter()
+            try:
+                ok = await _fetch(port, url)
+            except OSError:
+                ok = False
+            if ok:
+                timings.append(time.perf_counter() - started)
+            else:
+                errors.append(url)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(fast_client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await asyncio.gather(*slow)
+    result = summarize(timings) if timings else {}
+    result.update(
+        rps=round(len(timings) / elapsed, 1),
+        errors=len(errors),
+    )
+    return result
+
+
+def measure_slow_clients(server, url, slow_clients=100, requests=200,
+                         concurrency=10, delay=1.0):
+    """Задержка быстрых запросов, пока медленные клиенты держат сервер.
+
+    Каждый из slow_clients раз за разом присылает заголовки запроса с
+    паузой delay секунд, а concurrency быстрых клиентов делают всего
+    requests запросов к url. Считаются перцентили задержки быстрых
+    запросов, их число в секунду и число ошибок.
+    """
+    return asyncio.run(_measure_slow_clients(
+        server.port, url, slow_clients, requests, concurrency, delay
+    ))
+
+
+def _open_form(port, url, cookie):
+    """Cookie с токеном CSRF и скрытые поля формы со страницы url."""
+    http = HTTPConnection('127.0.0.1', port)
+    try:
+        http.request('GET', url, headers={'Cookie': cookie})
+        response = http.getresponse()
+        content = response.read().decode()
+    finally:
+        http.close()
+    cookies = SimpleCookie()
+    for header in response.msg.get_all('Set-Cookie') or ():
+        cookies.load(header)
+    cookie = '; '.join(
+        [cookie] + [f'{name}={item.value}' for name, item in cookies.items()]
+    )
+    return cookie, dict(HIDDEN_INPUT.findall(content))
+
+
+def _submit_form(port, url, cookie, fields):
+    """POST формы, возвращает статус ответа."""
+    http = HTTPConnection('127.0.0.1', port)
+    try:
+        http.request('POST', url, body=urlencode(fields), headers={
+            'Cookie': cookie,
+            'Content-Type': 'application/x-www-form-urlencoded',
+        })
+        response = http.getresponse()
+        response.read()
+        return response.status
+    finally:
+        http.close()
+
+
+def measure_writes(server, cookies, posts=20, double_submit=False):
+    """Запись постов одновременными авторами через форму posts:post_create.
+
+    Каждый автор (заголовок Cookie его сессии из cookies) в своём потоке
+    posts раз открывает форму и отправляет её; с double_submit каждая
+    форма отправляется дважды одновременно, как при двойном клике.
+    Считаются перцентили задержки отправки, успешных отправок в секунду
+    и число ошибок.
+    """
+    url = reverse('posts:post_create')
+    timings = []
+    errors = []
+
+    def submit(cookie, fields):
+        started = time.perf_counter()
+        try:
+            status = _submit_form(server.port, url, cookie, fields)
+        except OSError:
+            status = None
+        if status == HTTPStatus.FOUND:
+            timings.append(time.perf_counter() - started)
+        else:
+            errors.append(status)
+
+    def write(number, cookie):
+        copies = 2 if double_submit else 1
+        with ThreadPoolExecutor(max_workers=copies) as pool:
+            for index in range(posts):
+                form_cookie, fields = _open_form(server.port, url, cookie)
+                fields['text'] = f'Пост {number}-{index} для замера записи'
+                list(pool.map(
+                    submit, [form_cookie] * copies, [fields] * copies
+                ))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(cookies)) as pool:
+        list(pool.map(write, range(len(cookies)), cookies))
+    elapsed = time.perf_counter() - started
+    result = summarize(timings) if timings else {}
+    result.update(
+        rps=round(len(timings) / elapsed, 1),
+        errors=len(errors),
+    )
+    return result
+
+
+def load_baseline(path):
+    with open(path, encoding='utf-8') as baseline:
+        return json.load(baseline)
+
+
+def save_baseline(path, results):
+    with open(path, 'w', encoding='utf-8') as baseline:
+        json.dump(results, baseline, ensure_ascii=False, indent=2,
+                  sort_keys=True)
+
+
+def compare(results, baseline, tolerance=0.25):
+    """Регрессии относительно базовой линии.
+
+    Число запросов к БД не должно расти вовсе, задержка p95 и выделения
+    памяти - больше чем на tolerance. Маршруты, которых нет в базовой
+    линии, не сравниваются.
+    """
+    regressions = []
+    for label, metrics in results.items():
+        for transport, current in metrics.items():
+            previous = baseline.get(label, {}).get(transport)
+            if previous is None:
+                continue
+            if current.get('queries', 0) > previous.get('queries', 0):
+                regressions.append(
+                    f'{label} [{transport}]: запросов к БД '
+                    f'{previous["queries"]} -> {current["queries"]}'
+                )
+            for metric in ('p95', 'allocated_kb'):
+                if metric not in previous or not previous[metric]:
+                    continue
+                if current[metric] > previous[metric] * (1 + tolerance):
+                    regressions.append(
+                        f'{label} [{transport}]: {metric} '
+                        f'{previous[metric]} -> {current[metric]}'
+                    )
+    return regressions
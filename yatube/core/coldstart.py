@@ -0,0 +1,49 @@
+"""Один запрос в только что запущенном процессе.
+
+Запуск из каталога проекта: python -m core.coldstart URL [COOKIE].
+Печатает JSON со статусом ответа и временем от старта модуля до
+готовности приложения и до первого байта ответа. Настройки и база
+берутся из окружения, как у yatube.wsgi.
+"""
+import time
+
+STARTED = time.perf_counter()
+
+import json  # noqa: E402
+import sys  # noqa: E402
+from wsgiref.util import setup_testing_defaults  # noqa: E402
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 2)
+
+
+def main(url, cookie=None):
+    from yatube.wsgi import application
+    ready = time.perf_counter()
+    path, _, query = url.partition('?')
+    environ = {'PATH_INFO': path, 'QUERY_STRING': query}
+    if cookie:
+        environ['HTTP_COOKIE'] = cookie
+    setup_testing_defaults(environ)
+    started = {}
+
+    def start_response(status, headers, exc_info=None):
+        started['status'] = int(status.split(' ', 1)[0])
+
+    response = application(environ, start_response)
+    try:
+        next(iter(response), b'')
+        first_byte = time.perf_counter()
+    finally:
+        response.close()
+    return {
+        'status': started['status'],
+        'ready_ms': _ms(ready - STARTED),
+        'first_byte_ms': _ms(first_byte - STARTED),
+        'request_ms': _ms(first_byte - ready),
+    }
+
+
+if __name__ == '__main__':
+    print(json.dumps(main(*sys.argv[1:])))
@@ -0,0 +1,134 @@
+"""Сжатие ответов gzip, brotli или zstd по заголовку Accept-Encoding."""
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # brotli - необязательная зависимость
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # zstandard - необязательная зависимость
+    zstandard = None
+
+# ответы с этими статусами не имеют тела
+BODYLESS_STATUSES = (204, 304)
+
+
+def supported_encodings():
+    """Доступные кодировки в порядке предпочтения."""
+    encodings = []
+    if brotli is not None:
+        encodings.append('br')
+    if zstandard is not None:
+        encodings.append('zstd')
+    encodings.append('gzip')
+    return tuple(encodings)
+
+
+def accepted_encodings(header):
+    """Кодировки из Accept-Encoding с их весами q."""
+    accepted = {}
+    for item in header.split(','):
+        name, *params = item.strip().split(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        weight = 1.0
+        for param in params:
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        accepted[name] = weight
+    return accepted
+
+
+def choose_encoding(header):
+    """Лучшая доступная кодировка, которую принимает клиент, или None."""
+    accepted = accepted_encodings(header)
+    best = None
+    for encoding in supported_encodings():
+        weight = accepted.get(encoding, accepted.get('*', 0.0))
+        if weight > 0 and (best is None or weight > best[1]):
+            best = (encoding, weight)
+    return best[0] if best else None
+
+
+class Compressor:
+    """Потоковый компрессор с общим интерфейсом compress/flush."""
+
+    def __init__(self, encoding):
+        if encoding == 'br':
+            compressor = brotli.Compressor(quality=settings.BROTLI_QUALITY)
+            self.compress = compressor.process
+            self.flush = compressor.finish
+        elif encoding == 'zstd':
+            compressor = zstandard.ZstdCompressor(
+                level=settings.ZSTD_LEVEL
+            ).compressobj()
+            self.compress = compressor.compress
+            self.flush = compressor.flush
+        else:
+            # wbits 16 + MAX_WBITS - заголовок и контрольная сумма gzip
+            compressor = zlib.compressobj(
+                settings.GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS
+            )
+            self.compress = compressor.compress
+            self.flush = compressor.flush
+
+
+def compress(content, encoding):
+    compressor = Compressor(encoding)
+    return compressor.compress(content) + compressor.flush()
+
+
+def compress_stream(chunks, encoding):
+    compressor = Compressor(encoding)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def compress_response(request, response):
+    """Сжимает ответ, если клиент это принимает.
+
+    Обычный ответ короче COMPRESS_MIN_LENGTH и ответ, который уже
+    сжат, возвращаются как есть. Потоковый ответ сжимается по частям.
+    Возвращает выбранную кодировку или None.
+    """
+    patch_vary_headers(response, ('Accept-Encoding',))
+    if (
+        response.status_code in BODYLESS_STATUSES
+        or response.has_header('Content-Encoding')
+        or not response.streaming
+        and len(response.content) < settings.COMPRESS_MIN_LENGTH
+    ):
+        return None
+    encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    if encoding is None:
+        return None
+    if response.streaming:
+        response.streaming_content = compress_stream(
+            response.streaming_content, encoding
+        )
+        del response['Content-Length']
+    else:
+        compressed = compress(response.content, encoding)
+        if len(compressed) >= len(response.content):
+            return None
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+    etag = response.get('ETag')
+    if etag and etag.startswith('"'):
+        # сжатое тело отличается побайтно, поэтому ETag становится слабым
+        response['ETag'] = f'W/{etag}'
+    response['Content-Encoding'] = encoding
+    return encoding
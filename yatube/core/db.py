@@ -0,0 +1,59 @@
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """Применяет SQLITE_PRAGMAS к новому соединению SQLite."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def check_databases():
+    """Состояние всех баз: alias -> время ответа в мс или None."""
+    results = {}
+    for alias in connections:
+        started = time.perf_counter()
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute('SELECT 1')
+                cursor.fetchone()
+        except DatabaseError:
+            results[alias] = None
+        else:
+            results[alias] = (time.perf_counter() - started) * 1000
+    return results
+
+
+def estimate_rows(model, using='default'):
+    """Оценка числа строк таблицы по статистике планировщика или None.
+
+    В PostgreSQL это pg_class.reltuples, которую обновляют autovacuum и
+    ANALYZE; в SQLite - sqlite_stat1, которая появляется после ANALYZE.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                'SELECT reltuples FROM pg_class WHERE oid = %s::regclass',
+                [table]
+            )
+            row = cursor.fetchone()
+            return int(row[0]) if row and row[0] >= 0 else None
+        if connection.vendor == 'sqlite':
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+            )
+            if cursor.fetchone() is None:
+                return None
+            cursor.execute(
+                'SELECT stat FROM sqlite_stat1 WHERE tbl = %s', [table]
+            )
+            rows = [int(stat.split()[0]) for stat, in cursor.fetchall()]
+            return max(rows) if rows else None
+    return None
@@ -0,0 +1,129 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from core import benchmark
+from posts.models import Post, User
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет холодный старт: для каждого маршрута запускает новый '
+        'процесс с каждым профилем настроек и меряет время до первого '
+        'байта первого ответа. Данные создаются во временной базе'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20)
+        parser.add_argument('--groups', type=int, default=5)
+        parser.add_argument('--posts', type=int, default=1000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--profile', action='append', dest='profiles',
+            help='Модуль настроек; по умолчанию yatube.settings и '
+                 'yatube.settings_production с прогревом и без'
+        )
+        parser.add_argument('--repeat', type=int, default=3)
+        parser.add_argument(
+            '--only', help='Замерять только маршруты, имя которых содержит'
+        )
+
+    def handle(self, *args, **options):
+        profiles = [
+            (profile, {}) for profile in options['profiles'] or ()
+        ] or [
+            ('yatube.settings', {}),
+            ('yatube.settings_production', {'TEMPLATE_WARMUP': '0'}),
+            ('yatube.settings_production', {'TEMPLATE_WARMUP': '1'}),
+        ]
+        creation = connection.creation
+        old_name = connection.settings_dict['NAME']
+        with tempfile.TemporaryDirectory() as directory:
+            # дочерним процессам нужна база в файле, а не в памяти
+            connection.settings_dict['TEST']['NAME'] = os.path.join(
+                directory, 'cold_start.sqlite3'
+            )
+            database = creation.create_test_db(
+                verbosity=0, autoclobber=True
+            )
+            try:
+                self.run(options, profiles, database)
+            finally:
+                creation.destroy_test_db(old_name, verbosity=0)
+
+    def run(self, options, profiles, database):
+        benchmark.seed(
+            options['users'], options['groups'], options['posts'],
+            options['seed']
+        )
+        user = User.objects.create_user(username='bench', is_staff=True)
+        Post.objects.create(author=user, text='Пост для замеров')
+        cookie = benchmark.session_cookie(user)
+        routes = [
+            route for route in benchmark.get_routes(user)
+            if not options['only'] or options['only'] in route.name
+        ]
+        self.stdout.write(
+            'для каждого профиля: старт приложения + первый запрос, мс'
+        )
+        totals = [{'ready_ms': [], 'request_ms': []} for _ in profiles]
+        for route in routes:
+            line = [f'{route.label:45}']
+            for index, (module, extra) in enumerate(profiles):
+                samples = [
+                    self.cold_request(
+                        module, extra, database, route.url,
+                        cookie if route.user else None
+                    )
+                    for _ in range(options['repeat'])
+                ]
+                for key, values in totals[index].items():
+                    values.append(benchmark.percentile(
+                        [sample[key] for sample in samples], 50
+                    ))
+                line.append(
+                    f'{totals[index]["ready_ms"][-1]:6.0f} + '
+                    f'{totals[index]["request_ms"][-1]:6.1f}'
+                )
+            self.stdout.write('  '.join(line))
+        for (module, extra), total in zip(profiles, totals):
+            ready, request = (
+                sum(values) / max(len(values), 1)
+                for values in total.values()
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f'{module} {extra or ""}: старт {ready:.0f} мс, '
+                f'первый запрос {request:.1f} мс, '
+                f'до первого байта {ready + request:.0f} мс'
+            ))
+
+    def cold_request(self, module, extra, database, url, cookie):
+        env = dict(
+            os.environ,
+            DJANGO_SETTINGS_MODULE=module,
+            DATABASE_BACKEND='sqlite',
+            DATABASE_NAME=database,
+            SECRET_KEY=settings.SECRET_KEY,
+            **extra
+        )
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, '-m', 'core.coldstart', url]
+            + ([cookie] if cookie else []),
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True
+        )
+        if result.returncode:
+            raise CommandError(
+                f'{module} {url}: процесс завершился с ошибкой\n'
+                f'{result.stderr}'
+            )
+        sample = json.loads(result.stdout.splitlines()[-1])
+        sample['process_ms'] = (time.perf_counter() - started) * 1000
+        return sample
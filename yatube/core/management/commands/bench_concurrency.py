@@ -0,0 +1,71 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from core import benchmark
+from core.asgi import AsgiHandler
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает WSGI-сервер с пулом потоков и yatube.asgi под '
+        'нагрузкой медленных клиентов: задержка и пропускная способность '
+        'быстрых запросов. Данные создаются во временной базе'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--groups', type=int, default=10)
+        parser.add_argument('--posts', type=int, default=1000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--url', default='/')
+        parser.add_argument('--slow-clients', type=int, default=100)
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=10)
+        parser.add_argument(
+            '--delay', type=float, default=1.0,
+            help='Сколько секунд медленный клиент присылает заголовки'
+        )
+        parser.add_argument(
+            '--threads', type=int, default=settings.ASGI_THREADS,
+            help='Размер пула потоков обоих серверов'
+        )
+
+    def handle(self, *args, **options):
+        creation = connection.creation
+        old_name = connection.settings_dict['NAME']
+        creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            benchmark.seed(
+                options['users'], options['groups'], options['posts'],
+                options['seed']
+            )
+            servers = (
+                ('wsgi', benchmark.LocalServer(threads=options['threads'])),
+                ('asgi', benchmark.LocalAsgiServer(
+                    AsgiHandler(threads=options['threads'])
+                )),
+            )
+            for name, server in servers:
+                with server:
+                    metrics = benchmark.measure_slow_clients(
+                        server, options['url'], options['slow_clients'],
+                        options['requests'], options['concurrency'],
+                        options['delay']
+                    )
+                self.report(name, metrics)
+        finally:
+            creation.destroy_test_db(old_name, verbosity=0)
+
+    def report(self, name, metrics):
+        if 'p50' not in metrics:
+            self.stdout.write(
+                f'{name:5} ни одного успешного запроса, '
+                f'ошибок {metrics["errors"]}'
+            )
+            return
+        self.stdout.write(
+            f'{name:5} p50 {metrics["p50"]:9.2f}  p95 {metrics["p95"]:9.2f}  '
+            f'p99 {metrics["p99"]:9.2f} мс  {metrics["rps"]:7.1f} запр/с  '
+            f'ошибок {metrics["errors"]}'
+        )
@@ -0,0 +1,107 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from core import benchmark
+from posts.models import Post, User
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет задержку p50/p95/p99, число запросов к БД и выделения '
+        'памяти на всех маршрутах posts, users и about. Данные создаются '
+        'во временной базе, результаты сравниваются с базовой линией'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--groups', type=int, default=10)
+        parser.add_argument('--posts', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--requests', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument(
+            '--transport', choices=('client', 'server', 'both'),
+            default='both',
+            help='Тестовый клиент, локальный WSGI-сервер или оба'
+        )
+        parser.add_argument(
+            '--only', help='Замерять только маршруты, имя которых содержит'
+        )
+        parser.add_argument('--baseline', help='JSON с базовой линией')
+        parser.add_argument(
+            '--save-baseline', action='store_true',
+            help='Записать результаты в --baseline вместо сравнения'
+        )
+        parser.add_argument(
+            '--tolerance', type=float, default=0.25,
+            help='Допустимый рост p95 и выделений, доля'
+        )
+
+    def handle(self, *args, **options):
+        if options['save_baseline'] and not options['baseline']:
+            raise CommandError('Для --save-baseline нужен --baseline')
+        creation = connection.creation
+        old_name = connection.settings_dict['NAME']
+        creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            results = self.run(options)
+        finally:
+            creation.destroy_test_db(old_name, verbosity=0)
+        if options['save_baseline']:
+            benchmark.save_baseline(options['baseline'], results)
+            self.stdout.write(self.style.SUCCESS(
+                f'Базовая линия записана в {options["baseline"]}'
+            ))
+        elif options['baseline']:
+            regressions = benchmark.compare(
+                results, benchmark.load_baseline(options['baseline']),
+                options['tolerance']
+            )
+            if regressions:
+                raise CommandError(
+                    'Регрессии относительно базовой линии:\n'
+                    + '\n'.join(regressions)
+                )
+            self.stdout.write(self.style.SUCCESS('Регрессий нет'))
+
+    def run(self, options):
+        benchmark.seed(
+            options['users'], options['groups'], options['posts'],
+            options['seed']
+        )
+        user = User.objects.create_user(username='bench', is_staff=True)
+        Post.objects.create(author=user, text='Пост для замеров')
+        routes = [
+            route for route in benchmark.get_routes(user)
+            if not options['only'] or options['only'] in route.name
+        ]
+        results = {route.label: {} for route in routes}
+        if options['transport'] in ('client', 'both'):
+            for route in routes:
+                metrics = benchmark.measure_client(
+                    route, options['requests'], options['warmup']
+                )
+                results[route.label]['client'] = metrics
+                self.report(route, 'client', metrics)
+        if options['transport'] in ('server', 'both'):
+            with benchmark.LocalServer() as server:
+                for route in routes:
+                    metrics = benchmark.measure_server(
+                        server, route, options['requests'], options['warmup']
+                    )
+                    results[route.label]['server'] = metrics
+                    self.report(route, 'server', metrics)
+        return results
+
+    def report(self, route, transport, metrics):
+        line = (
+            f'{route.label:45} {transport:6} '
+            f'p50 {metrics["p50"]:8.2f}  p95 {metrics["p95"]:8.2f}  '
+            f'p99 {metrics["p99"]:8.2f} мс'
+        )
+        if 'queries' in metrics:
+            line += (
+                f'  запросов {metrics["queries"]:3}  '
+                f'выделено {metrics["allocated_kb"]:8.1f} КБ'
+            )
+        self.stdout.write(line)
@@ -0,0 +1,95 @@
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import override_settings
+
+from core import benchmark
+from posts.models import Post, User
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет запись постов одновременными авторами через форму '
+        'создания поста на сервере с пулом потоков: задержку и число '
+        'записей в секунду для каждого режима журнала SQLite. Данные '
+        'создаются во временной базе'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20)
+        parser.add_argument('--groups', type=int, default=5)
+        parser.add_argument('--posts', type=int, default=1000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--authors', type=int, default=8)
+        parser.add_argument(
+            '--writes', type=int, default=25,
+            help='Сколько постов создаёт каждый автор'
+        )
+        parser.add_argument(
+            '--double-submit', action='store_true',
+            help='Отправлять каждую форму дважды одновременно'
+        )
+        parser.add_argument(
+            '--journal-mode', action='append', dest='journal_modes',
+            help='Режим журнала SQLite; по умолчанию WAL и DELETE'
+        )
+        parser.add_argument(
+            '--threads', type=int, default=settings.ASGI_THREADS,
+            help='Размер пула потоков сервера'
+        )
+
+    def handle(self, *args, **options):
+        for mode in options['journal_modes'] or ('WAL', 'DELETE'):
+            pragmas = dict(settings.SQLITE_PRAGMAS, journal_mode=mode)
+            with override_settings(SQLITE_PRAGMAS=pragmas):
+                self.report(mode, *self.measure(options))
+
+    def measure(self, options):
+        creation = connection.creation
+        old_name = connection.settings_dict['NAME']
+        with tempfile.TemporaryDirectory() as directory:
+            # потоки сервера пишут в файл, как в рабочей базе
+            connection.settings_dict['TEST']['NAME'] = os.path.join(
+                directory, 'writes.sqlite3'
+            )
+            creation.create_test_db(verbosity=0, autoclobber=True)
+            try:
+                return self.run(options)
+            finally:
+                creation.destroy_test_db(old_name, verbosity=0)
+
+    def run(self, options):
+        benchmark.seed(
+            options['users'], options['groups'], options['posts'],
+            options['seed']
+        )
+        cookies = [
+            benchmark.session_cookie(
+                User.objects.create_user(username=f'writer{number}')
+            )
+            for number in range(options['authors'])
+        ]
+        before = Post.objects.count()
+        with benchmark.LocalServer(threads=options['threads']) as server:
+            metrics = benchmark.measure_writes(
+                server, cookies, options['writes'], options['double_submit']
+            )
+        created = Post.objects.count() - before
+        expected = options['authors'] * options['writes']
+        return metrics, created - expected
+
+    def report(self, mode, metrics, duplicates):
+        if 'p50' not in metrics:
+            self.stdout.write(
+                f'{mode:8} ни одной успешной записи, '
+                f'ошибок {metrics["errors"]}'
+            )
+            return
+        self.stdout.write(
+            f'{mode:8} p50 {metrics["p50"]:8.2f}  p95 {metrics["p95"]:8.2f}  '
+            f'p99 {metrics["p99"]:8.2f} мс  {metrics["rps"]:7.1f} записей/с  '
+            f'ошибок {metrics["errors"]}  лишних постов {duplicates}'
+        )
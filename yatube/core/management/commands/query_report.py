@@ -0,0 +1,64 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.query_log import read_events
+
+TITLES = {
+    'slow_query': 'Медленные запросы (по суммарному времени)',
+    'duplicate_query': 'Повторяющиеся запросы (по числу повторов)',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Сводка журнала запросов: самые медленные и чаще всего '
+        'повторяющиеся запросы с местом вызова'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--log', default=settings.QUERY_LOG_FILE)
+        parser.add_argument('--top', type=int, default=10)
+
+    def handle(self, *args, **options):
+        groups = defaultdict(lambda: {
+            'events': 0, 'count': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+            'views': set(),
+        })
+        for event in read_events(options['log']):
+            if event.get('event') not in TITLES:
+                continue
+            key = (
+                event['event'], event['sql'],
+                event.get('template'), event.get('code')
+            )
+            group = groups[key]
+            duration = event.get('duration_ms', event.get('total_ms', 0))
+            group['events'] += 1
+            group['count'] += event.get('count', 1)
+            group['total_ms'] += duration
+            group['max_ms'] = max(group['max_ms'], duration)
+            group['views'].add(event.get('view'))
+        if not groups:
+            self.stdout.write('Журнал запросов пуст')
+            return
+        for kind, title in TITLES.items():
+            rows = [(key, group) for key, group in groups.items()
+                    if key[0] == kind]
+            order = 'total_ms' if kind == 'slow_query' else 'count'
+            rows.sort(key=lambda row: row[1][order], reverse=True)
+            self.stdout.write(self.style.MIGRATE_HEADING(title))
+            for (_, sql, template, code), group in rows[:options['top']]:
+                self.stdout.write(
+                    f'{group["events"]} раз в ответах, {group["count"]} '
+                    f'запросов, всего {group["total_ms"]:.1f} мс, '
+                    f'максимум {group["max_ms"]:.1f} мс'
+                )
+                self.stdout.write(
+                    f'  представления: {", ".join(sorted(group["views"]))}'
+                )
+                self.stdout.write(
+                    f'  шаблон: {template or "-"}, код: {code or "-"}'
+                )
+                self.stdout.write(f'  {sql[:300]}')
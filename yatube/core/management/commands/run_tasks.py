@@ -0,0 +1,40 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core import tasks
+
+
+class Command(BaseCommand):
+    help = (
+        'Воркер очереди фоновых задач: выполняет задачи пачками, пока не '
+        'будет остановлен. Воркеров можно запустить несколько'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch', type=int, default=settings.TASKS_BATCH,
+            help='Сколько задач брать за раз'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить готовые задачи и завершиться'
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        try:
+            while True:
+                done = tasks.run_pending(options['batch'])
+                close_old_connections()
+                total += done
+                if done:
+                    continue
+                if options['once']:
+                    break
+                time.sleep(settings.TASKS_POLL_INTERVAL)
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f'Выполнено задач: {total}'))
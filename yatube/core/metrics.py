@@ -0,0 +1,199 @@
+"""Гистограммы запросов в памяти процесса и их вывод для Prometheus."""
+import threading
+import time
+from contextlib import contextmanager
+
+# границы корзин по умолчанию, как в клиентах Prometheus
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10
+)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace(
+        '\n', r'\n'
+    )
+
+
+def _labels(labels, **extra):
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"'
+                          for key, value in pairs) + '}'
+
+
+class Histogram:
+    """Накопительная гистограмма с произвольными метками."""
+
+    def __init__(self, name, documentation, buckets=DURATION_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+            # два последних элемента: сумма и число наблюдений
+            series[-2] += value
+            series[-1] += 1
+
+    def collect(self):
+        with self._lock:
+            return {key: list(series) for key, series in self._series.items()}
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def expose(self):
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} histogram',
+        ]
+        for labels, series in sorted(self.collect().items()):
+            for bound, count in zip(self.buckets, series):
+                lines.append(
+                    f'{self.name}_bucket{_labels(labels, le=bound)} {count}'
+                )
+            lines.append(
+                f'{self.name}_bucket{_labels(labels, le="+Inf")} '
+                f'{series[-1]}'
+            )
+            lines.append(f'{self.name}_sum{_labels(labels)} {series[-2]}')
+            lines.append(f'{self.name}_count{_labels(labels)} {series[-1]}')
+        return '\n'.join(lines)
+
+
+class Counter:
+    """Накопительный счётчик с произвольными метками."""
+
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def inc(self, value=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + value
+
+    def collect(self):
+        with self._lock:
+            return dict(self._series)
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def expose(self):
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} counter',
+        ]
+        for labels, value in sorted(self.collect().items()):
+            lines.append(f'{self.name}{_labels(labels)} {value}')
+        return '\n'.join(lines)
+
+
+REQUEST_DURATION = Histogram(
+    'yatube_request_duration_seconds',
+    'Время обработки запроса, все запросы'
+)
+DB_QUERIES = Histogram(
+    'yatube_db_queries',
+    'Число запросов к БД на запрос, выборка',
+    COUNT_BUCKETS
+)
+DB_DURATION = Histogram(
+    'yatube_db_duration_seconds',
+    'Суммарное время запросов к БД, выборка'
+)
+TEMPLATE_DURATION = Histogram(
+    'yatube_template_duration_seconds',
+    'Время отрисовки шаблонов, выборка'
+)
+RESPONSE_BYTES = Counter(
+    'yatube_response_bytes_total',
+    'Размер тел ответов до сжатия (stage="body") и после (stage="sent")'
+)
+REGISTRY = [REQUEST_DURATION, DB_QUERIES, DB_DURATION, TEMPLATE_DURATION]
+COUNTERS = [RESPONSE_BYTES]
+
+
+def expose():
+    """Все метрики в текстовом формате Prometheus."""
+    return '\n'.join(
+        metric.expose() for metric in REGISTRY + COUNTERS
+    ) + '\n'
+
+
+def reset():
+    for metric in REGISTRY + COUNTERS:
+        metric.reset()
+
+
+class RequestStats:
+    """Запросы к БД и время шаблонов одного замеряемого запроса."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.template_depth = 0
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+
+
+_local = threading.local()
+
+
+def current():
+    """Статистика запроса, который замеряется в этом потоке, или None."""
+    return getattr(_local, 'stats', None)
+
+
+@contextmanager
+def collecting(stats):
+    _local.stats = stats
+    try:
+        yield stats
+    finally:
+        _local.stats = None
+
+
+@contextmanager
+def template_timer():
+    """Считает время отрисовки шаблона верхнего уровня.
+
+    Шаблоны, отрисованные внутри другого шаблона (например, карточки
+    постов), уже входят во время внешнего и не суммируются повторно.
+    """
+    stats = current()
+    if stats is None:
+        yield
+        return
+    stats.template_depth += 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.template_depth -= 1
+        if not stats.template_depth:
+            stats.template_time += time.perf_counter() - started
@@ -0,0 +1,125 @@
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from core import compression, metrics, query_log
+
+
+class RequestMetricsMiddleware:
+    """Время запроса, запросы к БД и отрисовка шаблонов.
+
+    Время обработки пишется для каждого запроса. Запросы к БД и шаблоны
+    считаются только в доле METRICS_SAMPLE_RATE запросов: им же
+    добавляется заголовок Server-Timing.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        if random.random() >= settings.METRICS_SAMPLE_RATE:
+            response = self.get_response(request)
+            self.observe_duration(request, started)
+            return response
+        stats = metrics.RequestStats()
+        with ExitStack() as stack:
+            stack.enter_context(metrics.collecting(stats))
+            for connection in connections.all():
+                stack.enter_context(
+                    connection.execute_wrapper(stats.execute_wrapper)
+                )
+            response = self.get_response(request)
+        view = self.observe_duration(request, started)
+        metrics.DB_QUERIES.observe(stats.queries, view=view)
+        metrics.DB_DURATION.observe(stats.db_time, view=view)
+        metrics.TEMPLATE_DURATION.observe(stats.template_time, view=view)
+        response['Server-Timing'] = ', '.join((
+            f'db;desc="{stats.queries} queries";'
+            f'dur={stats.db_time * 1000:.1f}',
+            f'tpl;dur={stats.template_time * 1000:.1f}',
+            f'total;dur={(time.perf_counter() - started) * 1000:.1f}',
+        ))
+        return response
+
+    def observe_duration(self, request, started):
+        match = request.resolver_match
+        view = match.view_name if match else 'unresolved'
+        metrics.REQUEST_DURATION.observe(
+            time.perf_counter() - started, view=view
+        )
+        return view
+
+
+class QueryLogMiddleware:
+    """Пишет в журнал yatube.queries медленные и повторяющиеся запросы.
+
+    Включается настройкой QUERY_LOG_ENABLED. Запрос медленный, если
+    выполняется дольше QUERY_LOG_SLOW_MS; повторяющийся, если запрос той
+    же формы выполнен в одном HTTP-запросе QUERY_LOG_DUPLICATES раз
+    и больше - обычно это N+1 в шаблоне.
+    """
+
+    def __init__(self, get_response):
+        if not settings.QUERY_LOG_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        inspector = query_log.QueryInspector(
+            settings.QUERY_LOG_SLOW_MS, settings.QUERY_LOG_DUPLICATES
+        )
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(inspector))
+            response = self.get_response(request)
+        match = request.resolver_match
+        query_log.log_findings(
+            inspector, match.view_name if match else 'unresolved',
+            request.path
+        )
+        return response
+
+
+def _counted(chunks, view, stage):
+    for chunk in chunks:
+        metrics.RESPONSE_BYTES.inc(len(chunk), view=view, stage=stage)
+        yield chunk
+
+
+class CompressionMiddleware:
+    """Сжимает ответы gzip, brotli или zstd и считает сэкономленные байты.
+
+    Размер тела до сжатия и отправленный размер копятся в метрике
+    yatube_response_bytes_total по представлениям; для потоковых
+    ответов - по мере отправки частей.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        match = request.resolver_match
+        view = match.view_name if match else 'unresolved'
+        if response.streaming:
+            response.streaming_content = _counted(
+                response.streaming_content, view, 'body'
+            )
+            compression.compress_response(request, response)
+            response.streaming_content = _counted(
+                response.streaming_content, view, 'sent'
+            )
+            return response
+        metrics.RESPONSE_BYTES.inc(
+            len(response.content), view=view, stage='body'
+        )
+        compression.compress_response(request, response)
+        metrics.RESPONSE_BYTES.inc(
+            len(response.content), view=view, stage='sent'
+        )
+        return response
@@ -0,0 +1,38 @@
+# Generated by Django 2.2.6 on 2026-10-18 20:51
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Task',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Имя задачи')),
+                ('args', models.TextField(default='[]', verbose_name='Аргументы (JSON)')),
+                ('key', models.CharField(blank=True, db_index=True, max_length=200, verbose_name='Ключ объединения одинаковых задач')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Число неудачных попыток')),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Не выполнять раньше')),
+                ('locked_by', models.CharField(blank=True, max_length=32, verbose_name='Воркер, взявший задачу')),
+                ('locked_until', models.DateTimeField(blank=True, null=True, verbose_name='Задача занята до')),
+                ('failed', models.BooleanField(default=False, verbose_name='Попытки исчерпаны')),
+                ('last_error', models.TextField(blank=True, verbose_name='Последняя ошибка')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата постановки')),
+            ],
+            options={
+                'ordering': ('run_after', 'id'),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['failed', 'run_after'], name='task_ready_idx'),
+        ),
+    ]
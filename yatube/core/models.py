@@ -0,0 +1,57 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Task(models.Model):
+    """Отложенная задача очереди core.tasks.
+
+    Задача пишется в ту же базу и в той же транзакции, что и данные,
+    поэтому воркер видит её только после фиксации.
+    """
+    name = models.CharField(max_length=100, verbose_name='Имя задачи')
+    args = models.TextField(default='[]', verbose_name='Аргументы (JSON)')
+    key = models.CharField(
+        max_length=200,
+        blank=True,
+        db_index=True,
+        verbose_name='Ключ объединения одинаковых задач'
+    )
+    attempts = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Число неудачных попыток'
+    )
+    run_after = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Не выполнять раньше'
+    )
+    locked_by = models.CharField(
+        max_length=32,
+        blank=True,
+        verbose_name='Воркер, взявший задачу'
+    )
+    locked_until = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Задача занята до'
+    )
+    failed = models.BooleanField(
+        default=False,
+        verbose_name='Попытки исчерпаны'
+    )
+    last_error = models.TextField(blank=True, verbose_name='Последняя ошибка')
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата постановки'
+    )
+
+    class Meta:
+        ordering = ('run_after', 'id')
+        indexes = (
+            models.Index(
+                fields=('failed', 'run_after'),
+                name='task_ready_idx'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.name}{self.args}'
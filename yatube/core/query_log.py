@@ -0,0 +1,156 @@
+"""Журнал медленных и повторяющихся запросов к БД."""
+import json
+import logging
+import logging.handlers
+import os
+import re
+import sys
+import time
+
+from django.conf import settings
+from django.template.base import Node
+
+logger = logging.getLogger('yatube.queries')
+
+# списки параметров IN (%s, %s, ...) разной длины - один и тот же запрос
+PARAMS_LIST = re.compile(r'\(\s*%s(?:\s*,\s*%s)*\s*\)')
+NUMBER = re.compile(r'\b\d+\b')
+# обёртки запросов не считаются местом вызова
+INSTRUMENTATION = tuple(
+    os.path.join(os.path.dirname(__file__), name)
+    for name in ('query_log.py', 'metrics.py')
+)
+
+
+def shape(sql):
+    """Запрос без конкретных значений: по нему ищутся повторы."""
+    return NUMBER.sub('N', PARAMS_LIST.sub('(...)', sql))
+
+
+def origin():
+    """Строка шаблона и строка кода проекта, откуда пришёл запрос."""
+    template = code = None
+    frame = sys._getframe(1)
+    while frame is not None and (template is None or code is None):
+        node = frame.f_locals.get('self')
+        if (
+            template is None
+            and frame.f_code.co_name == 'render_annotated'
+            and isinstance(node, Node)
+            and node.token is not None
+        ):
+            name = node.origin.template_name if node.origin else None
+            template = f'{name or node.origin}:{node.token.lineno}'
+        filename = frame.f_code.co_filename
+        if (
+            code is None
+            and filename.startswith(settings.BASE_DIR)
+            and not filename.startswith(INSTRUMENTATION)
+            and 'site-packages' not in filename
+        ):
+            code = (
+                f'{os.path.relpath(filename, settings.BASE_DIR)}:'
+                f'{frame.f_lineno}'
+            )
+        frame = frame.f_back
+    return {'template': template, 'code': code}
+
+
+class QueryInspector:
+    """Собирает запросы одного HTTP-запроса для execute_wrapper."""
+
+    def __init__(self, slow_ms, duplicates):
+        self.slow_ms = slow_ms
+        self.duplicates = duplicates
+        self.shapes = {}
+        self.slow = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = (time.perf_counter() - started) * 1000
+            self.record(sql, duration)
+
+    def record(self, sql, duration):
+        key = shape(sql)
+        seen = self.shapes.get(key)
+        if seen is None:
+            seen = self.shapes[key] = {'count': 0, 'total_ms': 0.0}
+        seen['count'] += 1
+        seen['total_ms'] += duration
+        # место вызова нужно только медленным и повторным запросам,
+        # обход стека для остальных был бы лишней работой; форма
+        # запоминает место, как только попадает в повторы
+        if (
+            duration >= self.slow_ms
+            or seen['count'] == max(self.duplicates, 1)
+        ):
+            where = origin()
+            seen.setdefault('origin', where)
+            if duration >= self.slow_ms:
+                self.slow.append(
+                    dict(sql=key, duration_ms=round(duration, 2), **where)
+                )
+
+    def findings(self):
+        """События медленных и повторяющихся запросов."""
+        events = [
+            dict(event='slow_query', **query)
+            for query in self.slow
+        ]
+        for key, seen in self.shapes.items():
+            if seen['count'] >= self.duplicates:
+                events.append(dict(
+                    event='duplicate_query',
+                    sql=key,
+                    count=seen['count'],
+                    total_ms=round(seen['total_ms'], 2),
+                    **seen['origin']
+                ))
+        return events
+
+
+def log_findings(inspector, view, path):
+    for event in inspector.findings():
+        event.update(view=view, path=path)
+        logger.warning(event['event'], extra={'data': event})
+
+
+class JsonFormatter(logging.Formatter):
+    """Одна JSON-строка на событие."""
+
+    def format(self, record):
+        data = {
+            'time': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            'level': record.levelname,
+        }
+        data.update(getattr(record, 'data', {'message': record.getMessage()}))
+        return json.dumps(data, ensure_ascii=False)
+
+
+class RotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """RotatingFileHandler, который сам создаёт каталог журнала."""
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+
+def read_events(path):
+    """События из журнала и его ротированных копий, от старых к новым."""
+    paths = [path]
+    number = 1
+    while os.path.exists(f'{path}.{number}'):
+        paths.append(f'{path}.{number}')
+        number += 1
+    for name in reversed(paths):
+        if not os.path.exists(name):
+            continue
+        with open(name, encoding='utf-8') as log:
+            for line in log:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
@@ -0,0 +1,111 @@
+"""Чтение с реплик для представлений, которые только читают."""
+import itertools
+import threading
+
+from django.conf import settings
+from django.db import connections
+
+STICKY_COOKIE = 'read_primary'
+
+_local = threading.local()
+
+
+class ReplicaSelector:
+    """Выбирает реплику по кругу или наименее загруженную."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cycles = {}
+        self.in_flight = {}
+
+    def acquire(self, replicas):
+        replicas = tuple(replicas)
+        with self._lock:
+            if settings.REPLICA_SELECTION == 'least_loaded':
+                alias = min(
+                    replicas, key=lambda name: self.in_flight.get(name, 0)
+                )
+            else:
+                if replicas not in self._cycles:
+                    self._cycles[replicas] = itertools.cycle(replicas)
+                alias = next(self._cycles[replicas])
+            self.in_flight[alias] = self.in_flight.get(alias, 0) + 1
+        return alias
+
+    def release(self, alias):
+        with self._lock:
+            self.in_flight[alias] -= 1
+
+
+selector = ReplicaSelector()
+
+
+def current_replica():
+    """Реплика, с которой читает текущий запрос, или None."""
+    return getattr(_local, 'replica', None)
+
+
+class ReplicaRouter:
+    """Чтение моделей REPLICA_APPS с реплики запроса, запись - в default."""
+
+    def db_for_read(self, model, **hints):
+        alias = current_replica()
+        if (
+            alias is None
+            or model._meta.app_label not in settings.REPLICA_APPS
+            # внутри транзакции читается то, что в ней записано
+            or connections['default'].in_atomic_block
+        ):
+            return None
+        return alias
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label in settings.REPLICA_APPS:
+            _local.wrote = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # реплики - копии основной базы, объекты с них совместимы
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaRoutingMiddleware:
+    """Направляет чтение REPLICA_VIEWS на одну реплику на весь запрос.
+
+    После записи клиент получает cookie read_primary и следующие
+    REPLICA_STICKY_SECONDS секунд читает с основной базы, поэтому автор
+    сразу видит свой пост, даже если реплика отстаёт.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.replica = None
+        _local.wrote = False
+        try:
+            response = self.get_response(request)
+        finally:
+            _local.replica = None
+            if request.replica is not None:
+                selector.release(request.replica)
+        if _local.wrote:
+            response.set_cookie(
+                STICKY_COOKIE, '1', max_age=settings.REPLICA_STICKY_SECONDS
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (
+            not settings.DATABASE_REPLICAS
+            or request.method not in ('GET', 'HEAD')
+            or STICKY_COOKIE in request.COOKIES
+            or request.resolver_match.view_name not in settings.REPLICA_VIEWS
+        ):
+            return None
+        request.replica = selector.acquire(settings.DATABASE_REPLICAS)
+        _local.replica = request.replica
+        return None
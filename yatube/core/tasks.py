@@ -0,0 +1,187 @@
+"""Очередь фоновых задач в таблице core.Task.
+
+Задачи регистрируются декоратором task и ставятся в очередь enqueue в
+той же транзакции, что и изменённые данные. Режим TASKS_MODE:
+
+* eager - задача выполняется сразу при постановке, как обычный вызов;
+* thread - задачи выполняет поток веб-процесса: он запускается первым
+  запросом и будится после фиксации транзакции с новой задачей, а между
+  ними раз в TASKS_POLL_INTERVAL забирает задачи, оставшиеся от
+  прошлых процессов или поставленные управляющими командами;
+* worker - задачи выполняют отдельные процессы manage.py run_tasks.
+
+Одинаковые задачи с ключом key, ещё не взятые воркером, объединяются
+в одну. Воркер берёт задачи пачкой: задачи с batch=True одного имени
+выполняются одним вызовом со списком аргументов. Упавшая задача
+повторяется через TASKS_RETRY_DELAY секунд, с каждой попыткой вдвое
+позже, а после TASKS_MAX_ATTEMPTS попыток помечается failed и остаётся
+в таблице.
+"""
+import json
+import logging
+import threading
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core.models import Task
+
+logger = logging.getLogger(__name__)
+
+# имя задачи -> (функция, batch)
+REGISTRY = {}
+
+_wakeup = threading.Event()
+_thread = None
+_thread_lock = threading.Lock()
+
+
+def task(name, batch=False):
+    """Регистрирует функцию как задачу name.
+
+    Функция с batch=True принимает список аргументов всех задач пачки,
+    поэтому ставится в очередь ровно с одним аргументом.
+    """
+    def decorator(func):
+        REGISTRY[name] = (func, batch)
+        return func
+    return decorator
+
+
+def call(name, args_list):
+    """Выполняет задачи name с аргументами из args_list."""
+    func, batch = REGISTRY[name]
+    if batch:
+        func([args[0] for args in args_list])
+        return
+    for args in args_list:
+        func(*args)
+
+
+def enqueue(name, *args, key=''):
+    """Ставит задачу в очередь или сразу выполняет её в режиме eager."""
+    if name not in REGISTRY:
+        raise KeyError(f'неизвестная задача {name}')
+    if settings.TASKS_MODE == 'eager':
+        call(name, [args])
+        return
+    if key and Task.objects.filter(
+        key=key, locked_by='', failed=False
+    ).exists():
+        return
+    Task.objects.create(name=name, args=json.dumps(args), key=key)
+    if settings.TASKS_MODE == 'thread':
+        transaction.on_commit(wake_thread)
+
+
+def ready_tasks(now):
+    return Task.objects.filter(failed=False, run_after__lte=now).filter(
+        Q(locked_until__isnull=True) | Q(locked_until__lt=now)
+    )
+
+
+def claim(limit):
+    """Занимает до limit готовых задач и возвращает их.
+
+    Задача занимается на TASKS_LEASE секунд: если воркер упал, её
+    возьмёт другой.
+    """
+    now = timezone.now()
+    token = uuid.uuid4().hex
+    ids = list(ready_tasks(now).values_list('pk', flat=True)[:limit])
+    if not ids:
+        return []
+    ready_tasks(now).filter(pk__in=ids).update(
+        locked_by=token,
+        locked_until=now + timedelta(seconds=settings.TASKS_LEASE)
+    )
+    return list(Task.objects.filter(pk__in=ids, locked_by=token))
+
+
+def retry(tasks, error):
+    now = timezone.now()
+    for item in tasks:
+        item.attempts += 1
+        item.locked_by = ''
+        item.locked_until = None
+        item.last_error = error
+        if item.attempts >= settings.TASKS_MAX_ATTEMPTS:
+            item.failed = True
+        else:
+            item.run_after = now + timedelta(
+                seconds=settings.TASKS_RETRY_DELAY * 2 ** (item.attempts - 1)
+            )
+        item.save(update_fields=(
+            'attempts', 'locked_by', 'locked_until', 'last_error', 'failed',
+            'run_after'
+        ))
+
+
+def run_pending(limit=None):
+    """Выполняет одну пачку готовых задач, возвращает их число."""
+    tasks = claim(limit or settings.TASKS_BATCH)
+    groups = {}
+    for item in tasks:
+        groups.setdefault(item.name, []).append(item)
+    for name, items in groups.items():
+        try:
+            with transaction.atomic():
+                # запись в начале транзакции сразу берёт блокировку SQLite
+                # на запись, иначе её повышение после чтения не ждёт
+                # busy_timeout и падает с database is locked
+                Task.objects.filter(
+                    pk__in=[item.pk for item in items]
+                ).delete()
+                call(name, [json.loads(item.args) for item in items])
+        except Exception:
+            logger.exception('Задача %s не выполнена', name)
+            retry(items, traceback.format_exc())
+    return len(tasks)
+
+
+def run_thread():
+    while True:
+        _wakeup.wait(settings.TASKS_POLL_INTERVAL)
+        _wakeup.clear()
+        try:
+            while run_pending():
+                pass
+        except Exception:
+            logger.exception('Ошибка потока фоновых задач')
+        finally:
+            close_old_connections()
+
+
+def ensure_thread():
+    """Запускает поток фоновых задач, если он ещё не запущен."""
+    global _thread
+    if _thread is not None and _thread.is_alive():
+        return
+    with _thread_lock:
+        if _thread is None or not _thread.is_alive():
+            _thread = threading.Thread(
+                target=run_thread, name='tasks', daemon=True
+            )
+            _thread.start()
+
+
+def wake_thread():
+    """Будит поток фоновых задач, при необходимости запуская его."""
+    ensure_thread()
+    _wakeup.set()
+
+
+def start_thread(**kwargs):
+    """Запускает поток в режиме thread по сигналу request_started.
+
+    Поток нужен только веб-процессу, поэтому он стартует с первым
+    запросом, а не в AppConfig.ready, где его получили бы и migrate,
+    и run_tasks.
+    """
+    if settings.TASKS_MODE == 'thread':
+        ensure_thread()
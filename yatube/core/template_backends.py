@@ -0,0 +1,25 @@
+from django.template.backends.django import DjangoTemplates, Template
+
+from core.metrics import template_timer
+
+
+class TimedTemplate(Template):
+    """Шаблон, время отрисовки которого попадает в метрики запроса."""
+
+    def render(self, context=None, request=None):
+        with template_timer():
+            return super().render(context, request)
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """Бэкенд DjangoTemplates, который отдаёт TimedTemplate."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(
+            super().from_string(template_code).template, self
+        )
+
+    def get_template(self, template_name):
+        return TimedTemplate(
+            super().get_template(template_name).template, self
+        )
@@ -0,0 +1,39 @@
+"""Загрузчики шаблонов, которые убирают отступы из исходника.
+
+Пробелы вокруг переводов строк схлопываются один раз при загрузке
+шаблона, поэтому отрисовка не тратит на это время. Содержимое pre,
+textarea, script и style не меняется: там пробелы значимы.
+"""
+import re
+
+from django.template.loaders import app_directories, filesystem
+
+PRESERVED = re.compile(
+    r'(<(pre|textarea|script|style)\b.*?</\2\s*>)',
+    re.DOTALL | re.IGNORECASE
+)
+INDENT = re.compile(r'[ \t\r\f\v]*\n\s*')
+
+
+def strip_whitespace(source):
+    """Исходник шаблона без отступов и пустых строк."""
+    parts = PRESERVED.split(source)
+    # split отдаёт тройки: текст, сохраняемый блок, имя тега
+    for index in range(0, len(parts), 3):
+        parts[index] = INDENT.sub('\n', parts[index])
+    return ''.join(
+        part for index, part in enumerate(parts) if index % 3 != 2
+    ).strip()
+
+
+class WhitespaceStrippingMixin:
+    def get_contents(self, origin):
+        return strip_whitespace(super().get_contents(origin))
+
+
+class FilesystemLoader(WhitespaceStrippingMixin, filesystem.Loader):
+    pass
+
+
+class AppDirectoriesLoader(WhitespaceStrippingMixin, app_directories.Loader):
+    pass
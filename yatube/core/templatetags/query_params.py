@@ -0,0 +1,24 @@
+from django import template
+
+register = template.Library()
+
+# взаимоисключающие параметры постраничного вывода
+PAGINATION_PARAMS = ('page', 'after', 'before')
+
+
+@register.simple_tag(takes_context=True)
+def query_with(context, **params):
+    """Строка запроса текущей страницы с заменёнными параметрами.
+
+    Параметры постраничного вывода заменяются вместе: ссылка на номер
+    страницы не несёт токенов курсора, и наоборот.
+    """
+    query = context['request'].GET.copy()
+    if set(params) & set(PAGINATION_PARAMS):
+        for name in PAGINATION_PARAMS:
+            query.pop(name, None)
+    for name, value in params.items():
+        query.pop(name, None)
+        if value not in (None, ''):
+            query[name] = value
+    return '?' + query.urlencode()
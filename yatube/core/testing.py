@@ -0,0 +1,26 @@
+"""Помощники для тестов."""
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+@contextmanager
+def capture_on_commit_callbacks(using=DEFAULT_DB_ALIAS, execute=False):
+    """Собирает колбэки transaction.on_commit, добавленные внутри блока.
+
+    TestCase не фиксирует транзакцию, поэтому такие колбэки в тестах не
+    вызываются. С execute=True они выполняются при выходе из блока, как
+    после фиксации. Аналог TestCase.captureOnCommitCallbacks из
+    Django 3.2.
+    """
+    callbacks = []
+    start = len(connections[using].run_on_commit)
+    try:
+        yield callbacks
+    finally:
+        callbacks[:] = [
+            func for sids, func in connections[using].run_on_commit[start:]
+        ]
+        if execute:
+            for callback in callbacks:
+                callback()
@@ -0,0 +1,138 @@
+import asyncio
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TransactionTestCase
+from core import benchmark
+from core.asgi import AsgiHandler, build_environ
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+def http_scope(path, query_string=b'', headers=()):
+    return {
+        'type': 'http',
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'query_string': query_string,
+        'headers': list(headers),
+        'server': ('testserver', 80),
+        'client': ('127.0.0.1', 5000),
+    }
+
+
+class AsgiHandlerTest(TransactionTestCase):
+    """Потоки пула видят данные только после фиксации транзакции."""
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.author = User.objects.create_user(
+            username='author', is_staff=True
+        )
+        self.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        self.post = Post.objects.create(
+            author=self.author,
+            group=self.group,
+            text='Тестовый пост'
+        )
+        self.handler = AsgiHandler(threads=2)
+
+    def tearDown(self):
+        self.handler.executor.shutdown()
+
+    def call(self, scope, body=b''):
+        messages = []
+        requests = [{'type': 'http.request', 'body': body}]
+
+        async def receive():
+            if requests:
+                return requests.pop()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            messages.append(message)
+
+        asyncio.run(self.handler(scope, receive, send))
+        return messages
+
+    def test_build_environ(self):
+        """Заголовки и строка запроса ASGI переходят в окружение WSGI."""
+        environ = build_environ(http_scope(
+            '/поиск/', b'q=1', [
+                (b'content-type', b'text/plain'),
+                (b'accept', b'text/html'),
+                (b'accept', b'*/*'),
+            ]
+        ), b'body')
+        values = {
+            'PATH_INFO': '/поиск/'.encode().decode('latin-1'),
+            'QUERY_STRING': 'q=1',
+            'CONTENT_TYPE': 'text/plain',
+            'HTTP_ACCEPT': 'text/html,*/*',
+            'REMOTE_ADDR': '127.0.0.1',
+            'SERVER_PROTOCOL': 'HTTP/1.1',
+        }
+        for key, value in values.items():
+            with self.subTest(key=key):
+                self.assertEqual(environ[key], value)
+        self.assertEqual(environ['wsgi.input'].read(), b'body')
+
+    def test_page(self):
+        """Страница отдаётся одним сообщением после заголовков."""
+        start, body = self.call(http_scope('/group/test_slug/'))
+        self.assertEqual(start['status'], 200)
+        self.assertIn(
+            (b'content-type', b'text/html; charset=utf-8'), start['headers']
+        )
+        self.assertIn('Тестовый пост', body['body'].decode())
+        self.assertFalse(body.get('more_body'))
+
+    def test_not_found(self):
+        start, _ = self.call(http_scope('/group/unknown/'))
+        self.assertEqual(start['status'], 404)
+
+    def test_streaming_response(self):
+        """Выгрузка отправляется частями из потока пула."""
+        cookie = benchmark.session_cookie(self.author).encode()
+        messages = self.call(http_scope(
+            '/export/posts.jsonl', headers=[(b'cookie', cookie)]
+        ))
+        self.assertEqual(messages[0]['status'], 200)
+        self.assertTrue(messages[1]['more_body'])
+        self.assertFalse(messages[-1].get('more_body'))
+        content = b''.join(message.get('body', b'') for message in messages)
+        self.assertIn('Тестовый пост', content.decode())
+
+    def test_lifespan(self):
+        messages = []
+        events = ['lifespan.shutdown', 'lifespan.startup']
+
+        async def receive():
+            return {'type': events.pop()}
+
+        async def send(message):
+            messages.append(message['type'])
+
+        asyncio.run(self.handler({'type': 'lifespan'}, receive, send))
+        self.assertEqual(messages, [
+            'lifespan.startup.complete', 'lifespan.shutdown.complete'
+        ])
+
+    def test_slow_clients_do_not_block_asgi(self):
+        """Медленные клиенты не задерживают быстрые запросы к ASGI."""
+        delay = 0.5
+        with benchmark.LocalAsgiServer(self.handler) as server:
+            metrics = benchmark.measure_slow_clients(
+                server, '/group/test_slug/', slow_clients=4, requests=10,
+                concurrency=2, delay=delay
+            )
+        self.assertEqual(metrics['errors'], 0)
+        self.assertLess(metrics['p95'], delay * 1000)
@@ -0,0 +1,94 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase, TransactionTestCase
+from core import benchmark
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class BenchmarkTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        benchmark.seed(users=3, groups=2, posts=30)
+        cls.user = User.objects.create_user(username='bench', is_staff=True)
+        Post.objects.create(author=cls.user, text='Пост для замеров')
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+
+    def test_seed(self):
+        """Данные создаются через mixer с пересчитанными счётчиками."""
+        self.assertEqual(Post.objects.count(), 31)
+        self.assertEqual(Group.objects.count(), 2)
+        group = Group.objects.first()
+        self.assertEqual(group.stats.posts_count, group.posts.count())
+
+    def test_routes_cover_namespaces(self):
+        """Замер проходит все именованные маршруты posts, users и about."""
+        names = {
+            route.name for route in benchmark.get_routes(BenchmarkTest.user)
+        }
+        for name in ('posts:index', 'posts:post_edit', 'posts:export',
+                     'users:password_reset_confirm', 'about:tech'):
+            with self.subTest(name=name):
+                self.assertIn(name, names)
+        self.assertFalse(
+            any(name.startswith('admin:') for name in names)
+        )
+
+    def test_measure_client(self):
+        """Замер тестовым клиентом считает задержку, запросы и выделения."""
+        route = benchmark.Route('posts:index', '/', BenchmarkTest.user)
+        metrics = benchmark.measure_client(route, requests=3, warmup=1)
+        self.assertLessEqual(metrics['p50'], metrics['p99'])
+        self.assertGreater(metrics['queries'], 0)
+        self.assertGreater(metrics['allocated_kb'], 0)
+
+    def test_percentile(self):
+        """Перцентиль берётся по ближайшему рангу."""
+        samples = list(range(1, 101))
+        self.assertEqual(benchmark.percentile(samples, 50), 50)
+        self.assertEqual(benchmark.percentile(samples, 99), 99)
+        self.assertEqual(benchmark.percentile([7], 95), 7)
+
+    def test_compare_with_baseline(self):
+        """Рост запросов и задержки выше допуска считается регрессией."""
+        baseline = {'posts:index (guest)': {
+            'client': {'p95': 10, 'queries': 1, 'allocated_kb': 40}
+        }}
+        results = {
+            'posts:index (guest)': {
+                'client': {'p95': 12, 'queries': 2, 'allocated_kb': 80}
+            },
+            'posts:search (guest)': {
+                'client': {'p95': 100, 'queries': 9, 'allocated_kb': 1}
+            },
+        }
+        regressions = benchmark.compare(results, baseline, tolerance=0.25)
+        self.assertEqual(len(regressions), 2)
+        self.assertIn('запросов к БД 1 -> 2', regressions[0])
+        self.assertIn('allocated_kb', regressions[1])
+
+
+class WriteBenchmarkTest(TransactionTestCase):
+    # общая база в памяти блокирует таблицу целиком, поэтому автор один,
+    # а одновременную запись проверяет bench_writes на базе в файле
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+
+    def test_measure_writes(self):
+        """Замер записи проходит форму с CSRF и ключом повторной отправки."""
+        cookie = benchmark.session_cookie(
+            User.objects.create_user(username='writer')
+        )
+        with benchmark.LocalServer(threads=2) as server:
+            metrics = benchmark.measure_writes(server, [cookie], posts=3)
+        self.assertEqual(metrics['errors'], 0)
+        self.assertLessEqual(metrics['p50'], metrics['p99'])
+        self.assertEqual(
+            Post.objects.filter(idempotency_key__isnull=False).count(), 3
+        )
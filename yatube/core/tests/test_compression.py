@@ -0,0 +1,146 @@
+import gzip
+import zlib
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.template.loader import get_template
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from core import compression, metrics
+from core.template_loaders import strip_whitespace
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class CompressionTest(TestCase):
+    def test_accepted_encodings(self):
+        self.assertEqual(
+            compression.accepted_encodings('gzip;q=0.5, br, identity;q=0'),
+            {'gzip': 0.5, 'br': 1.0, 'identity': 0.0}
+        )
+
+    def test_choose_encoding(self):
+        headers = {
+            'gzip, deflate': 'gzip',
+            'GZIP': 'gzip',
+            '*': 'gzip',
+            'gzip;q=0': None,
+            'deflate': None,
+            '': None,
+        }
+        for header, encoding in headers.items():
+            with self.subTest(header=header):
+                self.assertEqual(
+                    compression.choose_encoding(header), encoding
+                )
+
+    def test_compress_stream(self):
+        """Сжатый по частям поток распаковывается в исходные данные."""
+        chunks = [f'строка {i}\n'.encode() for i in range(1000)]
+        compressed = b''.join(compression.compress_stream(chunks, 'gzip'))
+        self.assertEqual(gzip.decompress(compressed), b''.join(chunks))
+
+
+class CompressionMiddlewareTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(
+            username='author', is_staff=True
+        )
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        for i in range(20):
+            Post.objects.create(
+                author=cls.author,
+                group=cls.group,
+                text=f'Тестовый пост {i}'
+            )
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        metrics.reset()
+        self.guest_client = Client(HTTP_ACCEPT_ENCODING='gzip, deflate')
+
+    def test_page_compressed(self):
+        """Страница сжимается gzip, а размеры попадают в метрику."""
+        response = self.guest_client.get(reverse('posts:index'))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(
+            int(response['Content-Length']), len(response.content)
+        )
+        content = gzip.decompress(response.content).decode()
+        self.assertIn('Тестовый пост', content)
+        sizes = {
+            labels[0][1]: value
+            for labels, value in metrics.RESPONSE_BYTES.collect().items()
+            if ('view', 'posts:index') in labels
+        }
+        self.assertEqual(sizes['body'], len(content.encode()))
+        self.assertEqual(sizes['sent'], len(response.content))
+
+    def test_not_compressed(self):
+        """Короткий ответ и клиент без gzip получают несжатое тело."""
+        response = Client().get(reverse('posts:index'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertIn('Accept-Encoding', response['Vary'])
+        with override_settings(COMPRESS_MIN_LENGTH=10 ** 6):
+            response = self.guest_client.get(reverse('posts:index'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_not_modified(self):
+        response = self.guest_client.get(reverse('posts:index'))
+        self.assertTrue(response['ETag'].startswith('W/'))
+        response = self.guest_client.get(
+            reverse('posts:index'), HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_streaming_compressed(self):
+        """Потоковая выгрузка сжимается по частям."""
+        self.guest_client.force_login(CompressionMiddlewareTest.author)
+        response = self.guest_client.get(
+            reverse('posts:export', kwargs={
+                'kind': 'posts', 'export_format': 'jsonl'
+            })
+        )
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertFalse(response.has_header('Content-Length'))
+        content = zlib.decompress(
+            b''.join(response.streaming_content), 16 + zlib.MAX_WBITS
+        ).decode()
+        self.assertEqual(len(content.splitlines()), 20)
+        self.assertEqual(
+            metrics.RESPONSE_BYTES.collect()[
+                (('stage', 'body'), ('view', 'posts:export'))
+            ],
+            len(content.encode())
+        )
+
+
+class WhitespaceStrippingTest(TestCase):
+    def test_strip_whitespace(self):
+        """Отступы убираются везде, кроме pre, textarea и script."""
+        source = (
+            '<div>\n    <p>\n      {{ text }}\n    </p>\n\n'
+            '    <textarea>\n  как есть\n</textarea>\n'
+            '  <PRE>  a\n   b</PRE>\n'
+            '  <script>\n  var x;\n</script>\n</div>\n'
+        )
+        self.assertEqual(strip_whitespace(source), (
+            '<div>\n<p>\n{{ text }}\n</p>\n'
+            '<textarea>\n  как есть\n</textarea>\n'
+            '<PRE>  a\n   b</PRE>\n'
+            '<script>\n  var x;\n</script>\n</div>'
+        ))
+
+    def test_templates_loaded_stripped(self):
+        source = get_template('posts/index.html').template.source
+        self.assertNotIn('\n ', source)
+        self.assertNotIn('\n\n', source)
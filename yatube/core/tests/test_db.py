@@ -0,0 +1,38 @@
+from http import HTTPStatus
+from unittest import mock
+
+from django.db import DatabaseError, connection
+from django.test import TestCase, Client
+
+
+class DatabaseSettingsTest(TestCase):
+    def test_sqlite_pragmas_applied(self):
+        """Соединение SQLite открывается с настройками из SQLITE_PRAGMAS."""
+        pragmas = {'synchronous': 1, 'busy_timeout': 20000}
+        with connection.cursor() as cursor:
+            for name, expected in pragmas.items():
+                with self.subTest(pragma=name):
+                    cursor.execute(f'PRAGMA {name}')
+                    self.assertEqual(cursor.fetchone()[0], expected)
+
+    def test_health(self):
+        """Проверка готовности отвечает 200, пока база доступна."""
+        response = Client().get('/health/')
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.json()['status'], 'ok')
+        self.assertEqual(
+            response.json()['databases']['default']['status'], 'ok'
+        )
+
+    def test_health_database_down(self):
+        """Недоступная база превращает ответ в 503."""
+        with mock.patch.object(
+            connection, 'cursor', side_effect=DatabaseError
+        ):
+            response = Client().get('/health/')
+        self.assertEqual(
+            response.status_code, HTTPStatus.SERVICE_UNAVAILABLE
+        )
+        self.assertEqual(response.json()['databases']['default'], {
+            'status': 'error'
+        })
@@ -0,0 +1,86 @@
+from http import HTTPStatus
+
+from django.core.cache import caches
+from django.test import TestCase, Client, override_settings
+from core import metrics
+from posts.models import Post, User
+
+
+class RequestMetricsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        Post.objects.create(author=cls.author, text='Тестовый пост')
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        metrics.reset()
+        self.guest_client = Client()
+
+    def series(self, histogram, view):
+        return histogram.collect().get((('view', view),))
+
+    @override_settings(METRICS_SAMPLE_RATE=1)
+    def test_sampled_request(self):
+        """Замеряемый запрос получает Server-Timing и все гистограммы."""
+        response = self.guest_client.get('/profile/author/')
+        self.assertRegex(
+            response['Server-Timing'],
+            r'^db;desc="\d+ queries";dur=[\d.]+, tpl;dur=[\d.]+, '
+            r'total;dur=[\d.]+$'
+        )
+        for histogram in metrics.REGISTRY:
+            with self.subTest(histogram=histogram.name):
+                self.assertEqual(
+                    self.series(histogram, 'posts:profile')[-1], 1
+                )
+        queries = self.series(metrics.DB_QUERIES, 'posts:profile')[-2]
+        self.assertIn(f'db;desc="{queries} queries"',
+                      response['Server-Timing'])
+        self.assertGreater(
+            self.series(metrics.TEMPLATE_DURATION, 'posts:profile')[-2], 0
+        )
+
+    @override_settings(METRICS_SAMPLE_RATE=0)
+    def test_unsampled_request(self):
+        """Без выборки пишется только время обработки запроса."""
+        response = self.guest_client.get('/')
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(
+            self.series(metrics.REQUEST_DURATION, 'posts:index')[-1], 1
+        )
+        self.assertIsNone(self.series(metrics.DB_QUERIES, 'posts:index'))
+
+    def test_nested_templates_counted_once(self):
+        """Вложенная отрисовка не добавляет время повторно."""
+        stats = metrics.RequestStats()
+        with metrics.collecting(stats):
+            with metrics.template_timer():
+                with metrics.template_timer():
+                    pass
+                outer = stats.template_time
+        self.assertEqual(outer, 0)
+        self.assertGreater(stats.template_time, 0)
+
+    def test_prometheus_endpoint(self):
+        """Метрики отдаются в формате Prometheus только локально."""
+        self.guest_client.get('/')
+        response = self.guest_client.get('/metrics')
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4')
+        content = response.content.decode()
+        self.assertIn(
+            '# TYPE yatube_request_duration_seconds histogram', content
+        )
+        self.assertIn(
+            'yatube_request_duration_seconds_count{view="posts:index"} 1',
+            content
+        )
+        self.assertIn(
+            'yatube_request_duration_seconds_bucket'
+            '{view="posts:index",le="+Inf"} 1',
+            content
+        )
+        response = self.guest_client.get('/metrics', REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
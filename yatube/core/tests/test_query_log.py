@@ -0,0 +1,101 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.template import engines
+from django.test import TestCase, Client, override_settings
+from core.query_log import QueryInspector, shape
+from posts.models import Post, User
+
+
+class QueryLogTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        for user in (cls.author, cls.reader, cls.author):
+            Post.objects.create(author=user, text='Тестовый пост')
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+
+    def test_shape_ignores_values(self):
+        """Запросы, отличающиеся только значениями, имеют одну форму."""
+        self.assertEqual(
+            shape('SELECT * FROM t WHERE id IN (%s, %s) LIMIT 21'),
+            shape('SELECT * FROM t WHERE id IN (%s) LIMIT 5')
+        )
+
+    def test_duplicates_found_in_template(self):
+        """N+1 в шаблоне отмечается со строкой шаблона."""
+        template = engines['django'].from_string(
+            '{% for post in posts %}\n'
+            '{{ post.author.get_full_name }}\n'
+            '{% endfor %}'
+        )
+        inspector = QueryInspector(slow_ms=1000, duplicates=3)
+        with connection.execute_wrapper(inspector):
+            template.render({'posts': Post.objects.all()})
+        duplicates = [
+            event for event in inspector.findings()
+            if event['event'] == 'duplicate_query'
+        ]
+        self.assertEqual(len(duplicates), 1)
+        self.assertEqual(duplicates[0]['count'], 3)
+        self.assertTrue(duplicates[0]['template'].endswith(':2'))
+        self.assertIn('auth_user', duplicates[0]['sql'])
+
+    def test_single_query_reported_as_duplicate(self):
+        """При пороге повторов 1 каждая форма получает место вызова."""
+        inspector = QueryInspector(slow_ms=1000, duplicates=1)
+        with connection.execute_wrapper(inspector):
+            list(Post.objects.all())
+        events = inspector.findings()
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]['count'], 1)
+        self.assertTrue(events[0]['code'].startswith('core/tests/'))
+
+    @override_settings(QUERY_LOG_ENABLED=True, QUERY_LOG_SLOW_MS=0)
+    def test_middleware_logs_slow_queries(self):
+        """Медленные запросы пишутся в журнал с представлением и кодом."""
+        with self.assertLogs('yatube.queries', 'WARNING') as logs:
+            Client().get('/profile/author/')
+        events = [record.data for record in logs.records]
+        self.assertTrue(all(
+            event['view'] == 'posts:profile' for event in events
+        ))
+        self.assertTrue(any(
+            event['code'] and event['code'].startswith('posts/')
+            for event in events
+        ))
+
+    def test_disabled_by_default(self):
+        """Без QUERY_LOG_ENABLED журнал не пишется."""
+        with self.assertRaises(AssertionError):
+            with self.assertLogs('yatube.queries', 'WARNING'):
+                Client().get('/profile/author/')
+
+    def test_report(self):
+        """Сводка группирует события журнала и его ротированных копий."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'queries.log')
+        event = {
+            'event': 'duplicate_query', 'sql': 'SELECT 1', 'count': 5,
+            'total_ms': 2.5, 'template': 'posts/index.html:3',
+            'code': None, 'view': 'posts:index',
+        }
+        for name in (path, path + '.1'):
+            with open(name, 'w', encoding='utf-8') as log:
+                log.write(json.dumps(event) + '\n')
+        output = StringIO()
+        call_command('query_report', log=path, stdout=output)
+        self.assertIn('2 раз в ответах, 10 запросов', output.getvalue())
+        self.assertIn('posts/index.html:3', output.getvalue())
@@ -0,0 +1,106 @@
+import os
+import shutil
+import tempfile
+from contextlib import ExitStack
+from io import StringIO
+
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connections
+from django.test import (
+    Client, SimpleTestCase, TransactionTestCase, override_settings
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from core.routing import STICKY_COOKIE, ReplicaSelector
+from posts.models import Post, User
+
+REPLICAS = ['replica_1', 'replica_2']
+
+
+@override_settings(
+    DATABASE_REPLICAS=REPLICAS,
+    PAGE_CACHE_ENABLED=False,
+    REPLICA_SELECTION='round_robin',
+)
+class ReplicaRoutingTest(TransactionTestCase):
+    """Две реплики - файлы SQLite, скопированные с основной базы."""
+
+    databases = {'default', *REPLICAS}
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        for alias in REPLICAS:
+            connections.databases[alias] = dict(
+                connections.databases['default'],
+                NAME=os.path.join(cls.directory, f'{alias}.sqlite3'),
+            )
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        for alias in REPLICAS:
+            connections[alias].close()
+            del connections.databases[alias]
+            delattr(connections._connections, alias)
+        shutil.rmtree(cls.directory)
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.author = User.objects.create_user(username='author')
+        self.post = Post.objects.create(author=self.author, text='Старый пост')
+        call_command('sync_replicas', stdout=StringIO())
+        self.guest_client = Client()
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+
+    def replica_queries(self, client, address):
+        with ExitStack() as stack:
+            contexts = [
+                stack.enter_context(CaptureQueriesContext(connections[alias]))
+                for alias in REPLICAS
+            ]
+            client.get(address)
+        return [len(context.captured_queries) for context in contexts]
+
+    def test_read_views_use_replicas_in_turn(self):
+        """Ленты читаются с реплик по очереди."""
+        first = self.replica_queries(self.guest_client, '/')
+        second = self.replica_queries(self.guest_client, '/')
+        self.assertEqual(sorted([bool(count) for count in first]),
+                         [False, True])
+        self.assertNotEqual(first.index(0), second.index(0))
+
+    def test_write_views_use_primary(self):
+        """Создание поста не обращается к репликам."""
+        self.assertEqual(
+            self.replica_queries(self.author_client, '/create/'), [0, 0]
+        )
+
+    def test_author_sees_own_post(self):
+        """После записи автор читает с основной базы, гость - с реплики."""
+        response = self.author_client.post(
+            reverse('posts:post_create'), data={'text': 'Новый пост'}
+        )
+        self.assertIn(STICKY_COOKIE, response.cookies)
+        self.assertContains(self.author_client.get('/'), 'Новый пост')
+        self.assertEqual(
+            self.replica_queries(self.author_client, '/'), [0, 0]
+        )
+        # реплики ещё не догнали основную базу
+        self.assertNotContains(self.guest_client.get('/'), 'Новый пост')
+
+
+class ReplicaSelectorTest(SimpleTestCase):
+    @override_settings(REPLICA_SELECTION='least_loaded')
+    def test_least_loaded(self):
+        """Выбирается реплика с наименьшим числом запросов в работе."""
+        selector = ReplicaSelector()
+        first = selector.acquire(REPLICAS)
+        second = selector.acquire(REPLICAS)
+        self.assertNotEqual(first, second)
+        selector.release(first)
+        self.assertEqual(selector.acquire(REPLICAS), first)
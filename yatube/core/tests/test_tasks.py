@@ -0,0 +1,120 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from core import tasks
+from core.models import Task
+from posts.models import Post
+from posts.search import SYNC_TASK, SearchResults
+
+User = get_user_model()
+
+calls = []
+
+
+@tasks.task('tests.record')
+def record(value):
+    calls.append(value)
+
+
+@tasks.task('tests.record_batch', batch=True)
+def record_batch(values):
+    calls.append(values)
+
+
+@tasks.task('tests.fail')
+def fail():
+    raise ValueError('сбой задачи')
+
+
+@override_settings(TASKS_MODE='worker')
+class TaskQueueTest(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    @override_settings(TASKS_MODE='eager')
+    def test_eager(self):
+        """В режиме eager задача выполняется сразу и не пишется в БД."""
+        tasks.enqueue('tests.record', 1)
+        self.assertEqual(calls, [1])
+        self.assertFalse(Task.objects.exists())
+
+    def test_worker_runs_batches(self):
+        """Задачи с batch=True одного имени выполняются одним вызовом."""
+        for value in (1, 2, 3):
+            tasks.enqueue('tests.record_batch', value)
+        tasks.enqueue('tests.record', 4)
+        self.assertEqual(calls, [])
+        self.assertEqual(tasks.run_pending(), 4)
+        self.assertEqual(calls, [[1, 2, 3], 4])
+        self.assertFalse(Task.objects.exists())
+
+    def test_coalesce_by_key(self):
+        """Задача с ключом, ещё не взятая воркером, не дублируется."""
+        tasks.enqueue('tests.record', 1, key='same')
+        tasks.enqueue('tests.record', 1, key='same')
+        self.assertEqual(Task.objects.count(), 1)
+        tasks.claim(10)
+        tasks.enqueue('tests.record', 1, key='same')
+        self.assertEqual(Task.objects.count(), 2)
+
+    @override_settings(TASKS_MAX_ATTEMPTS=2)
+    def test_retry_then_fail(self):
+        """Упавшая задача откладывается, а после всех попыток - failed."""
+        tasks.enqueue('tests.fail')
+        with self.assertLogs('core.tasks', 'ERROR'):
+            tasks.run_pending()
+        task = Task.objects.get()
+        self.assertEqual(task.attempts, 1)
+        self.assertFalse(task.failed)
+        self.assertEqual(task.locked_by, '')
+        self.assertGreater(task.run_after, timezone.now())
+        self.assertIn('сбой задачи', task.last_error)
+        self.assertEqual(tasks.run_pending(), 0)
+        Task.objects.update(run_after=timezone.now())
+        with self.assertLogs('core.tasks', 'ERROR'):
+            tasks.run_pending()
+        task.refresh_from_db()
+        self.assertTrue(task.failed)
+        Task.objects.update(run_after=timezone.now() - timedelta(days=1))
+        self.assertEqual(tasks.run_pending(), 0)
+
+    def test_expired_lease(self):
+        """Задачу упавшего воркера берёт другой после TASKS_LEASE."""
+        tasks.enqueue('tests.record', 1)
+        self.assertEqual(len(tasks.claim(10)), 1)
+        self.assertEqual(tasks.claim(10), [])
+        Task.objects.update(locked_until=timezone.now() - timedelta(1))
+        self.assertEqual(tasks.run_pending(), 1)
+        self.assertEqual(calls, [1])
+
+    def test_post_indexed_by_worker(self):
+        """Пост попадает в поиск после выполнения задач командой run_tasks."""
+        author = User.objects.create_user(username='author')
+        post = Post.objects.create(author=author, text='Фоновая задача')
+        post.text = 'Фоновая индексация'
+        post.save()
+        self.assertEqual(
+            Task.objects.filter(name=SYNC_TASK).count(), 1
+        )
+        self.assertEqual(SearchResults('индексация').count(), 0)
+        out = StringIO()
+        call_command('run_tasks', '--once', stdout=out)
+        self.assertIn('Выполнено задач: 1', out.getvalue())
+        self.assertEqual(SearchResults('индексация').count(), 1)
+        post.delete()
+        call_command('run_tasks', '--once', stdout=StringIO())
+        self.assertEqual(SearchResults('индексация').count(), 0)
+
+    def test_thread_started_by_request(self):
+        """В режиме thread поток запускается первым запросом процесса."""
+        with mock.patch.object(tasks, 'ensure_thread') as ensure:
+            self.client.get('/')
+            ensure.assert_not_called()
+            with override_settings(TASKS_MODE='thread'):
+                self.client.get('/')
+            ensure.assert_called_once_with()
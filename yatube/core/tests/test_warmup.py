@@ -0,0 +1,56 @@
+import copy
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from django.conf import settings
+from django.template import engines
+from django.test import SimpleTestCase, override_settings
+from core import warmup
+
+CACHED_TEMPLATES = copy.deepcopy(settings.TEMPLATES)
+CACHED_TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', settings.TEMPLATE_LOADERS),
+]
+
+
+class TemplateWarmupTest(SimpleTestCase):
+    def test_template_names(self):
+        """Прогрев проходит все шаблоны posts, users, about и includes."""
+        names = list(warmup.template_names(settings.TEMPLATES_DIR))
+        for name in ('base.html', 'posts/index.html', 'users/login.html',
+                     'about/tech.html', 'includes/header.html',
+                     'posts/includes/paginator.html'):
+            with self.subTest(name=name):
+                self.assertIn(name, names)
+
+    @override_settings(TEMPLATES=CACHED_TEMPLATES)
+    def test_warm_up_fills_cached_loader(self):
+        """После прогрева кэширующий загрузчик хранит все шаблоны."""
+        compiled = warmup.warm_up()
+        loader = engines['django'].engine.template_loaders[0]
+        names = set(warmup.template_names(settings.TEMPLATES_DIR))
+        self.assertEqual(compiled, len(names))
+        self.assertEqual(set(loader.get_template_cache), names)
+
+
+class ColdStartTest(SimpleTestCase):
+    def test_cold_request(self):
+        """Холодный запрос в новом процессе отдаёт статус и время."""
+        with tempfile.TemporaryDirectory() as directory:
+            env = dict(
+                os.environ,
+                DJANGO_SETTINGS_MODULE='yatube.settings_production',
+                DATABASE_NAME=os.path.join(directory, 'db.sqlite3'),
+                SECRET_KEY='cold-start',
+            )
+            result = subprocess.run(
+                [sys.executable, '-m', 'core.coldstart', '/about/tech/'],
+                cwd=settings.BASE_DIR, env=env, capture_output=True,
+                text=True, check=True
+            )
+        sample = json.loads(result.stdout.splitlines()[-1])
+        self.assertEqual(sample['status'], 200)
+        self.assertGreater(sample['first_byte_ms'], sample['ready_ms'])
@@ -0,0 +1,35 @@
+from http import HTTPStatus
+
+from django.conf import settings
+from django.http import Http404, HttpResponse, JsonResponse
+
+from core import metrics
+from core.db import check_databases
+
+
+def prometheus_metrics(request):
+    """Метрики процесса для Prometheus, только с локальных адресов."""
+    if request.META.get('REMOTE_ADDR') not in settings.METRICS_ALLOWED_IPS:
+        raise Http404
+    return HttpResponse(
+        metrics.expose(), content_type='text/plain; version=0.0.4'
+    )
+
+
+def health(request):
+    """Проверка готовности: отвечают ли все базы данных."""
+    databases = check_databases()
+    healthy = all(latency is not None for latency in databases.values())
+    return JsonResponse(
+        {
+            'status': 'ok' if healthy else 'error',
+            'databases': {
+                alias: (
+                    {'status': 'ok', 'latency_ms': round(latency, 2)}
+                    if latency is not None else {'status': 'error'}
+                )
+                for alias, latency in databases.items()
+            },
+        },
+        status=HTTPStatus.OK if healthy else HTTPStatus.SERVICE_UNAVAILABLE
+    )
@@ -0,0 +1,37 @@
+"""Компиляция шаблонов проекта при старте процесса."""
+import logging
+import os
+
+from django.template import TemplateSyntaxError, engines
+
+logger = logging.getLogger(__name__)
+
+
+def template_names(directory):
+    """Имена всех шаблонов .html в каталоге и его подкаталогах."""
+    for root, _, files in sorted(os.walk(directory)):
+        for name in sorted(files):
+            if name.endswith('.html'):
+                path = os.path.relpath(os.path.join(root, name), directory)
+                yield path.replace(os.sep, '/')
+
+
+def warm_up():
+    """Компилирует шаблоны из DIRS движка django.
+
+    С кэширующим загрузчиком первые запросы после старта получают
+    готовые шаблоны и не тратят время на разбор. Шаблон с ошибкой
+    пишется в журнал и не останавливает запуск. Возвращает число
+    скомпилированных шаблонов.
+    """
+    engine = engines['django']
+    compiled = 0
+    for directory in engine.dirs:
+        for name in template_names(directory):
+            try:
+                engine.get_template(name)
+            except TemplateSyntaxError:
+                logger.exception('Шаблон %s не компилируется', name)
+            else:
+                compiled += 1
+    return compiled
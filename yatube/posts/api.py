@@ -0,0 +1,134 @@
+"""Ленты в JSON для мобильных клиентов.
+
+Посты читаются через values_list без создания экземпляров моделей и
+выводятся только с полями из ?fields=.
+"""
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+
+from posts import counters, groups
+from posts.models import Post, User
+from posts.paginators import CursorPaginator
+
+# поля поста в ответе: имя -> путь для values_list
+POST_FIELDS = {
+    'id': 'pk',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'author': 'author__username',
+    'author_first_name': 'author__first_name',
+    'author_last_name': 'author__last_name',
+    'group': 'group__slug',
+    'group_title': 'group__title',
+}
+# ключ курсора читается всегда, даже если его нет в ?fields=
+CURSOR_FIELDS = ('pk', 'pub_date')
+GROUP_FIELDS = ('slug', 'title', 'description')
+
+
+class ApiError(ValueError):
+    """Некорректные параметры запроса к API."""
+
+
+def parse_fields(value):
+    """Поля поста из ?fields=, по умолчанию все."""
+    if not value:
+        return list(POST_FIELDS)
+    fields = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in fields if name not in POST_FIELDS]
+    if unknown:
+        raise ApiError(f'неизвестные поля: {", ".join(unknown)}')
+    return fields
+
+
+class PostRows:
+    """Строки постов и их перевод в словари выбранных полей."""
+
+    def __init__(self, fields):
+        self.fields = fields
+        self.columns = list(CURSOR_FIELDS) + [
+            POST_FIELDS[name] for name in fields
+            if POST_FIELDS[name] not in CURSOR_FIELDS
+        ]
+        self.positions = [
+            self.columns.index(POST_FIELDS[name]) for name in fields
+        ]
+
+    def queryset(self, queryset):
+        return queryset.values_list(*self.columns, named=True)
+
+    def serialize(self, rows):
+        return [
+            dict(zip(self.fields, [row[i] for i in self.positions]))
+            for row in rows
+        ]
+
+
+def feed(request, queryset):
+    """Страница ленты по курсору ?after=/?before= с полями ?fields=."""
+    rows = PostRows(parse_fields(request.GET.get('fields')))
+    page = CursorPaginator(
+        rows.queryset(queryset), settings.PER_PAGE
+    ).get_page(
+        after=request.GET.get('after'), before=request.GET.get('before')
+    )
+    return {
+        'posts': rows.serialize(page.object_list),
+        'next': page.next_cursor,
+        'previous': page.previous_cursor,
+    }
+
+
+def get_group(slug):
+    """Первичный ключ и поля группы из справочника групп или None."""
+    group = groups.get_by_slug(slug)
+    if group is None:
+        return None
+    fields = {field: getattr(group, field) for field in GROUP_FIELDS}
+    fields['posts_count'] = counters.group_posts_count(group.pk)
+    return group.pk, fields
+
+
+def get_author(username):
+    """Автор с числом постов из счётчика или None."""
+    author = User.objects.filter(username=username).values_list(
+        'pk', 'username', 'first_name', 'last_name', 'stats__posts_count',
+        named=True
+    ).first()
+    if author is None:
+        return None
+    return author.pk, {
+        'username': author.username,
+        'first_name': author.first_name,
+        'last_name': author.last_name,
+        'posts_count': author.stats__posts_count or 0,
+    }
+
+
+def get_post(post_id, fields):
+    """Пост с выбранными полями и числом постов его автора или None."""
+    rows = PostRows(fields)
+    row = Post.objects.filter(pk=post_id).values_list(
+        *rows.columns, 'author__stats__posts_count', named=True
+    ).first()
+    if row is None:
+        return None
+    return {
+        'post': rows.serialize([row])[0],
+        'author_posts_count': row.author__stats__posts_count or 0,
+    }
+
+
+def json_response(data, status=200):
+    """Компактный JSON; сжимает его CompressionMiddleware."""
+    content = json.dumps(
+        data, cls=DjangoJSONEncoder, ensure_ascii=False,
+        separators=(',', ':')
+    )
+    return HttpResponse(
+        content.encode(), status=status,
+        content_type='application/json; charset=utf-8'
+    )
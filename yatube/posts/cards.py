@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+
+CARD_TEMPLATE = 'posts/includes/post_card.html'
+# сколько ключей удалять из кэша за один вызов
+INVALIDATE_CHUNK = 500
+
+
+def card_key(post_id, updated_at):
+    """Ключ карточки поста с временем его изменения.
+
+    Исправленный пост получает новый ключ во всех процессах, поэтому
+    сбрасывать карточки нужно только при смене имени автора или группы.
+    """
+    return f'post_card:{post_id}:{updated_at.isoformat()}'
+
+
+def render_cards(posts):
+    """Возвращает HTML карточек постов, дорисовывая недостающие в кэше."""
+    posts = list(posts)
+    keys = [card_key(post.pk, post.updated_at) for post in posts]
+    cached = cache.get_many(keys, version=settings.POST_CARD_VERSION)
+    missing = {}
+    cards = []
+    for key, post in zip(keys, posts):
+        card = cached.get(key)
+        if card is None:
+            card = render_to_string(CARD_TEMPLATE, {'post': post})
+            missing[key] = card
+        cards.append(card)
+    if missing:
+        cache.set_many(
+            missing,
+            settings.POST_CARD_TIMEOUT,
+            version=settings.POST_CARD_VERSION
+        )
+    return cards
+
+
+def invalidate(posts):
+    """Удаляет из кэша карточки постов по парам (id, updated_at)."""
+    keys = []
+    for post_id, updated_at in posts:
+        keys.append(card_key(post_id, updated_at))
+        if len(keys) == INVALIDATE_CHUNK:
+            cache.delete_many(keys, version=settings.POST_CARD_VERSION)
+            keys = []
+    if keys:
+        cache.delete_many(keys, version=settings.POST_CARD_VERSION)
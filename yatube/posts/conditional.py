@@ -0,0 +1,85 @@
+import hashlib
+
+from django.views.decorators.http import condition
+
+from posts import groups, page_cache
+from posts.models import Post
+
+
+def newest_change(queryset):
+    """Время последнего изменения постов выборки (по индексу updated_at)."""
+    return queryset.order_by('-updated_at').values_list(
+        'updated_at', flat=True
+    ).first()
+
+
+def index_posts():
+    return Post.objects.all()
+
+
+def group_posts(slug):
+    group = groups.get_by_slug(slug)
+    if group is None:
+        return Post.objects.none()
+    return Post.objects.filter(group_id=group.pk)
+
+
+def profile_posts(username):
+    return Post.objects.filter(author__username=username)
+
+
+def post_state(post_id):
+    """Всё, что страница поста выводит о посте, авторе и группе."""
+    return Post.objects.filter(pk=post_id).values_list(
+        'updated_at', 'author__username', 'author__first_name',
+        'author__last_name', 'author__stats__posts_count', 'group__slug',
+        'group__title'
+    ).first()
+
+
+def conditional_feed(get_posts, feed_template=None):
+    """Отвечает 304, если посты страницы не менялись с прошлого запроса.
+
+    Last-Modified выдаётся только анонимам: шапка страницы зависит от
+    пользователя, поэтому его id входит в ETag. Версия ленты из кэша
+    страниц учитывает удалённые посты, которых нет в updated_at.
+    """
+    def newest(request, kwargs):
+        if not hasattr(request, '_newest_change'):
+            request._newest_change = newest_change(get_posts(**kwargs))
+        return request._newest_change
+
+    def last_modified(request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return None
+        return newest(request, kwargs)
+
+    def etag(request, *args, **kwargs):
+        changed = newest(request, kwargs)
+        if changed is None:
+            return None
+        parts = [changed.isoformat(), str(request.user.pk)]
+        if feed_template is not None:
+            parts += page_cache.feed_versions(feed_template.format(**kwargs))
+        parts.append(request.GET.urlencode())
+        return hashlib.md5('|'.join(parts).encode()).hexdigest()
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
+
+
+def conditional_post(view):
+    """Отвечает 304, если страница поста post_id не менялась.
+
+    Страница выводит имя автора и число его постов, у которых нет
+    времени изменения, поэтому они входят в ETag, а Last-Modified не
+    выдаётся.
+    """
+    def etag(request, post_id):
+        state = post_state(post_id)
+        if state is None:
+            return None
+        parts = [str(value) for value in state]
+        parts += [str(request.user.pk), request.GET.urlencode()]
+        return hashlib.md5('|'.join(parts).encode()).hexdigest()
+
+    return condition(etag_func=etag)(view)
@@ -0,0 +1,93 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F
+
+from core.db import estimate_rows
+from posts import page_cache
+from posts.models import AuthorStats, GroupStats, Post
+
+
+def _shift(queryset, delta):
+    # сбитый счётчик не уходит в минус, его чинит rebuild_counters
+    if delta < 0:
+        queryset = queryset.filter(posts_count__gte=-delta)
+    return queryset.update(posts_count=F('posts_count') + delta)
+
+
+def shift_author(author_id, delta):
+    """Сдвигает счётчик постов автора на delta."""
+    stats = AuthorStats.objects.filter(author_id=author_id)
+    if not _shift(stats, delta) and delta > 0:
+        AuthorStats.objects.get_or_create(author_id=author_id)
+        _shift(stats, delta)
+
+
+def shift_group(group_id, delta):
+    """Сдвигает счётчик постов группы на delta."""
+    if group_id is None:
+        return
+    stats = GroupStats.objects.filter(group_id=group_id)
+    if not _shift(stats, delta) and delta > 0:
+        GroupStats.objects.get_or_create(group_id=group_id)
+        _shift(stats, delta)
+
+
+def author_posts_count(author):
+    """Число постов автора, загруженного с select_related('stats')."""
+    try:
+        return author.stats.posts_count
+    except AuthorStats.DoesNotExist:
+        return 0
+
+
+def group_posts_count(group_id):
+    """Число постов группы из счётчика."""
+    return GroupStats.objects.filter(group_id=group_id).values_list(
+        'posts_count', flat=True
+    ).first() or 0
+
+
+def group_posts_counts():
+    """Счётчики постов всех групп: id группы -> число постов."""
+    return dict(GroupStats.objects.values_list('group_id', 'posts_count'))
+
+
+def approximate_count(feed, queryset):
+    """Число постов ленты feed без точного COUNT(*) на каждый запрос.
+
+    Значение живёт в кэше страниц APPROXIMATE_COUNT_TIMEOUT секунд.
+    Для ленты без фильтров берётся оценка из статистики БД, если она
+    не меньше APPROXIMATE_COUNT_MIN_ROWS, иначе считается COUNT(*).
+    """
+    cache = page_cache.get_cache()
+    key = f'count:{feed}'
+    count = cache.get(key)
+    if count is not None:
+        return count
+    if not queryset.query.where:
+        count = estimate_rows(queryset.model, queryset.db)
+        if count is not None and count < settings.APPROXIMATE_COUNT_MIN_ROWS:
+            count = None
+    if count is None:
+        count = queryset.count()
+    cache.set(key, count, settings.APPROXIMATE_COUNT_TIMEOUT)
+    return count
+
+
+def rebuild():
+    """Пересчитывает все счётчики по таблице постов."""
+    with transaction.atomic():
+        GroupStats.objects.all().delete()
+        GroupStats.objects.bulk_create(
+            GroupStats(group_id=row['group'], posts_count=row['total'])
+            for row in Post.objects.exclude(group=None).order_by().values(
+                'group'
+            ).annotate(total=Count('pk'))
+        )
+        AuthorStats.objects.all().delete()
+        AuthorStats.objects.bulk_create(
+            AuthorStats(author_id=row['author'], posts_count=row['total'])
+            for row in Post.objects.order_by().values('author').annotate(
+                total=Count('pk')
+            )
+        )
@@ -1,8 +1,10 @@
 from django import forms
 from posts.models import Post
+from posts.widgets import GroupAutocomplete
 
 
 class PostForm(forms.ModelForm):
     class Meta:
         model = Post
         fields = ('text', 'group')
+        widgets = {'group': GroupAutocomplete}
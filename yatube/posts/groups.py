@@ -0,0 +1,145 @@
+"""Справочник групп в памяти процесса.
+
+Группы меняются редко, а нужны на каждой странице группы и в подсказках
+формы поста. Поэтому все группы загружаются одним запросом и хранятся
+в памяти процесса. Версия справочника лежит в общем кэше
+GROUP_CACHE_ALIAS: её сдвигает только сохранение и удаление групп, и
+каждый процесс перечитывает группы, увидев новую версию. Версия живёт
+GROUP_DIRECTORY_TIMEOUT секунд, поэтому с кэшем одного процесса (locmem)
+справочники других процессов отстают не дольше этого срока, а группа,
+которой нет в справочнике, дочитывается из БД вместе с ним.
+
+Счётчик постов группы меняется с каждым постом и в справочник не
+входит: его читает counters.group_posts_count.
+"""
+import bisect
+import sys
+import threading
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+
+from posts.models import Group
+
+VERSION_KEY = 'groups_version'
+# поля группы, которые хранит справочник
+GROUP_FIELDS = ('pk', 'slug', 'title', 'description')
+
+_lock = threading.Lock()
+_directory = None
+
+
+class GroupDirectory:
+    """Снимок всех групп: по slug, по id и списком по названию.
+
+    Экземпляры Group общие для всех потоков процесса и не должны
+    изменяться.
+    """
+
+    def __init__(self, version, groups):
+        self.version = version
+        self.groups = sorted(groups, key=lambda group: group.title.lower())
+        # названия в нижнем регистре в том же порядке - индекс префиксов
+        self.titles = [group.title.lower() for group in self.groups]
+        self.by_slug = {group.slug: group for group in self.groups}
+        self.by_pk = {group.pk: group for group in self.groups}
+
+    def search(self, prefix, offset=0, limit=None):
+        """Группы, название которых начинается с prefix, и их общее число.
+
+        Границы диапазона находятся двоичным поиском по отсортированным
+        названиям, поэтому время не зависит от числа групп.
+        """
+        prefix = prefix.lower()
+        start = bisect.bisect_left(self.titles, prefix)
+        end = bisect.bisect_left(self.titles, prefix + chr(sys.maxunicode))
+        first = min(start + offset, end)
+        last = end if limit is None else min(first + limit, end)
+        return self.groups[first:last], end - start
+
+
+def get_cache():
+    return caches[settings.GROUP_CACHE_ALIAS]
+
+
+def current_version():
+    """Версия справочника в общем кэше, при отсутствии заводится новая."""
+    cache = get_cache()
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(
+            VERSION_KEY, uuid.uuid4().hex, settings.GROUP_DIRECTORY_TIMEOUT
+        )
+        version = cache.get(VERSION_KEY, '')
+    return version
+
+
+def load(version):
+    groups = [
+        Group(**row) for row in Group.objects.values(*GROUP_FIELDS)
+    ]
+    return GroupDirectory(version, groups)
+
+
+def get_directory():
+    """Справочник групп, перечитанный, если сменилась его версия.
+
+    Версия читается до загрузки групп, поэтому изменение, случившееся
+    во время загрузки, вызовет ещё одну перезагрузку при следующем
+    обращении, а не потеряется.
+    """
+    global _directory
+    version = current_version()
+    directory = _directory
+    if directory is not None and directory.version == version:
+        return directory
+    with _lock:
+        if _directory is None or _directory.version != version:
+            _directory = load(version)
+        return _directory
+
+
+def reload():
+    """Перечитывает справочник процесса, не сдвигая общую версию."""
+    global _directory
+    with _lock:
+        _directory = load(current_version())
+        return _directory
+
+
+def get_groups():
+    """Все группы по названию."""
+    return get_directory().groups
+
+
+def get_by_slug(slug):
+    """Группа по slug или None.
+
+    Если группы нет в справочнике, но она есть в БД, справочник процесса
+    отстал от созданной группы и перечитывается.
+    """
+    group = get_directory().by_slug.get(slug)
+    if group is None and Group.objects.filter(slug=slug).exists():
+        group = reload().by_slug.get(slug)
+    return group
+
+
+def get_by_pk(pk):
+    """Группа по id или None, отставший справочник перечитывается."""
+    group = get_directory().by_pk.get(pk)
+    if group is None and Group.objects.filter(pk=pk).exists():
+        group = reload().by_pk.get(pk)
+    return group
+
+
+def search(prefix, offset=0, limit=None):
+    """Группы по началу названия, см. GroupDirectory.search."""
+    return get_directory().search(prefix, offset, limit)
+
+
+def invalidate():
+    """Сдвигает версию справочника во всех процессах."""
+    get_cache().set(
+        VERSION_KEY, uuid.uuid4().hex, settings.GROUP_DIRECTORY_TIMEOUT
+    )
@@ -0,0 +1,100 @@
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from posts import search
+from posts.models import Post
+
+User = get_user_model()
+
+VOCABULARY = (
+    'город', 'река', 'дорога', 'книга', 'письмо', 'утро', 'вечер', 'лето',
+    'зима', 'друг', 'работа', 'дом', 'окно', 'море', 'лес', 'поезд',
+    'музыка', 'история', 'вопрос', 'ответ', 'новый', 'старый', 'тихий',
+    'быстрый', 'светлый', 'читать', 'писать', 'гулять', 'думать', 'ждать',
+    'смотреть', 'говорить', 'помнить', 'строить', 'вернуться', 'собака',
+    'кошка', 'птица', 'солнце', 'дождь', 'ветер', 'снег', 'небо', 'поле',
+)
+FORMS = ('', 'а', 'ы', 'ом', 'ами', 'ах', 'ой', 'ие', 'ого', 'ла', 'ли')
+QUERIES = ('город', 'старые книги', 'вечером гуляли', 'дождь ветер снег')
+BATCH = 5000
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает поиск по индексу с поиском через icontains на '
+        'временной базе с заданным числом постов'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1000000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def make_text(self, generator):
+        words = []
+        for _ in range(generator.randint(8, 40)):
+            word = generator.choice(VOCABULARY)
+            if word[-1] not in 'аеиоуыэюяь':
+                word += generator.choice(FORMS)
+            words.append(word)
+        return ' '.join(words).capitalize()
+
+    def fill(self, total, seed):
+        generator = random.Random(seed)
+        author = User.objects.create_user(username='bench_search')
+        for start in range(0, total, BATCH):
+            Post.objects.bulk_create(
+                Post(author=author, text=self.make_text(generator))
+                for _ in range(min(BATCH, total - start))
+            )
+        self.stdout.write(f'Создано постов: {total}')
+
+    def measure(self, function, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            function()
+            timings.append(time.perf_counter() - started)
+        return min(timings) * 1000
+
+    def report(self, query, backends, repeat):
+        def scan():
+            posts = Post.objects.filter(text__icontains=query)
+            posts.count()
+            list(posts.order_by('-pub_date', '-id')[:10])
+
+        line = [f'{query!r:24} icontains {self.measure(scan, repeat):9.1f}']
+        for name, backend in backends.items():
+            def indexed():
+                results = search.SearchResults(query, backend)
+                results.count()
+                results[0:10]
+            line.append(f'{name} {self.measure(indexed, repeat):9.1f}')
+        self.stdout.write(' мс  '.join(line) + ' мс')
+
+    def handle(self, *args, **options):
+        if options['posts'] < 1:
+            raise CommandError('Нужен хотя бы один пост')
+        creation = connection.creation
+        old_name = connection.settings_dict['NAME']
+        creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            self.fill(options['posts'], options['seed'])
+            backends = {'inverted': search.InvertedIndexBackend()}
+            if search.fts5_available():
+                backends['fts5'] = search.FTS5Backend()
+            for name, backend in backends.items():
+                started = time.perf_counter()
+                search.rebuild(backend)
+                self.stdout.write(
+                    f'Индекс {name} построен за '
+                    f'{time.perf_counter() - started:.1f} с'
+                )
+            for query in QUERIES:
+                self.report(query, backends, options['repeat'])
+        finally:
+            creation.destroy_test_db(old_name, verbosity=0)
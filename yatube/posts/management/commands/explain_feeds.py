@@ -0,0 +1,80 @@
+import itertools
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Post
+from posts.paginators import encode_cursor
+
+# полный проход таблицы без индекса или сортировка во временном B-дереве
+BAD_PLAN = re.compile(r'SCAN (TABLE )?\w+$|TEMP B-TREE')
+# лента автора или группы должна искать по индексу, а не сканировать его
+FILTERED_FEED = re.compile(r'"posts_post"\."(author|group)_id" = \d')
+FEED_SCAN = re.compile(r'SCAN (TABLE )?posts_post\b')
+# модуль sqlite3 кэширует подготовленные выражения и после смены схемы
+# отдаёт старый план, поэтому каждый EXPLAIN получает уникальный текст
+RUN_IDS = itertools.count()
+
+
+class Command(BaseCommand):
+    help = (
+        'Проверяет через EXPLAIN QUERY PLAN, что ленты posts.views '
+        'читают посты по индексу без сортировки во временном B-дереве'
+    )
+
+    def get_addresses(self):
+        post = Post.objects.exclude(group=None).select_related(
+            'author', 'group'
+        ).first()
+        if post is None:
+            raise CommandError('Нужен хотя бы один пост с группой')
+        return (
+            reverse('posts:index'),
+            reverse('posts:index') + '?page=2',
+            reverse('posts:index') + f'?after={encode_cursor(post)}',
+            reverse('posts:group_list', kwargs={'slug': post.group.slug}),
+            reverse('posts:group_list', kwargs={'slug': post.group.slug})
+            + f'?before={encode_cursor(post)}',
+            reverse(
+                'posts:profile', kwargs={'username': post.author.username}
+            ),
+            reverse('posts:post_detail', kwargs={'post_id': post.id}),
+        )
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'EXPLAIN QUERY PLAN {sql} -- {next(RUN_IDS)}'
+            )
+            return [row[-1] for row in cursor.fetchall()]
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Проверка поддерживается только для SQLite')
+        client = Client()
+        failures = []
+        for address in self.get_addresses():
+            with override_settings(
+                PAGE_CACHE_ENABLED=False, TIMELINE_ENABLED=False
+            ):
+                with CaptureQueriesContext(connection) as context:
+                    client.get(address)
+            for query in context.captured_queries:
+                if 'posts_post' not in query['sql']:
+                    continue
+                plan = self.explain(query['sql'])
+                bad = [step for step in plan if BAD_PLAN.search(step)]
+                if FILTERED_FEED.search(query['sql']):
+                    bad += [step for step in plan if FEED_SCAN.search(step)]
+                if bad:
+                    failures.append(f'{address}: {"; ".join(bad)}')
+                self.stdout.write(f'{address}\n  ' + '\n  '.join(plan))
+        if failures:
+            raise CommandError(
+                'Запросы без индекса:\n' + '\n'.join(failures)
+            )
+        self.stdout.write(self.style.SUCCESS('Все ленты читаются по индексу'))
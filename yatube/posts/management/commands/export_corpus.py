@@ -0,0 +1,61 @@
+from django.core.management.base import (
+    BaseCommand, CommandError, OutputWrapper
+)
+
+from posts.exporters import (
+    CONTENT_TYPES, EXPORT_BATCH, EXPORT_FIELDS, ExportError, ExportStats,
+    export_lines, get_queryset
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково выгружает посты, группы или профили в JSONL или CSV. '
+        'Выгрузка постов совместима с import_posts'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(EXPORT_FIELDS))
+        parser.add_argument(
+            '--format', choices=sorted(CONTENT_TYPES), default='jsonl'
+        )
+        parser.add_argument(
+            '--output', default='-', help='Файл выгрузки или - для stdout'
+        )
+        parser.add_argument('--author', help='username автора')
+        parser.add_argument('--group', help='slug группы')
+        parser.add_argument('--since', help='Посты начиная с даты')
+        parser.add_argument('--until', help='Посты по дату включительно')
+        parser.add_argument('--batch-size', type=int, default=EXPORT_BATCH)
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('Размер пакета должен быть положительным')
+        try:
+            queryset = get_queryset(
+                options['kind'],
+                author=options['author'],
+                group=options['group'],
+                since=options['since'],
+                until=options['until'],
+            )
+        except ExportError as error:
+            raise CommandError(error)
+        stats = ExportStats()
+        lines = export_lines(
+            options['kind'], options['format'], queryset,
+            options['batch_size'], stats
+        )
+        if options['output'] == '-':
+            self.write_lines(self.stdout, lines)
+        else:
+            with open(
+                options['output'], 'w', encoding='utf-8', newline=''
+            ) as output:
+                self.write_lines(OutputWrapper(output), lines)
+        # stdout может быть занят самой выгрузкой
+        self.stderr.write(f'Готово: {stats}', self.style.SUCCESS)
+
+    def write_lines(self, output, lines):
+        for line in lines:
+            output.write(line, ending='')
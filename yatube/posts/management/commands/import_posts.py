@@ -0,0 +1,121 @@
+import json
+import os
+import sys
+import time
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.importers import READERS, PostImporter, RecordError
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает посты из JSONL или CSV пакетами через bulk_create. '
+        'Поля записи: text, author (username), group (slug), pub_date. '
+        'После каждого пакета пишется контрольная точка, повторный запуск '
+        'продолжает с неё'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл с постами или - для stdin')
+        parser.add_argument('--format', choices=sorted(READERS))
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--checkpoint',
+            help='Файл контрольной точки, по умолчанию <path>.checkpoint'
+        )
+        parser.add_argument(
+            '--restart', action='store_true',
+            help='Начать сначала, не читая контрольную точку'
+        )
+        parser.add_argument(
+            '--no-index', action='store_true',
+            help='Не обновлять поисковый индекс, его перестроит '
+                 'rebuild_search_index'
+        )
+
+    def get_format(self, options):
+        if options['format']:
+            return options['format']
+        extension = os.path.splitext(options['path'])[1].lstrip('.')
+        if extension not in READERS:
+            raise CommandError('Укажите --format для этого файла')
+        return extension
+
+    def get_checkpoint_path(self, options):
+        if options['checkpoint']:
+            return options['checkpoint']
+        if options['path'] == '-':
+            return None
+        return options['path'] + '.checkpoint'
+
+    def load_checkpoint(self, path):
+        state = {'position': 0, 'imported': 0, 'skipped': 0}
+        if path and os.path.exists(path):
+            with open(path, encoding='utf-8') as checkpoint:
+                state.update(json.load(checkpoint))
+        return state
+
+    def save_checkpoint(self, path, state):
+        if path is None:
+            return
+        # запись через временный файл не оставит обрезанную точку
+        with open(path + '.tmp', 'w', encoding='utf-8') as checkpoint:
+            json.dump(state, checkpoint)
+        os.replace(path + '.tmp', path)
+
+    def open_input(self, path):
+        if path == '-':
+            return sys.stdin
+        try:
+            return open(path, encoding='utf-8', newline='')
+        except OSError as error:
+            raise CommandError(error)
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('Размер пакета должен быть положительным')
+        reader = READERS[self.get_format(options)]
+        checkpoint_path = self.get_checkpoint_path(options)
+        state = self.load_checkpoint(
+            None if options['restart'] else checkpoint_path
+        )
+        if state['position']:
+            self.stdout.write(f'Продолжение с записи {state["position"]}')
+        importer = PostImporter(index=not options['no_index'])
+        started = time.perf_counter()
+        imported = 0
+        stream = self.open_input(options['path'])
+        try:
+            records = islice(reader(stream), state['position'], None)
+            while True:
+                batch = list(islice(records, options['batch_size']))
+                if not batch:
+                    break
+                posts = []
+                for number, record in enumerate(batch, state['position'] + 1):
+                    try:
+                        posts.append(importer.build(record))
+                    except RecordError as error:
+                        state['skipped'] += 1
+                        self.stderr.write(f'Запись {number}: {error}')
+                if posts:
+                    importer.save(posts)
+                state['position'] += len(batch)
+                state['imported'] += len(posts)
+                imported += len(posts)
+                self.save_checkpoint(checkpoint_path, state)
+                rate = imported / (time.perf_counter() - started)
+                self.stdout.write(
+                    f'Импортировано: {state["imported"]}, '
+                    f'пропущено: {state["skipped"]}, {rate:.0f} постов/с'
+                )
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+            importer.finish()
+        self.stdout.write(self.style.SUCCESS(
+            f'Импорт завершён: {state["imported"]} постов, '
+            f'пропущено записей: {state["skipped"]}'
+        ))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from posts import search
+
+
+class Command(BaseCommand):
+    help = (
+        'Перестраивает индекс полнотекстового поиска по постам. Нужна '
+        'после migrate базы с постами, написанными до появления поиска'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--backend', choices=('fts5', 'inverted'),
+            help='Бэкенд индекса, по умолчанию из SEARCH_BACKEND'
+        )
+
+    def handle(self, *args, **options):
+        backend = None
+        if options['backend'] == 'fts5':
+            backend = search.FTS5Backend()
+        elif options['backend'] == 'inverted':
+            backend = search.InvertedIndexBackend()
+        search.rebuild(backend)
+        self.stdout.write(self.style.SUCCESS('Индекс поиска перестроен'))
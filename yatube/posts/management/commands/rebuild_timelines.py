@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from posts import timelines
+from posts.models import Group, Post, User
+
+
+class Command(BaseCommand):
+    help = (
+        'Заново собирает в кэше готовые списки первых постов главной '
+        'ленты, лент групп и авторов'
+    )
+
+    def handle(self, *args, **options):
+        timelines.invalidate_all()
+        timelines.build('index', Post.objects.all())
+        feeds = 1
+        for pk in Group.objects.values_list('pk', flat=True).iterator():
+            timelines.build(f'group:{pk}', Post.objects.filter(group_id=pk))
+            feeds += 1
+        authors = User.objects.filter(posts__isnull=False).distinct()
+        for pk in authors.values_list('pk', flat=True).iterator():
+            timelines.build(f'author:{pk}', Post.objects.filter(author_id=pk))
+            feeds += 1
+        self.stdout.write(self.style.SUCCESS(f'Собрано лент: {feeds}'))
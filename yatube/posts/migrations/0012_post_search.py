@@ -0,0 +1,48 @@
+# Generated by Django 2.2.6 on 2026-10-18 20:06
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.utils import OperationalError
+
+
+def create_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    try:
+        schema_editor.execute(
+            'CREATE VIRTUAL TABLE IF NOT EXISTS posts_post_fts '
+            "USING fts5(terms, tokenize = 'unicode61')"
+        )
+    except OperationalError:
+        # SQLite собран без FTS5: поиск работает по таблице PostTerm
+        pass
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS posts_post_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0011_post_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostTerm',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64, verbose_name='Основа слова')),
+                ('weight', models.PositiveIntegerField(default=1, verbose_name='Число вхождений')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='terms', to='posts.Post', verbose_name='Пост')),
+            ],
+            options={
+                'unique_together': {('term', 'post')},
+            },
+        ),
+        # посты, написанные до появления поиска, индексирует команда
+        # rebuild_search_index: миграция не зависит от кода posts.search
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
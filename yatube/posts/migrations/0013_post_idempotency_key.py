@@ -0,0 +1,18 @@
+# Generated by Django 2.2.6 on 2026-10-18 20:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0012_post_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='idempotency_key',
+            field=models.UUIDField(blank=True, editable=False, null=True, unique=True, verbose_name='Ключ повторной отправки'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 2.2.6 on 2026-10-18 21:39
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def move_counters(apps, schema_editor):
+    Group = apps.get_model('posts', 'Group')
+    GroupStats = apps.get_model('posts', 'GroupStats')
+    GroupStats.objects.bulk_create(
+        GroupStats(group_id=pk, posts_count=posts_count)
+        for pk, posts_count in Group.objects.values_list('pk', 'posts_count')
+    )
+
+
+def restore_counters(apps, schema_editor):
+    Group = apps.get_model('posts', 'Group')
+    GroupStats = apps.get_model('posts', 'GroupStats')
+    for group_id, posts_count in GroupStats.objects.values_list(
+        'group_id', 'posts_count'
+    ):
+        Group.objects.filter(pk=group_id).update(posts_count=posts_count)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0013_post_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupStats',
+            fields=[
+                ('group', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='posts.Group', verbose_name='Группа')),
+                ('posts_count', models.PositiveIntegerField(default=0, verbose_name='Число постов группы')),
+            ],
+        ),
+        migrations.RunPython(move_counters, restore_counters),
+        migrations.RemoveField(
+            model_name='group',
+            name='posts_count',
+        ),
+    ]
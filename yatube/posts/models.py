@@ -1,8 +1,26 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
+# поля, которые выводят карточки постов в лентах
+FEED_FIELDS = (
+    'text',
+    'pub_date',
+    'updated_at',
+    'author__username',
+    'author__first_name',
+    'author__last_name',
+    'group__slug',
+    'group__title',
+)
+
+
+class PostQuerySet(models.QuerySet):
+    def feed(self):
+        """Посты для лент: автор и группа одним запросом, без лишних полей."""
+        return self.select_related('author', 'group').only(*FEED_FIELDS)
+
 
 class Group(models.Model):
     title = models.CharField(
@@ -32,6 +50,10 @@ class Post(models.Model):
         auto_now_add=True,
         verbose_name='Дата публикации',
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения',
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -48,9 +70,110 @@ class Post(models.Model):
         verbose_name='Название группы',
         help_text='Группа, к которой будет относиться пост'
     )
+    # повторная отправка формы с тем же ключом не создаёт второй пост
+    idempotency_key = models.UUIDField(
+        null=True,
+        blank=True,
+        unique=True,
+        editable=False,
+        verbose_name='Ключ повторной отправки'
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
-        ordering = ('-pub_date', )
+        ordering = ('-pub_date', '-id')
+        indexes = (
+            models.Index(
+                fields=('-pub_date', '-id'),
+                name='post_feed_idx'
+            ),
+            models.Index(
+                fields=('author', '-pub_date', '-id'),
+                name='post_author_feed_idx'
+            ),
+            models.Index(
+                fields=('group', '-pub_date', '-id'),
+                name='post_group_feed_idx'
+            ),
+            models.Index(
+                fields=('-updated_at',),
+                name='post_updated_idx'
+            ),
+            models.Index(
+                fields=('author', '-updated_at'),
+                name='post_author_updated_idx'
+            ),
+            models.Index(
+                fields=('group', '-updated_at'),
+                name='post_group_updated_idx'
+            ),
+        )
 
     def __str__(self):
         return f'{self.text:.15}...'
+
+    def save(self, *args, **kwargs):
+        # счётчики постов обновляются сигналами в той же транзакции
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
+
+class AuthorStats(models.Model):
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Автор'
+    )
+    posts_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Число постов автора'
+    )
+
+    def __str__(self):
+        return f'{self.author}: {self.posts_count}'
+
+
+class GroupStats(models.Model):
+    """Счётчик постов группы.
+
+    Хранится отдельно от группы: сохранение группы целиком не должно
+    затирать счётчик, который одновременно сдвигают новые посты.
+    """
+    group = models.OneToOneField(
+        Group,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Группа'
+    )
+    posts_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Число постов группы'
+    )
+
+    def __str__(self):
+        return f'{self.group}: {self.posts_count}'
+
+
+class PostTerm(models.Model):
+    """Запись инвертированного индекса: основа слова в тексте поста."""
+    term = models.CharField(max_length=64, verbose_name='Основа слова')
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='terms',
+        verbose_name='Пост'
+    )
+    weight = models.PositiveIntegerField(
+        default=1,
+        verbose_name='Число вхождений'
+    )
+
+    class Meta:
+        unique_together = ('term', 'post')
+
+    def __str__(self):
+        return f'{self.term}: {self.post_id}'
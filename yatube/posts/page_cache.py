@@ -0,0 +1,104 @@
+import hashlib
+import uuid
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+# параметры запроса, от которых зависит страница ленты
+PAGE_PARAMS = ('page', 'after', 'before')
+# общее поколение кэша: сбрасывает все ленты разом
+GENERATION_KEY = 'feed_generation'
+
+
+def get_cache():
+    return caches[settings.PAGE_CACHE_ALIAS]
+
+
+def feed_key(feed):
+    return f'feed_version:{feed}'
+
+
+def get_versions(cache, keys):
+    """Возвращает текущие версии, заводя недостающие."""
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    for key in missing:
+        cache.add(key, uuid.uuid4().hex, None)
+    if missing:
+        versions.update(cache.get_many(missing))
+    return [versions.get(key, '') for key in keys]
+
+
+def feed_versions(feed):
+    """Версии кэша ленты: общее поколение и собственная версия ленты."""
+    return get_versions(get_cache(), [GENERATION_KEY, feed_key(feed)])
+
+
+def page_key(feed, versions, query, changed=None):
+    params = '&'.join(
+        f'{name}={query.get(name, "")}' for name in PAGE_PARAMS
+    )
+    stamp = changed.isoformat() if changed is not None else ''
+    raw = f'{feed}|{"|".join(versions)}|{stamp}|{params}'.encode()
+    return f'page:{hashlib.md5(raw).hexdigest()}'
+
+
+def build_response(content, content_type):
+    response = HttpResponse(content, content_type=content_type)
+    patch_vary_headers(response, ('Cookie',))
+    return response
+
+
+def cache_anonymous_page(feed_template):
+    """Кэширует страницу ленты целиком для анонимных посетителей.
+
+    feed_template - имя ленты с подстановкой аргументов view, например
+    'group:{slug}'. По нему кэш сбрасывается при изменении постов ленты.
+    Валидаторы ETag/Last-Modified добавляет conditional_feed; найденное
+    им время последнего изменения ленты входит в ключ страницы, так что
+    новый или исправленный пост виден сразу, не дожидаясь сдвига версии
+    после фиксации транзакции.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if (
+                not settings.PAGE_CACHE_ENABLED
+                or request.method not in ('GET', 'HEAD')
+                or request.user.is_authenticated
+                or set(request.GET) - set(PAGE_PARAMS)
+            ):
+                return view(request, *args, **kwargs)
+            cache = get_cache()
+            feed = feed_template.format(**kwargs)
+            versions = feed_versions(feed)
+            key = page_key(
+                feed, versions, request.GET,
+                getattr(request, '_newest_change', None)
+            )
+            cached = cache.get(key)
+            if cached is not None:
+                return build_response(*cached)
+            response = view(request, *args, **kwargs)
+            if response.status_code != 200 or response.streaming:
+                return response
+            cached = (response.content, response['Content-Type'])
+            cache.set(key, cached, settings.PAGE_CACHE_TIMEOUT)
+            return build_response(*cached)
+        return wrapper
+    return decorator
+
+
+def invalidate_feeds(feeds):
+    """Сбрасывает кэш страниц перечисленных лент."""
+    get_cache().set_many(
+        {feed_key(feed): uuid.uuid4().hex for feed in feeds}, None
+    )
+
+
+def invalidate_all():
+    """Сбрасывает кэш страниц всех лент."""
+    get_cache().set(GENERATION_KEY, uuid.uuid4().hex, None)
@@ -0,0 +1,172 @@
+import base64
+import binascii
+
+from django.core.paginator import Page, Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+def encode_cursor(post):
+    """Упаковывает ключ (pub_date, id) поста в непрозрачный токен."""
+    raw = f'{post.pub_date.isoformat()}|{post.pk}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Распаковывает токен в (pub_date, id) или возвращает None."""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        pub_date, pk = raw.decode().split('|')
+        pub_date = parse_datetime(pub_date)
+        pk = int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    if pub_date is None:
+        return None
+    return pub_date, pk
+
+
+class NumberedPage(Page):
+    """Страница с сокращённым списком номеров соседних страниц."""
+
+    @property
+    def elided_page_range(self):
+        return self.paginator.get_elided_page_range(self.number)
+
+
+class CountedPaginator(Paginator):
+    """Paginator, которому число объектов известно заранее."""
+    ELLIPSIS = '…'
+
+    def __init__(self, object_list, per_page, count=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        if count is not None:
+            self.count = count
+
+    def _get_page(self, *args, **kwargs):
+        return NumberedPage(*args, **kwargs)
+
+    def get_elided_page_range(self, number=1, on_each_side=2, on_ends=1):
+        """Номера страниц вокруг number с пропусками ELLIPSIS.
+
+        Выводятся on_ends первых и последних страниц и по on_each_side
+        с каждой стороны от текущей. Длина списка не зависит от числа
+        страниц, поэтому навигация огромной ленты не выводит тысячи
+        ссылок.
+        """
+        number = self.validate_number(number)
+        num_pages = self.num_pages
+        if num_pages <= (on_each_side + on_ends) * 2:
+            yield from self.page_range
+            return
+        # пропуск ставится, только если скрывает больше одной страницы
+        if number > on_each_side + on_ends + 2:
+            yield from range(1, on_ends + 1)
+            yield self.ELLIPSIS
+            yield from range(number - on_each_side, number + 1)
+        else:
+            yield from range(1, number + 1)
+        if number < num_pages - on_each_side - on_ends - 1:
+            yield from range(number + 1, number + on_each_side + 1)
+            yield self.ELLIPSIS
+            yield from range(num_pages - on_ends + 1, num_pages + 1)
+        else:
+            yield from range(number + 1, num_pages + 1)
+
+
+class CursorPage(Page):
+    """Страница ленты, соседи которой заданы токенами, а не номерами."""
+
+    def __init__(self, object_list, paginator,
+                 next_cursor=None, previous_cursor=None, is_first=False):
+        super().__init__(object_list, None, paginator)
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.is_first = is_first
+
+    def __repr__(self):
+        return f'<Cursor page of {len(self.object_list)} items>'
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def start_index(self):
+        return 1 if self.object_list else 0
+
+    def end_index(self):
+        return len(self.object_list)
+
+
+class CursorPaginator(Paginator):
+    """Постраничный вывод по ключу (pub_date, id).
+
+    Страница выбирается условием по индексу и LIMIT, поэтому стоимость
+    запроса не зависит от глубины страницы, а COUNT(*) не выполняется.
+    """
+    is_cursor = True
+
+    def get_page(self, after=None, before=None):
+        """Возвращает страницу после/до токена, при ошибке - первую."""
+        if after:
+            key = decode_cursor(after)
+            if key is not None:
+                return self._page_after(key)
+        if before:
+            key = decode_cursor(before)
+            if key is not None:
+                page = self._page_before(key)
+                if page.object_list:
+                    return page
+        return self._first_page()
+
+    def _fetch(self, queryset):
+        return list(queryset[:self.per_page + 1])
+
+    def _first_page(self):
+        posts = self._fetch(
+            self.object_list.order_by('-pub_date', '-pk')
+        )
+        has_next = len(posts) > self.per_page
+        posts = posts[:self.per_page]
+        return CursorPage(
+            posts,
+            self,
+            next_cursor=encode_cursor(posts[-1]) if has_next else None,
+            is_first=True,
+        )
+
+    def _page_after(self, key):
+        pub_date, pk = key
+        posts = self._fetch(
+            self.object_list.filter(
+                Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, pk__lt=pk)
+            ).order_by('-pub_date', '-pk')
+        )
+        has_next = len(posts) > self.per_page
+        posts = posts[:self.per_page]
+        return CursorPage(
+            posts,
+            self,
+            next_cursor=encode_cursor(posts[-1]) if has_next else None,
+            previous_cursor=encode_cursor(posts[0]) if posts else None,
+        )
+
+    def _page_before(self, key):
+        pub_date, pk = key
+        posts = self._fetch(
+            self.object_list.filter(
+                Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, pk__gt=pk)
+            ).order_by('pub_date', 'pk')
+        )
+        has_previous = len(posts) > self.per_page
+        posts = posts[:self.per_page][::-1]
+        return CursorPage(
+            posts,
+            self,
+            next_cursor=encode_cursor(posts[-1]) if posts else None,
+            previous_cursor=encode_cursor(posts[0]) if has_previous else None,
+            is_first=not has_previous,
+        )
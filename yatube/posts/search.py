@@ -0,0 +1,224 @@
+import math
+import re
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Case, Count, F, FloatField, Sum, Value, When
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from core import tasks
+from posts.counters import approximate_count
+from posts.models import Post, PostTerm
+from posts.stemmer import stem
+
+FTS_TABLE = 'posts_post_fts'
+WORD = re.compile(r'\w+')
+# основы длиннее поля PostTerm.term обрезаются
+MAX_TERM_LENGTH = 64
+# сколько постов индексировать за один запрос при перестроении
+INDEX_BATCH = 2000
+# задача очереди core.tasks, которая обновляет посты в индексе
+SYNC_TASK = 'posts.sync_search'
+
+# (alias, имя базы) -> есть ли в ней таблица FTS5
+_fts5_tables = {}
+
+
+def terms(text):
+    """Основы слов текста в порядке появления."""
+    return [stem(word)[:MAX_TERM_LENGTH] for word in WORD.findall(text)]
+
+
+def query_terms(query):
+    """Уникальные основы слов поискового запроса."""
+    return list(dict.fromkeys(terms(query)))
+
+
+def highlight(text, stems):
+    """Выделяет в тексте слова, основы которых есть в запросе."""
+    stems = set(stems)
+    parts = []
+    position = 0
+    for match in WORD.finditer(text):
+        if stem(match.group())[:MAX_TERM_LENGTH] not in stems:
+            continue
+        parts.append(escape(text[position:match.start()]))
+        parts.append(f'<mark>{escape(match.group())}</mark>')
+        position = match.end()
+    parts.append(escape(text[position:]))
+    return mark_safe(''.join(parts))
+
+
+class FTS5Backend:
+    """Поиск по виртуальной таблице SQLite FTS5 с ранжированием BM25."""
+
+    def index(self, posts):
+        rows = [(post.pk, ' '.join(terms(post.text))) for post in posts]
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+                [(pk,) for pk, _ in rows]
+            )
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (rowid, terms) VALUES (%s, %s)',
+                rows
+            )
+
+    def remove(self, post_ids):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+                [(pk,) for pk in post_ids]
+            )
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+
+    def match(self, stems):
+        return ' '.join(f'"{term}"' for term in stems)
+
+    def count(self, stems):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT COUNT(*) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+                [self.match(stems)]
+            )
+            return cursor.fetchone()[0]
+
+    def ids(self, stems, offset, limit):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+                'ORDER BY rank LIMIT %s OFFSET %s',
+                [self.match(stems), limit, offset]
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class InvertedIndexBackend:
+    """Поиск по таблице PostTerm с ранжированием TF-IDF."""
+
+    def index(self, posts):
+        posts = list(posts)
+        PostTerm.objects.filter(post__in=posts).delete()
+        PostTerm.objects.bulk_create(
+            PostTerm(post_id=post.pk, term=term, weight=weight)
+            for post in posts
+            for term, weight in Counter(terms(post.text)).items()
+        )
+
+    def remove(self, post_ids):
+        PostTerm.objects.filter(post_id__in=list(post_ids)).delete()
+
+    def clear(self):
+        PostTerm.objects.all().delete()
+
+    def matches(self, stems):
+        return PostTerm.objects.filter(term__in=stems).values(
+            'post'
+        ).annotate(matched=Count('term')).filter(matched=len(stems))
+
+    def count(self, stems):
+        return self.matches(stems).count()
+
+    def ids(self, stems, offset, limit):
+        # для IDF хватает приблизительного числа постов
+        total = approximate_count('index', Post.objects.all())
+        frequencies = PostTerm.objects.filter(term__in=stems).values(
+            'term'
+        ).annotate(posts=Count('post'))
+        idf = [
+            When(term=row['term'], then=Value(
+                math.log(1 + total / row['posts'])
+            ))
+            for row in frequencies
+        ]
+        score = Sum(
+            Case(*idf, default=Value(0.0), output_field=FloatField())
+            * F('weight'),
+            output_field=FloatField()
+        )
+        ranked = self.matches(stems).annotate(score=score).order_by(
+            '-score', '-post'
+        )
+        return [row['post'] for row in ranked[offset:offset + limit]]
+
+
+def fts5_available():
+    """Есть ли таблица FTS5; проверяется один раз на базу."""
+    if connection.vendor != 'sqlite':
+        return False
+    key = (connection.alias, connection.settings_dict['NAME'])
+    if key not in _fts5_tables:
+        _fts5_tables[key] = (
+            FTS_TABLE in connection.introspection.table_names()
+        )
+    return _fts5_tables[key]
+
+
+def get_backend():
+    """Бэкенд поиска из настройки SEARCH_BACKEND: fts5, inverted или auto."""
+    name = settings.SEARCH_BACKEND
+    if name == 'auto':
+        name = 'fts5' if fts5_available() else 'inverted'
+    return FTS5Backend() if name == 'fts5' else InvertedIndexBackend()
+
+
+class SearchResults:
+    """Ранжированные результаты поиска, которые Paginator читает по срезам."""
+
+    def __init__(self, query, backend=None):
+        self.stems = query_terms(query)
+        self.backend = backend or get_backend()
+        self._count = None
+
+    def count(self):
+        if self._count is None:
+            self._count = self.backend.count(self.stems) if self.stems else 0
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, item):
+        if not self.stems:
+            return []
+        start = item.start or 0
+        ids = self.backend.ids(self.stems, start, item.stop - start)
+        posts = Post.objects.feed().in_bulk(ids)
+        results = []
+        for pk in ids:
+            if pk in posts:
+                post = posts[pk]
+                post.highlighted = highlight(post.text, self.stems)
+                results.append(post)
+        return results
+
+
+@tasks.task(SYNC_TASK, batch=True)
+def sync(post_ids):
+    """Переиндексирует посты post_ids, а удалённые убирает из индекса."""
+    backend = get_backend()
+    posts = list(Post.objects.filter(pk__in=post_ids).only('text'))
+    backend.index(posts)
+    missing = set(post_ids) - {post.pk for post in posts}
+    if missing:
+        backend.remove(missing)
+
+
+def rebuild(backend=None):
+    """Перестраивает индекс поиска по всем постам."""
+    backend = backend or get_backend()
+    with transaction.atomic():
+        backend.clear()
+        batch = []
+        for post in Post.objects.only('text').order_by().iterator():
+            batch.append(post)
+            if len(batch) == INDEX_BATCH:
+                backend.index(batch)
+                batch = []
+        if batch:
+            backend.index(batch)
@@ -0,0 +1,183 @@
+from django.db import transaction
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+
+from core import tasks
+from posts import cards, counters, groups, page_cache, search, timelines
+from posts.models import Group, Post, User
+
+# поля автора и группы, которые выводит карточка поста
+USER_CARD_FIELDS = ('username', 'first_name', 'last_name')
+GROUP_CARD_FIELDS = ('slug', 'title')
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_owner(sender, instance, update_fields=None, **kwargs):
+    """Запоминает прежних автора и группу редактируемого поста."""
+    if update_fields is not None and not {'author', 'group'} & update_fields:
+        # автор и группа не сохраняются, значит и не меняются
+        instance._previous_owner = (instance.author_id, instance.group_id)
+    elif instance.pk is not None:
+        instance._previous_owner = Post.objects.filter(
+            pk=instance.pk
+        ).values_list('author_id', 'group_id').first()
+
+
+@receiver(post_save, sender=Post)
+def count_saved_post(sender, instance, created, **kwargs):
+    """Учитывает новый или перенесённый пост в счётчиках."""
+    previous = getattr(instance, '_previous_owner', None)
+    if created or previous is None:
+        counters.shift_author(instance.author_id, 1)
+        counters.shift_group(instance.group_id, 1)
+        return
+    author_id, group_id = previous
+    if author_id != instance.author_id:
+        counters.shift_author(author_id, -1)
+        counters.shift_author(instance.author_id, 1)
+    if group_id != instance.group_id:
+        counters.shift_group(group_id, -1)
+        counters.shift_group(instance.group_id, 1)
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    """Убирает удалённый пост из счётчиков."""
+    counters.shift_author(instance.author_id, -1)
+    counters.shift_group(instance.group_id, -1)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def sync_search_index(sender, instance, update_fields=None, **kwargs):
+    """Ставит обновление поста в поисковом индексе в очередь задач."""
+    if update_fields is not None and 'text' not in update_fields:
+        return
+    tasks.enqueue(
+        search.SYNC_TASK, instance.pk, key=f'search:{instance.pk}'
+    )
+
+
+@receiver(post_save, sender=Post)
+def add_to_timelines(sender, instance, using, **kwargs):
+    """Вставляет пост в готовые списки его лент."""
+    timelines.add(
+        instance, getattr(instance, '_previous_owner', None), using
+    )
+
+
+@receiver(post_delete, sender=Post)
+def remove_from_timelines(sender, instance, using, **kwargs):
+    """Убирает удалённый пост из готовых списков лент."""
+    timelines.remove(instance, using)
+
+
+def post_feeds(post):
+    """Имена лент, в которых выводится пост."""
+    feeds = ['index', f'profile:{post.author.username}']
+    if post.group_id is not None:
+        feeds.append(f'group:{post.group.slug}')
+    previous = getattr(post, '_previous_owner', None)
+    if previous is not None and previous[1] not in (None, post.group_id):
+        feeds.extend(
+            f'group:{slug}' for slug in Group.objects.filter(
+                pk=previous[1]
+            ).values_list('slug', flat=True)
+        )
+    return feeds
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_pages(sender, instance, using, **kwargs):
+    """Сбрасывает кэш страниц лент, в которые входит пост.
+
+    Ленты определяются сразу, а версии сдвигаются после фиксации.
+    """
+    feeds = post_feeds(instance)
+    transaction.on_commit(
+        lambda: page_cache.invalidate_feeds(feeds), using=using
+    )
+
+
+def remember_card_fields(instance, fields, update_fields):
+    if instance.pk is None:
+        return
+    if update_fields is not None and not set(fields) & set(update_fields):
+        return
+    instance._previous_card = type(instance).objects.filter(
+        pk=instance.pk
+    ).values_list(*fields).first()
+
+
+def card_fields_changed(instance, fields):
+    previous = instance.__dict__.pop('_previous_card', None)
+    if previous is None:
+        return False
+    return previous != tuple(getattr(instance, field) for field in fields)
+
+
+@receiver(pre_save, sender=User)
+def remember_author_card(sender, instance, update_fields=None, **kwargs):
+    """Запоминает имя автора до сохранения."""
+    remember_card_fields(instance, USER_CARD_FIELDS, update_fields)
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_cards(sender, instance, **kwargs):
+    """Сбрасывает карточки постов автора, сменившего имя."""
+    if card_fields_changed(instance, USER_CARD_FIELDS):
+        cards.invalidate(
+            instance.posts.values_list('pk', 'updated_at').iterator()
+        )
+        page_cache.invalidate_all()
+
+
+@receiver(pre_save, sender=Group)
+def remember_group_card(sender, instance, update_fields=None, **kwargs):
+    """Запоминает slug и название группы до сохранения."""
+    remember_card_fields(instance, GROUP_CARD_FIELDS, update_fields)
+
+
+@receiver(post_save, sender=Group)
+def invalidate_group_pages(sender, instance, using, **kwargs):
+    """Сдвигает после фиксации версии лент группы при любом её изменении.
+
+    Страница группы и API выводят её описание, которого нет в карточках.
+    При смене slug сбрасывается и лента прежнего адреса.
+    """
+    feeds = {f'group:{instance.slug}'}
+    previous = getattr(instance, '_previous_card', None)
+    if previous is not None:
+        feeds.add(f'group:{previous[0]}')
+    transaction.on_commit(
+        lambda: page_cache.invalidate_feeds(feeds), using=using
+    )
+
+
+@receiver(post_save, sender=Group)
+def invalidate_group_cards(sender, instance, **kwargs):
+    """Сбрасывает карточки постов группы со сменившимся slug/названием."""
+    if card_fields_changed(instance, GROUP_CARD_FIELDS):
+        cards.invalidate(
+            instance.posts.values_list('pk', 'updated_at').iterator()
+        )
+        page_cache.invalidate_all()
+
+
+@receiver(pre_delete, sender=Group)
+def invalidate_deleted_group_cards(sender, instance, **kwargs):
+    """Сбрасывает карточки постов удаляемой группы."""
+    cards.invalidate(
+        instance.posts.values_list('pk', 'updated_at').iterator()
+    )
+    page_cache.invalidate_all()
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_group_directory(sender, using, **kwargs):
+    """Сдвигает версию справочника групп после фиксации транзакции."""
+    transaction.on_commit(groups.invalidate, using=using)
@@ -0,0 +1,123 @@
+"""Стеммер русского языка по алгоритму Snowball (М. Портер)."""
+from functools import lru_cache
+
+VOWELS = 'аеиоуыэюя'
+
+PERFECTIVE_GERUND = (
+    ('в', 'вши', 'вшись'),
+    ('ив', 'ивши', 'ившись', 'ыв', 'ывши', 'ывшись'),
+)
+ADJECTIVE = (
+    (),
+    (
+        'ее', 'ие', 'ые', 'ое', 'ими', 'ыми', 'ей', 'ий', 'ый', 'ой', 'ем',
+        'им', 'ым', 'ом', 'его', 'ого', 'ему', 'ому', 'их', 'ых', 'ую', 'юю',
+        'ая', 'яя', 'ою', 'ею',
+    ),
+)
+PARTICIPLE = (
+    ('ем', 'нн', 'вш', 'ющ', 'щ'),
+    ('ивш', 'ывш', 'ующ'),
+)
+REFLEXIVE = ((), ('ся', 'сь'))
+VERB = (
+    (
+        'ла', 'на', 'ете', 'йте', 'ли', 'й', 'л', 'ем', 'н', 'ло', 'но', 'ет',
+        'ют', 'ны', 'ть', 'ешь', 'нно',
+    ),
+    (
+        'ила', 'ыла', 'ена', 'ейте', 'уйте', 'ите', 'или', 'ыли', 'ей', 'уй',
+        'ил', 'ыл', 'им', 'ым', 'ен', 'ило', 'ыло', 'ено', 'ят', 'ует', 'уют',
+        'ит', 'ыт', 'ены', 'ить', 'ыть', 'ишь', 'ую', 'ю',
+    ),
+)
+NOUN = (
+    (),
+    (
+        'а', 'ев', 'ов', 'ие', 'ье', 'е', 'иями', 'ями', 'ами', 'еи', 'ии',
+        'и', 'ией', 'ей', 'ой', 'ий', 'й', 'иям', 'ям', 'ием', 'ем', 'ам',
+        'ом', 'о', 'у', 'ах', 'иях', 'ях', 'ы', 'ь', 'ию', 'ью', 'ю', 'ия',
+        'ья', 'я',
+    ),
+)
+SUPERLATIVE = ((), ('ейше', 'ейш'))
+DERIVATIONAL = ((), ('ость', 'ост'))
+
+
+def _regions(word):
+    """Начала областей RV и R2 слова."""
+    rv = r2 = len(word)
+    for i, char in enumerate(word):
+        if char in VOWELS:
+            rv = i + 1
+            break
+    found = 0
+    for i in range(1, len(word)):
+        if word[i - 1] in VOWELS and word[i] not in VOWELS:
+            found += 1
+            if found == 2:
+                r2 = i + 1
+                break
+    return rv, r2
+
+
+def _remove(word, groups, start):
+    """Отрезает самое длинное окончание из groups, лежащее после start.
+
+    Окончания первой группы допустимы только после «а» или «я».
+    Возвращает None, если окончание не найдено.
+    """
+    found = None
+    for group, endings in enumerate(groups):
+        for ending in endings:
+            if not word.endswith(ending) or len(word) - len(ending) < start:
+                continue
+            if found is not None and len(ending) <= len(found[1]):
+                continue
+            found = (group, ending)
+    if found is None:
+        return None
+    group, ending = found
+    cut = len(word) - len(ending)
+    if group == 0 and (cut - 1 < start or word[cut - 1] not in 'ая'):
+        return None
+    return word[:cut]
+
+
+def _remove_adjectival(word, start):
+    stem = _remove(word, ADJECTIVE, start)
+    if stem is None:
+        return None
+    return _remove(stem, PARTICIPLE, start) or stem
+
+
+@lru_cache(maxsize=100000)
+def stem(word):
+    """Возвращает основу русского слова, прочие слова - в нижнем регистре."""
+    word = word.lower().replace('ё', 'е')
+    if not any(char in VOWELS for char in word):
+        return word
+    rv, r2 = _regions(word)
+    stemmed = _remove(word, PERFECTIVE_GERUND, rv)
+    if stemmed is None:
+        word = _remove(word, REFLEXIVE, rv) or word
+        stemmed = (
+            _remove_adjectival(word, rv)
+            or _remove(word, VERB, rv)
+            or _remove(word, NOUN, rv)
+        )
+    word = stemmed if stemmed is not None else word
+    if word.endswith('и') and len(word) - 1 >= rv:
+        word = word[:-1]
+    word = _remove(word, DERIVATIONAL, max(rv, r2)) or word
+    if word.endswith('нн') and len(word) - 2 >= rv:
+        return word[:-1]
+    superlative = _remove(word, SUPERLATIVE, rv)
+    if superlative is not None:
+        word = superlative
+        if word.endswith('нн') and len(word) - 2 >= rv:
+            word = word[:-1]
+        return word
+    if word.endswith('ь') and len(word) - 1 >= rv:
+        return word[:-1]
+    return word
@@ -0,0 +1,157 @@
+import gzip
+import json
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from posts import groups
+from posts.models import Group, Post
+from yatube.settings import PER_PAGE
+
+User = get_user_model()
+
+
+class PostApiTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(
+            username='author', first_name='Имя', last_name='Фамилия'
+        )
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        for i in range(PER_PAGE + 3):
+            cls.post = Post.objects.create(
+                author=cls.author,
+                group=cls.group,
+                text=f'Тестовый пост {i}'
+            )
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.guest_client = Client()
+
+    def get_json(self, url, **extra):
+        response = self.guest_client.get(url, **extra)
+        self.assertEqual(response['Content-Type'],
+                         'application/json; charset=utf-8')
+        return response, json.loads(response.content)
+
+    def test_feeds_match_html(self):
+        """Ленты API выводят те же посты, что и HTML-страницы."""
+        feeds = {
+            reverse('posts:api_index'): reverse('posts:index'),
+            reverse('posts:api_group', kwargs={'slug': 'test_slug'}):
+                reverse('posts:group_list', kwargs={'slug': 'test_slug'}),
+            reverse('posts:api_profile', kwargs={'username': 'author'}):
+                reverse('posts:profile', kwargs={'username': 'author'}),
+        }
+        for api_url, html_url in feeds.items():
+            with self.subTest(url=api_url):
+                _, data = self.get_json(api_url)
+                page = self.guest_client.get(html_url).context['page_obj']
+                self.assertEqual(
+                    [post['id'] for post in data['posts']],
+                    [post.pk for post in page]
+                )
+
+    def test_group_and_author(self):
+        _, data = self.get_json(
+            reverse('posts:api_group', kwargs={'slug': 'test_slug'})
+        )
+        self.assertEqual(data['group'], {
+            'slug': 'test_slug',
+            'title': 'Тестовая группа',
+            'description': 'Тестовое описание',
+            'posts_count': PER_PAGE + 3,
+        })
+        _, data = self.get_json(
+            reverse('posts:api_profile', kwargs={'username': 'author'})
+        )
+        self.assertEqual(data['author'], {
+            'username': 'author',
+            'first_name': 'Имя',
+            'last_name': 'Фамилия',
+            'posts_count': PER_PAGE + 3,
+        })
+
+    def test_post_detail(self):
+        post = PostApiTest.post
+        _, data = self.get_json(
+            reverse('posts:api_post_detail', kwargs={'post_id': post.pk})
+        )
+        self.assertEqual(data['author_posts_count'], PER_PAGE + 3)
+        self.assertEqual(data['post']['text'], post.text)
+        self.assertEqual(data['post']['author'], 'author')
+        self.assertEqual(data['post']['group'], 'test_slug')
+
+    def test_not_found(self):
+        urls = (
+            reverse('posts:api_group', kwargs={'slug': 'unknown'}),
+            reverse('posts:api_profile', kwargs={'username': 'unknown'}),
+            reverse('posts:api_post_detail', kwargs={'post_id': 10 ** 6}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_cursor_pagination(self):
+        """Курсор next ведёт на следующую страницу, previous - обратно."""
+        url = reverse('posts:api_index')
+        _, first = self.get_json(url)
+        self.assertEqual(len(first['posts']), PER_PAGE)
+        self.assertIsNone(first['previous'])
+        _, second = self.get_json(f'{url}?after={first["next"]}')
+        self.assertEqual(len(second['posts']), 3)
+        self.assertIsNone(second['next'])
+        _, back = self.get_json(f'{url}?before={second["previous"]}')
+        self.assertEqual(back['posts'], first['posts'])
+
+    def test_sparse_fields(self):
+        """?fields= оставляет в ответе только перечисленные поля."""
+        url = reverse('posts:api_index')
+        _, data = self.get_json(f'{url}?fields=text,author')
+        self.assertEqual(set(data['posts'][0]), {'text', 'author'})
+        self.assertIsNotNone(data['next'])
+        response, data = self.get_json(f'{url}?fields=text,password')
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertIn('password', data['error'])
+
+    @override_settings(PAGE_CACHE_ENABLED=False, TIMELINE_ENABLED=False)
+    def test_query_budget(self):
+        """Страница API не дороже HTML-страницы по запросам."""
+        post = PostApiTest.post
+        query_budget = {
+            reverse('posts:api_index'): 2,
+            reverse('posts:api_group', kwargs={'slug': 'test_slug'}): 3,
+            reverse('posts:api_profile', kwargs={'username': 'author'}): 3,
+            reverse('posts:api_post_detail', kwargs={'post_id': post.pk}): 2,
+        }
+        groups.get_directory()
+        for url, budget in query_budget.items():
+            with self.subTest(url=url):
+                with self.assertNumQueries(budget):
+                    self.guest_client.get(url)
+
+    def test_gzip(self):
+        """Ответ сжимается, если клиент принимает gzip."""
+        url = reverse('posts:api_index')
+        plain = self.guest_client.get(url)
+        response = self.guest_client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertLess(len(response.content), len(plain.content))
+        self.assertFalse(plain.has_header('Content-Encoding'))
+
+    def test_payload_smaller_than_html(self):
+        html = self.guest_client.get(reverse('posts:index'))
+        data = self.guest_client.get(reverse('posts:api_index'))
+        self.assertLess(len(data.content) * 2, len(html.content))
@@ -0,0 +1,81 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase, Client
+from django.utils import timezone
+from core.testing import capture_on_commit_callbacks
+from posts.cards import CARD_TEMPLATE
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class PostCardCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(
+            username='author',
+            first_name='Имя',
+            last_name='Фамилия',
+        )
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.author,
+            group=cls.group,
+            text='Тестовый пост'
+        )
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.guest_client = Client()
+
+    def test_cards_rendered_once(self):
+        """Повторный показ ленты берёт карточки из кэша."""
+        response = self.guest_client.get('/')
+        self.assertTemplateUsed(response, CARD_TEMPLATE)
+        for address in ('/', '/group/test_slug/', '/profile/author/'):
+            with self.subTest(address=address):
+                response = self.guest_client.get(address)
+                self.assertTemplateNotUsed(response, CARD_TEMPLATE)
+                self.assertContains(response, 'Тестовый пост')
+
+    def test_cards_invalidated(self):
+        """Карточка обновляется при смене поста, автора и группы."""
+        self.guest_client.get('/')
+        post = Post.objects.get(pk=PostCardCacheTest.post.pk)
+        author = User.objects.get(pk=PostCardCacheTest.author.pk)
+        group = Group.objects.get(pk=PostCardCacheTest.group.pk)
+        changes = {
+            'Изменённый пост': (post, 'text'),
+            'Новая Фамилия': (author, 'last_name'),
+            'new_slug': (group, 'slug'),
+        }
+        for value, (instance, field) in changes.items():
+            with self.subTest(field=field):
+                setattr(instance, field, value)
+                with capture_on_commit_callbacks(execute=True):
+                    instance.save()
+                self.assertContains(self.guest_client.get('/'), value)
+
+    def test_edited_post_gets_new_card(self):
+        """Пост, изменённый в другом процессе, получает новую карточку."""
+        # кэш целых страниц не действует для вошедших пользователей
+        self.guest_client.force_login(PostCardCacheTest.author)
+        self.guest_client.get('/')
+        # запись без сигналов, как её видит кэш другого процесса
+        Post.objects.filter(pk=PostCardCacheTest.post.pk).update(
+            text='Изменённый пост', updated_at=timezone.now()
+        )
+        self.assertContains(self.guest_client.get('/'), 'Изменённый пост')
+
+    def test_login_keeps_cards(self):
+        """Вход автора не сбрасывает его карточки."""
+        self.guest_client.get('/')
+        self.guest_client.force_login(PostCardCacheTest.author)
+        response = self.guest_client.get('/')
+        self.assertTemplateNotUsed(response, CARD_TEMPLATE)
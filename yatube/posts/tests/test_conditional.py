@@ -0,0 +1,120 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase, Client
+from django.urls import reverse
+from core.testing import capture_on_commit_callbacks
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class ConditionalGetTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.author,
+            group=cls.group,
+            text='Тестовый пост'
+        )
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.guest_client = Client()
+        self.author_client = Client()
+        self.author_client.force_login(ConditionalGetTest.author)
+        post_id = ConditionalGetTest.post.id
+        self.addresses = (
+            '/',
+            '/group/test_slug/',
+            '/profile/author/',
+            f'/posts/{post_id}/',
+        )
+
+    def test_unchanged_pages_not_modified(self):
+        """Неизменившиеся страницы отдаются ответом 304 без шаблона."""
+        for address in self.addresses:
+            with self.subTest(address=address):
+                response = self.guest_client.get(address)
+                response = self.guest_client.get(
+                    address, HTTP_IF_NONE_MATCH=response['ETag']
+                )
+                self.assertEqual(
+                    response.status_code, HTTPStatus.NOT_MODIFIED
+                )
+                self.assertEqual(response.templates, [])
+
+    def test_edit_changes_validators(self):
+        """Редактирование поста меняет ETag всех его страниц."""
+        etags = {
+            address: self.guest_client.get(address)['ETag']
+            for address in self.addresses
+        }
+        self.author_client.post(
+            reverse(
+                'posts:post_edit',
+                kwargs={'post_id': ConditionalGetTest.post.id}
+            ),
+            data={'text': 'Изменённый пост', 'group': ''}
+        )
+        for address, etag in etags.items():
+            with self.subTest(address=address):
+                response = self.guest_client.get(
+                    address, HTTP_IF_NONE_MATCH=etag
+                )
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_post_page_depends_on_author(self):
+        """ETag страницы поста меняется с именем и числом постов автора."""
+        address = f'/posts/{ConditionalGetTest.post.id}/'
+        response = self.guest_client.get(address)
+        self.assertNotIn('Last-Modified', response)
+        author = User.objects.get(pk=ConditionalGetTest.author.pk)
+        changes = {
+            'name': lambda: User.objects.filter(pk=author.pk).update(
+                first_name='Новое имя'
+            ),
+            'count': lambda: Post.objects.create(
+                author=author, text='Новый пост'
+            ),
+        }
+        for change, apply in changes.items():
+            with self.subTest(change=change):
+                etag = self.guest_client.get(address)['ETag']
+                apply()
+                response = self.guest_client.get(
+                    address, HTTP_IF_NONE_MATCH=etag
+                )
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_validators_depend_on_user(self):
+        """Авторизованный пользователь получает свой ETag без Last-Modified."""
+        guest_response = self.guest_client.get('/')
+        response = self.author_client.get('/')
+        self.assertNotIn('Last-Modified', response)
+        self.assertNotEqual(response['ETag'], guest_response['ETag'])
+        response = self.author_client.get(
+            '/', HTTP_IF_NONE_MATCH=guest_response['ETag']
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_deleted_post_changes_etag(self):
+        """Удаление не самого нового поста тоже меняет ETag ленты."""
+        Post.objects.create(
+            author=ConditionalGetTest.author,
+            text='Новый пост'
+        )
+        etag = self.guest_client.get('/')['ETag']
+        with capture_on_commit_callbacks(execute=True):
+            Post.objects.get(pk=ConditionalGetTest.post.pk).delete()
+        response = self.guest_client.get('/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
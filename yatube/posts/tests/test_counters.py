@@ -0,0 +1,102 @@
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, Client
+from django.urls import reverse
+from posts.counters import author_posts_count, group_posts_count
+from posts.models import AuthorStats, Group, GroupStats, Post
+
+User = get_user_model()
+
+
+class PostCountersTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.group_2 = Group.objects.create(
+            title='Тестовая группа 2',
+            slug='test_slug_2',
+            description='Тестовое описание 2',
+        )
+
+    def setUp(self):
+        self.author_client = Client()
+        self.author_client.force_login(PostCountersTest.author)
+
+    def assertCounts(self, author_count, group_count, group_2_count):
+        author = User.objects.select_related('stats').get(
+            pk=PostCountersTest.author.pk
+        )
+        counts = {
+            author_posts_count(author): author_count,
+            group_posts_count(PostCountersTest.group.pk): group_count,
+            group_posts_count(PostCountersTest.group_2.pk): group_2_count,
+        }
+        for value, expected in counts.items():
+            with self.subTest(expected=expected):
+                self.assertEqual(value, expected)
+
+    def test_counters_follow_post_life(self):
+        """Счётчики учитывают создание, перенос и удаление поста."""
+        self.assertCounts(0, 0, 0)
+        self.author_client.post(
+            reverse('posts:post_create'),
+            data={'text': 'Тестовый пост', 'group': PostCountersTest.group.id}
+        )
+        self.assertCounts(1, 1, 0)
+        post = Post.objects.get()
+        self.author_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': post.id}),
+            data={
+                'text': 'Тестовый пост',
+                'group': PostCountersTest.group_2.id
+            }
+        )
+        self.assertCounts(1, 0, 1)
+        Post.objects.get().delete()
+        self.assertCounts(0, 0, 0)
+
+    def test_group_save_keeps_counter(self):
+        """Сохранение загруженной раньше группы не затирает счётчик."""
+        group = Group.objects.get(pk=PostCountersTest.group.pk)
+        Post.objects.create(
+            author=PostCountersTest.author,
+            group=PostCountersTest.group,
+            text='Тестовый пост'
+        )
+        group.title = 'Новое название'
+        group.save()
+        self.assertCounts(1, 1, 0)
+
+    def test_rebuild_counters_command(self):
+        """Команда rebuild_counters восстанавливает сбитые счётчики."""
+        Post.objects.create(
+            author=PostCountersTest.author,
+            group=PostCountersTest.group,
+            text='Тестовый пост'
+        )
+        GroupStats.objects.update(posts_count=7)
+        AuthorStats.objects.all().delete()
+        call_command('rebuild_counters', stdout=open('/dev/null', 'w'))
+        self.assertCounts(1, 1, 0)
+
+    def test_views_show_stored_count(self):
+        """Профиль и страница поста выводят сохранённый счётчик."""
+        post = Post.objects.create(
+            author=PostCountersTest.author,
+            text='Тестовый пост'
+        )
+        AuthorStats.objects.filter(author=post.author).update(posts_count=5)
+        addresses = (
+            reverse('posts:profile', kwargs={'username': 'author'}),
+            reverse('posts:post_detail', kwargs={'post_id': post.id}),
+        )
+        for address in addresses:
+            with self.subTest(address=address):
+                response = self.author_client.get(address)
+                self.assertEqual(response.context['count'], 5)
@@ -0,0 +1,121 @@
+import csv
+import json
+from datetime import datetime
+from http import HTTPStatus
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.utils import timezone
+from posts.exporters import export_rows, get_queryset
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class ExportTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.staff = User.objects.create_user(username='staff', is_staff=True)
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.posts = [
+            Post.objects.create(
+                author=cls.author,
+                group=cls.group if i % 2 else None,
+                text=f'Пост {i}'
+            )
+            for i in range(5)
+        ]
+        Post.objects.filter(pk=cls.posts[0].pk).update(
+            pub_date=timezone.make_aware(datetime(2015, 1, 1), timezone.utc)
+        )
+
+    def setUp(self):
+        self.staff_client = Client()
+        self.staff_client.force_login(ExportTest.staff)
+        self.author_client = Client()
+        self.author_client.force_login(ExportTest.author)
+
+    def test_rows_in_batches(self):
+        """Пакеты по ключу выгружают все строки ровно один раз."""
+        for batch_size in (1, 2, 5, 100):
+            with self.subTest(batch_size=batch_size):
+                rows = list(export_rows(
+                    'posts', get_queryset('posts'), batch_size
+                ))
+                self.assertEqual(
+                    [row['id'] for row in rows],
+                    sorted(post.pk for post in ExportTest.posts)
+                )
+
+    def test_filters(self):
+        """Выгрузка фильтруется по автору, группе и датам."""
+        filters = {
+            (('group', 'test_slug'),): 2,
+            (('author', 'author'),): 5,
+            (('author', 'staff'),): 0,
+            (('until', '2015-01-01'),): 1,
+            (('since', '2016-01-01'), ('group', 'test_slug')): 2,
+        }
+        for arguments, expected in filters.items():
+            with self.subTest(arguments=arguments):
+                queryset = get_queryset('posts', **dict(arguments))
+                self.assertEqual(len(list(export_rows('posts', queryset))),
+                                 expected)
+
+    def test_command_import_format(self):
+        """Выгрузка постов содержит поля записи import_posts."""
+        output = StringIO()
+        call_command(
+            'export_corpus', 'posts', group='test_slug',
+            stdout=output, stderr=StringIO()
+        )
+        records = [json.loads(line) for line in output.getvalue().split('\n')
+                   if line]
+        self.assertEqual(
+            set(records[0]), {'id', 'text', 'author', 'group', 'pub_date'}
+        )
+        self.assertEqual(records[0]['group'], 'test_slug')
+
+    def test_command_bad_dates(self):
+        """Некорректная дата останавливает команду с ошибкой."""
+        with self.assertRaises(CommandError):
+            call_command('export_corpus', 'posts', since='вчера')
+
+    def test_endpoint_streams_csv(self):
+        """Сотрудник получает потоковую выгрузку в CSV."""
+        response = self.staff_client.get(
+            reverse('posts:export', args=('profiles', 'csv')),
+            {'author': 'author'}
+        )
+        self.assertTrue(response.streaming)
+        rows = list(csv.DictReader(
+            b''.join(response.streaming_content).decode().splitlines()
+        ))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['username'], 'author')
+        self.assertEqual(rows[0]['posts_count'], '5')
+
+    def test_endpoint_access(self):
+        """Выгрузка доступна только сотрудникам."""
+        address = reverse('posts:export', args=('posts', 'jsonl'))
+        response = self.author_client.get(address)
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+        responses = {
+            reverse('posts:export', args=('users', 'jsonl')):
+                HTTPStatus.NOT_FOUND,
+            address + '?since=вчера': HTTPStatus.BAD_REQUEST,
+        }
+        for address, status in responses.items():
+            with self.subTest(address=address):
+                response = self.staff_client.get(address)
+                self.assertEqual(response.status_code, status)
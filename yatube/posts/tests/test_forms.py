@@ -1,5 +1,9 @@
+import uuid
+
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from posts.models import Group, Post
 from posts.forms import PostForm
@@ -72,3 +76,61 @@ class PostFormTest(TestCase):
         self.assertEqual(Post.objects.count(), tasks_count)
         self.assertEqual(edit_post.text, form_data['text'])
         self.assertEqual(edit_post.group.id, form_data['group'])
+
+    def test_double_submit(self):
+        """Повторная отправка формы с тем же ключом не создаёт дубль."""
+        response = self.author_client.get(reverse('posts:post_create'))
+        key = response.context['idempotency_key']
+        self.assertContains(response, f'value="{key}"')
+        posts_count = Post.objects.count()
+        form_data = {'text': 'Один пост', 'idempotency_key': key}
+        for _ in range(2):
+            response = self.author_client.post(
+                reverse('posts:post_create'), data=form_data
+            )
+            self.assertRedirects(response, reverse(
+                'posts:profile', kwargs={'username': 'author'}
+            ))
+        self.assertEqual(Post.objects.count(), posts_count + 1)
+        self.assertEqual(
+            Post.objects.get(idempotency_key=key).text, 'Один пост'
+        )
+
+    def test_invalid_form_keeps_key(self):
+        key = uuid.uuid4()
+        response = self.author_client.post(
+            reverse('posts:post_create'),
+            data={'text': '', 'idempotency_key': key}
+        )
+        self.assertEqual(response.context['idempotency_key'], key)
+        self.assertTrue(response.context['form'].errors)
+
+    def test_edit_updates_changed_columns(self):
+        """Правка записывает только изменённые поля, без правок - ничего."""
+        post = PostFormTest.post
+        url = reverse('posts:post_edit', kwargs={'post_id': post.id})
+        with CaptureQueriesContext(connection) as queries:
+            self.author_client.post(url, data={
+                'text': 'Новый текст', 'group': PostFormTest.group.id
+            })
+        updates = [
+            query['sql'] for query in queries
+            if query['sql'].startswith('UPDATE "posts_post"')
+        ]
+        self.assertEqual(len(updates), 1)
+        self.assertNotIn('"group_id"', updates[0])
+        self.assertNotIn('"pub_date"', updates[0])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.author_client.post(url, data={
+                'text': 'Новый текст', 'group': PostFormTest.group.id
+            })
+        self.assertRedirects(response, reverse(
+            'posts:post_detail', kwargs={'post_id': post.id}
+        ))
+        self.assertFalse([
+            query for query in queries
+            if query['sql'].startswith('UPDATE "posts_post"')
+        ])
+        post.refresh_from_db()
+        self.assertEqual(post.text, 'Новый текст')
+        self.assertEqual(post.group, PostFormTest.group)
@@ -0,0 +1,170 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from core.testing import capture_on_commit_callbacks
+from posts import counters, groups
+from posts.forms import PostForm
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class GroupDirectoryTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.other_group = Group.objects.create(
+            title='Другая группа',
+            slug='other_slug',
+            description='Другое описание',
+        )
+        Post.objects.create(
+            author=cls.author,
+            group=cls.group,
+            text='Тестовый пост'
+        )
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.guest_client = Client()
+        self.author_client = Client()
+        self.author_client.force_login(GroupDirectoryTest.author)
+
+    def test_directory_page_reads_only_counters(self):
+        """Страница групп читает из БД только счётчики постов."""
+        groups.get_directory()
+        with self.assertNumQueries(1):
+            response = self.guest_client.get(reverse('posts:group_index'))
+        self.assertEqual(
+            [group.slug for group, _ in response.context['groups']],
+            ['other_slug', 'test_slug']
+        )
+        self.assertContains(response, 'Постов: 1')
+
+    def test_directory_reloaded_on_change(self):
+        """Справочник перечитывается после изменения и удаления группы."""
+        group = Group.objects.get(slug='test_slug')
+        groups.get_directory()
+        group.title = 'Новое название'
+        with capture_on_commit_callbacks(execute=True):
+            group.save()
+        self.assertEqual(groups.get_by_slug('test_slug').title,
+                         'Новое название')
+        with capture_on_commit_callbacks(execute=True):
+            Group.objects.filter(slug='other_slug').delete()
+        self.assertIsNone(groups.get_by_slug('other_slug'))
+
+    def test_group_missing_from_directory(self):
+        """Группа, о которой справочник не знает, дочитывается из БД."""
+        version = groups.get_directory().version
+        # on_commit не выполняется: так видит группу другой процесс
+        Group.objects.create(title='Новая группа', slug='new_slug')
+        response = self.guest_client.get(
+            reverse('posts:group_list', kwargs={'slug': 'new_slug'})
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(groups.current_version(), version)
+        self.assertEqual(groups.get_by_slug('new_slug').title, 'Новая группа')
+
+    def test_new_post_keeps_directory(self):
+        """Новый пост меняет счётчик группы, но не версию справочника."""
+        version = groups.get_directory().version
+        with capture_on_commit_callbacks(execute=True):
+            Post.objects.create(
+                author=GroupDirectoryTest.author,
+                group=GroupDirectoryTest.group,
+                text='Ещё пост'
+            )
+        self.assertEqual(groups.current_version(), version)
+        self.assertEqual(
+            counters.group_posts_count(GroupDirectoryTest.group.pk), 2
+        )
+
+    def test_unknown_group(self):
+        response = self.guest_client.get(
+            reverse('posts:group_list', kwargs={'slug': 'unknown'})
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_lookup(self):
+        """Подсказки ищутся по началу названия без учёта регистра."""
+        url = reverse('posts:group_lookup')
+        queries = {
+            'т': ['test_slug'],
+            'ДРУГ': ['other_slug'],
+            '': ['other_slug', 'test_slug'],
+            'группа': [],
+        }
+        for query, slugs in queries.items():
+            with self.subTest(query=query):
+                data = self.guest_client.get(url, {'q': query}).json()
+                self.assertEqual(
+                    [group['slug'] for group in data['results']], slugs
+                )
+                self.assertIsNone(data['next'])
+
+    @override_settings(GROUP_LOOKUP_LIMIT=1)
+    def test_lookup_pages(self):
+        url = reverse('posts:group_lookup')
+        data = self.guest_client.get(url).json()
+        self.assertEqual(data['results'][0]['slug'], 'other_slug')
+        self.assertEqual(data['next'], 2)
+        data = self.guest_client.get(url, {'page': data['next']}).json()
+        self.assertEqual(data['results'], [{
+            'id': GroupDirectoryTest.group.pk,
+            'slug': 'test_slug',
+            'title': 'Тестовая группа',
+        }])
+        self.assertIsNone(data['next'])
+
+    def test_search_bounds(self):
+        """Диапазон префикса не захватывает соседние названия."""
+        directory = groups.GroupDirectory('', [
+            Group(pk=i, slug=f's{i}', title=title)
+            for i, title in enumerate(('ab', 'Abc', 'abd', 'ac', 'b'))
+        ])
+        found, total = directory.search('AB', offset=1, limit=1)
+        self.assertEqual([group.title for group in found], ['Abc'])
+        self.assertEqual(total, 3)
+        self.assertEqual(directory.search('z'), ([], 0))
+
+    def test_form_without_group_list(self):
+        """Форма не выводит список групп и проверяет группу по id."""
+        groups.get_directory()
+        with self.assertNumQueries(0):
+            html = str(PostForm()['group'])
+        self.assertNotIn('<option', html)
+        self.assertNotIn('Тестовая группа', html)
+        form = PostForm({'text': 'Текст', 'group': 10 ** 6})
+        self.assertIn('group', form.errors)
+        form = PostForm({
+            'text': 'Текст', 'group': GroupDirectoryTest.other_group.pk
+        })
+        # поиск по id в поле формы и проверка внешнего ключа модели
+        with self.assertNumQueries(2):
+            self.assertTrue(form.is_valid())
+        self.assertEqual(
+            form.cleaned_data['group'], GroupDirectoryTest.other_group
+        )
+
+    def test_edit_page_shows_current_group(self):
+        post = Post.objects.get(group=GroupDirectoryTest.group)
+        response = self.author_client.get(
+            reverse('posts:post_edit', kwargs={'post_id': post.pk})
+        )
+        self.assertContains(
+            response,
+            f'name="group" value="{GroupDirectoryTest.group.pk}"'
+        )
+        self.assertContains(response, 'value="Тестовая группа"')
+        self.assertContains(response, 'js/group_autocomplete.js')
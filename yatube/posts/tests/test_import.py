@@ -0,0 +1,148 @@
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from posts.counters import author_posts_count, group_posts_count
+from posts.importers import PostImporter
+from posts.models import Group, Post
+from posts.search import SearchResults
+
+User = get_user_model()
+
+
+class ImportPostsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def write(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(content)
+        return path
+
+    def write_jsonl(self, records):
+        return self.write('posts.jsonl', ''.join(
+            json.dumps(record, ensure_ascii=False) + '\n'
+            for record in records
+        ))
+
+    def import_posts(self, path, **options):
+        stderr = StringIO()
+        call_command(
+            'import_posts', path, stdout=StringIO(), stderr=stderr, **options
+        )
+        return stderr.getvalue()
+
+    def test_import_jsonl(self):
+        """Посты из JSONL сохраняют дату, группу и учитываются в счётчиках."""
+        path = self.write_jsonl([
+            {
+                'text': 'Старый пост',
+                'author': 'author',
+                'group': 'test_slug',
+                'pub_date': '2015-03-01T10:00:00',
+            },
+            {'text': 'Пост без группы', 'author': 'author'},
+        ])
+        self.import_posts(path, batch_size=1)
+        post = Post.objects.get(text='Старый пост')
+        self.assertEqual(
+            post.pub_date,
+            timezone.make_aware(datetime(2015, 3, 1, 10), timezone.utc)
+        )
+        self.assertEqual(post.group, ImportPostsTest.group)
+        author = User.objects.select_related('stats').get(username='author')
+        self.assertEqual(author_posts_count(author), 2)
+        self.assertEqual(group_posts_count(self.group.pk), 1)
+        self.assertEqual(SearchResults('старые').count(), 1)
+
+    def test_model_field_untouched(self):
+        """Импорт ставит постам id и даты, не меняя поле pub_date модели."""
+        importer = PostImporter(index=False)
+        posts = [
+            importer.build({
+                'text': f'Импорт {number}',
+                'author': 'author',
+                'pub_date': '2015-03-01T10:00:00',
+            })
+            for number in range(3)
+        ]
+        importer.save(posts)
+        self.assertTrue(Post._meta.get_field('pub_date').auto_now_add)
+        saved = Post.objects.filter(text__startswith='Импорт').order_by('pk')
+        self.assertEqual(
+            [post.pk for post in posts], [post.pk for post in saved]
+        )
+        self.assertEqual({post.pub_date.year for post in saved}, {2015})
+        self.assertIsNotNone(saved[0].updated_at)
+        post = Post.objects.create(
+            author=ImportPostsTest.author, text='Новый пост'
+        )
+        self.assertGreater(post.pub_date.year, 2015)
+
+    def test_import_csv(self):
+        """CSV с заголовком импортируется так же, как JSONL."""
+        path = self.write(
+            'posts.csv',
+            'text,author,group,pub_date\n'
+            '"Пост, с запятой",author,test_slug,2020-01-01T00:00:00Z\n'
+        )
+        self.import_posts(path)
+        self.assertTrue(
+            Post.objects.filter(text='Пост, с запятой', group=self.group)
+            .exists()
+        )
+
+    def test_invalid_records_skipped(self):
+        """Некорректные записи пропускаются с сообщением об ошибке."""
+        path = self.write('posts.jsonl', '\n'.join((
+            '{"text": "Хороший пост", "author": "author"}',
+            '{"text": "Пост", "author": "nobody"}',
+            '{"text": "Пост", "author": "author", "group": "nope"}',
+            '{"text": "", "author": "author"}',
+            '{"text": "Пост", "author": "author", "pub_date": "вчера"}',
+            '[1, 2]',
+            '{не json',
+        )))
+        errors = self.import_posts(path)
+        self.assertEqual(Post.objects.count(), 1)
+        self.assertEqual(len(errors.splitlines()), 6)
+        self.assertIn('Запись 2: неизвестный автор', errors)
+
+    def test_resume_from_checkpoint(self):
+        """Повторный запуск продолжает импорт с контрольной точки."""
+        path = self.write_jsonl(
+            {'text': f'Пост {i}', 'author': 'author'} for i in range(5)
+        )
+        with open(path + '.checkpoint', 'w', encoding='utf-8') as file:
+            json.dump({'position': 3, 'imported': 3, 'skipped': 0}, file)
+        self.import_posts(path, batch_size=2)
+        self.assertQuerysetEqual(
+            Post.objects.order_by('text'),
+            ['Пост 3', 'Пост 4'],
+            transform=lambda post: post.text
+        )
+        with open(path + '.checkpoint', encoding='utf-8') as file:
+            self.assertEqual(json.load(file)['position'], 5)
+        self.import_posts(path)
+        self.assertEqual(Post.objects.count(), 2)
+        self.import_posts(path, restart=True)
+        self.assertEqual(Post.objects.count(), 7)
@@ -0,0 +1,138 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase, Client
+from core.testing import capture_on_commit_callbacks
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class AnonymousPageCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.group_2 = Group.objects.create(
+            title='Тестовая группа 2',
+            slug='test_slug_2',
+            description='Тестовое описание 2',
+        )
+        cls.post = Post.objects.create(
+            author=cls.author,
+            group=cls.group,
+            text='Тестовый пост'
+        )
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.guest_client = Client()
+        self.author_client = Client()
+        self.author_client.force_login(AnonymousPageCacheTest.author)
+
+    def test_anonymous_pages_cached(self):
+        """Повторный анонимный запрос стоит одного запроса валидатора."""
+        for address in ('/', '/group/test_slug/', '/profile/author/'):
+            with self.subTest(address=address):
+                content = self.guest_client.get(address).content
+                with self.assertNumQueries(1):
+                    response = self.guest_client.get(address)
+                self.assertEqual(response.content, content)
+
+    def test_authorized_pages_not_cached(self):
+        """Авторизованный пользователь получает страницу без кэша."""
+        self.author_client.get('/')
+        response = self.author_client.get('/')
+        self.assertIsNotNone(response.context)
+        self.assertContains(response, 'Пользователь: author')
+
+    def test_new_post_invalidates_its_feeds(self):
+        """Новый пост сбрасывает только ленты, в которые он попадает."""
+        addresses = (
+            '/', '/group/test_slug/', '/group/test_slug_2/', '/profile/author/'
+        )
+        for address in addresses:
+            self.guest_client.get(address)
+        with capture_on_commit_callbacks(execute=True):
+            Post.objects.create(
+                author=AnonymousPageCacheTest.author,
+                group=AnonymousPageCacheTest.group_2,
+                text='Новый пост'
+            )
+        for address in ('/', '/group/test_slug_2/', '/profile/author/'):
+            with self.subTest(address=address):
+                response = self.guest_client.get(address)
+                self.assertContains(response, 'Новый пост')
+        with self.assertNumQueries(1):
+            self.guest_client.get('/group/test_slug/')
+
+    def test_moved_post_invalidates_old_group(self):
+        """Перенос поста сбрасывает страницу прежней группы."""
+        self.guest_client.get('/group/test_slug/')
+        post = Post.objects.get(pk=AnonymousPageCacheTest.post.pk)
+        post.group = AnonymousPageCacheTest.group_2
+        with capture_on_commit_callbacks(execute=True):
+            post.save()
+        response = self.guest_client.get('/group/test_slug/')
+        self.assertNotContains(response, 'Тестовый пост')
+
+    def test_group_description_invalidates_its_pages(self):
+        """Новое описание группы сбрасывает её страницу и ETag."""
+        response = self.guest_client.get('/group/test_slug/')
+        etag = response['ETag']
+        group = Group.objects.get(pk=AnonymousPageCacheTest.group.pk)
+        group.description = 'Новое описание'
+        with capture_on_commit_callbacks(execute=True):
+            group.save()
+        response = self.guest_client.get(
+            '/group/test_slug/', HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertContains(
+            self.guest_client.get('/group/test_slug/'), 'Новое описание'
+        )
+
+    def test_pages_invalidated_after_commit(self):
+        """Удалённый пост пропадает из кэша после фиксации транзакции."""
+        Post.objects.create(
+            author=AnonymousPageCacheTest.author,
+            text='Новый пост'
+        )
+        content = self.guest_client.get('/').content
+        with capture_on_commit_callbacks() as callbacks:
+            Post.objects.get(pk=AnonymousPageCacheTest.post.pk).delete()
+        self.assertEqual(self.guest_client.get('/').content, content)
+        for callback in callbacks:
+            callback()
+        self.assertNotContains(self.guest_client.get('/'), 'Тестовый пост')
+
+    def test_new_post_shown_before_commit_callbacks(self):
+        """Новый пост меняет ключ страницы, не дожидаясь сдвига версии."""
+        self.guest_client.get('/')
+        with capture_on_commit_callbacks():
+            Post.objects.create(
+                author=AnonymousPageCacheTest.author,
+                text='Новый пост'
+            )
+        self.assertContains(self.guest_client.get('/'), 'Новый пост')
+
+    def test_conditional_get(self):
+        """Клиент с актуальными валидаторами получает 304."""
+        response = self.guest_client.get('/')
+        validators = {
+            'HTTP_IF_NONE_MATCH': response['ETag'],
+            'HTTP_IF_MODIFIED_SINCE': response['Last-Modified'],
+        }
+        for header, value in validators.items():
+            with self.subTest(header=header):
+                response = self.guest_client.get('/', **{header: value})
+                self.assertEqual(
+                    response.status_code, HTTPStatus.NOT_MODIFIED
+                )
@@ -0,0 +1,168 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from core.db import estimate_rows
+from posts.models import Group, Post
+from posts.paginators import (
+    CountedPaginator, CursorPaginator, decode_cursor, encode_cursor
+)
+from yatube.settings import PER_PAGE
+
+User = get_user_model()
+
+
+class CursorPaginatorTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.test_posts_count = PER_PAGE * 2 + 3
+        for i in range(cls.test_posts_count):
+            Post.objects.create(
+                author=cls.author,
+                group=cls.group,
+                text=f'Тестовый пост {i}'
+            )
+        cls.posts = list(Post.objects.all())
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.guest_client = Client()
+        self.paginator = CursorPaginator(Post.objects.all(), PER_PAGE)
+
+    def test_cursor_round_trip(self):
+        """Токен однозначно восстанавливает ключ поста."""
+        post = CursorPaginatorTest.posts[0]
+        self.assertEqual(
+            decode_cursor(encode_cursor(post)),
+            (post.pub_date, post.pk)
+        )
+        for token in ('', 'мусор', 'bm90LWEtY3Vyc29y'):
+            with self.subTest(token=token):
+                self.assertIsNone(decode_cursor(token))
+
+    def test_walk_forward_and_back(self):
+        """Переходы по токенам обходят ленту без пропусков и повторов."""
+        seen = []
+        page = self.paginator.get_page()
+        self.assertFalse(page.has_previous())
+        while True:
+            seen.extend(page.object_list)
+            if not page.has_next():
+                break
+            page = self.paginator.get_page(after=page.next_cursor)
+        self.assertEqual(seen, CursorPaginatorTest.posts)
+        self.assertEqual(
+            len(page), CursorPaginatorTest.test_posts_count % PER_PAGE
+        )
+        previous = self.paginator.get_page(before=page.previous_cursor)
+        self.assertEqual(
+            list(previous.object_list),
+            CursorPaginatorTest.posts[PER_PAGE:PER_PAGE * 2]
+        )
+
+    def test_page_query_count(self):
+        """Страница по токену - один запрос без COUNT(*)."""
+        first = self.paginator.get_page()
+        with self.assertNumQueries(1):
+            self.paginator.get_page(after=first.next_cursor)
+
+    @override_settings(PAGINATION_MODE='cursor')
+    def test_views_use_cursor_mode(self):
+        """Ленты отдают страницы по токенам ?after=."""
+        addresses = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': 'test_slug'}),
+            reverse('posts:profile', kwargs={'username': 'author'}),
+        )
+        for address in addresses:
+            with self.subTest(address=address):
+                response = self.guest_client.get(address)
+                page_obj = response.context['page_obj']
+                self.assertEqual(len(page_obj), PER_PAGE)
+                response = self.guest_client.get(
+                    address, {'after': page_obj.next_cursor}
+                )
+                self.assertEqual(
+                    list(response.context['page_obj']),
+                    CursorPaginatorTest.posts[PER_PAGE:PER_PAGE * 2]
+                )
+
+
+class ElidedPageRangeTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        for i in range(PER_PAGE * 10):
+            Post.objects.create(author=cls.author, text=f'Тестовый пост {i}')
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.guest_client = Client()
+
+    def test_elided_page_range(self):
+        """Длина списка номеров не зависит от числа страниц."""
+        ellipsis = CountedPaginator.ELLIPSIS
+        paginator = CountedPaginator(range(1000), 10)
+        ranges = {
+            1: [1, 2, 3, ellipsis, 100],
+            5: [1, 2, 3, 4, 5, 6, 7, ellipsis, 100],
+            50: [1, ellipsis, 48, 49, 50, 51, 52, ellipsis, 100],
+            100: [1, ellipsis, 98, 99, 100],
+        }
+        for number, expected in ranges.items():
+            with self.subTest(number=number):
+                self.assertEqual(
+                    list(paginator.get_elided_page_range(number)), expected
+                )
+        self.assertEqual(
+            list(CountedPaginator(range(30), 10).get_elided_page_range(2)),
+            [1, 2, 3]
+        )
+
+    def test_paginator_renders_elided_range(self):
+        response = self.guest_client.get(reverse('posts:index') + '?page=7')
+        content = response.content.decode()
+        self.assertIn(CountedPaginator.ELLIPSIS, content)
+        self.assertNotIn('?page=2"', content)
+        # 1, 5, 6, 8, 9, 10 и Первая/Предыдущая/Следующая/Последняя
+        self.assertEqual(content.count('page-link" href'), 10)
+
+    @override_settings(PAGINATION_COUNT='approximate', TIMELINE_ENABLED=False)
+    def test_approximate_count_cached(self):
+        """Повторный запрос ленты не считает посты через COUNT(*)."""
+        url = reverse('posts:index')
+        self.guest_client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.guest_client.get(url + '?page=2')
+        self.assertEqual(
+            response.context['page_obj'].paginator.count, PER_PAGE * 10
+        )
+        self.assertFalse(
+            [q for q in queries if 'COUNT(' in q['sql']]
+        )
+
+    @override_settings(
+        PAGINATION_COUNT='approximate', APPROXIMATE_COUNT_MIN_ROWS=1
+    )
+    def test_estimate_rows(self):
+        """Оценка берётся из статистики БД после ANALYZE."""
+        self.assertIsNone(estimate_rows(Group))
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        self.assertEqual(estimate_rows(Post), PER_PAGE * 10)
+        response = self.guest_client.get(reverse('posts:index'))
+        self.assertEqual(
+            response.context['page_obj'].paginator.count, PER_PAGE * 10
+        )
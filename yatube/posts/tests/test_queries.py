@@ -0,0 +1,80 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from posts import groups
+from posts.models import Group, Post
+from yatube.settings import PER_PAGE
+
+User = get_user_model()
+
+
+@override_settings(PAGE_CACHE_ENABLED=False, TIMELINE_ENABLED=False)
+class FeedQueryBudgetTest(TestCase):
+    """Число SQL-запросов страницы не зависит от числа постов на ней."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        for i in range(PER_PAGE + 3):
+            author = User.objects.create_user(
+                username=f'author_{i}',
+                first_name='Имя',
+                last_name=f'Фамилия {i}',
+            )
+            cls.post = Post.objects.create(
+                author=author,
+                group=cls.group,
+                text='Тестовый пост'
+            )
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def test_views_query_budget(self):
+        """Страницы укладываются в бюджет запросов."""
+        post = FeedQueryBudgetTest.post
+        query_budget = {
+            '/': 3,
+            '/?page=2': 3,
+            '/group/test_slug/': 3,
+            f'/profile/{post.author.username}/': 3,
+            f'/posts/{post.id}/': 2,
+        }
+        # справочник групп загружается один раз на процесс
+        groups.get_directory()
+        for address, budget in query_budget.items():
+            with self.subTest(address=address):
+                with self.assertNumQueries(budget):
+                    self.guest_client.get(address)
+
+    def test_feed_prunes_columns(self):
+        """Лента не загружает поля, которые не выводит."""
+        post = Post.objects.feed().get(pk=FeedQueryBudgetTest.post.pk)
+        with self.assertNumQueries(0):
+            post.author.get_full_name()
+            post.author.username
+            post.group.slug
+        self.assertEqual(post.get_deferred_fields(), {'idempotency_key'})
+        self.assertIn('password', post.author.get_deferred_fields())
+        self.assertIn('description', post.group.get_deferred_fields())
+
+    def test_feeds_use_indexes(self):
+        """Ленты читаются по индексу без сортировки во временном B-дереве."""
+        call_command('explain_feeds', stdout=StringIO())
+        with connection.cursor() as cursor:
+            cursor.execute('DROP INDEX post_group_feed_idx')
+        with self.assertRaisesMessage(CommandError, '/group/test_slug/'):
+            call_command('explain_feeds', stdout=StringIO())
+        with connection.cursor() as cursor:
+            cursor.execute('DROP INDEX post_feed_idx')
+        with self.assertRaisesMessage(CommandError, 'TEMP B-TREE'):
+            call_command('explain_feeds', stdout=StringIO())
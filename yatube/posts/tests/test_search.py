@@ -0,0 +1,149 @@
+from io import StringIO
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from posts.models import Post, PostTerm
+from posts.search import SearchResults, fts5_available, highlight
+from posts.stemmer import stem
+
+User = get_user_model()
+
+
+class StemmerTest(TestCase):
+    def test_word_forms_share_stem(self):
+        """Формы одного слова приводятся к общей основе."""
+        forms = {
+            'книга': ('книги', 'книгой', 'книгами', 'книгах'),
+            'гулять': ('гуляли', 'гуляла', 'гуляющий'),
+            'новый': ('новые', 'новая', 'нового', 'новыми'),
+        }
+        for word, variants in forms.items():
+            for variant in variants:
+                with self.subTest(variant=variant):
+                    self.assertEqual(stem(variant), stem(word))
+
+    def test_other_words_lowercased(self):
+        """Слова без русских гласных только приводятся к нижнему регистру."""
+        self.assertEqual(stem('Django'), 'django')
+        self.assertEqual(stem('2022'), '2022')
+
+    def test_highlight_escapes_text(self):
+        """Подсветка выделяет формы слова и экранирует текст поста."""
+        self.assertEqual(
+            highlight('<b>Книги</b> и книга', [stem('книга')]),
+            '&lt;b&gt;<mark>Книги</mark>&lt;/b&gt; и <mark>книга</mark>'
+        )
+
+
+@override_settings(SEARCH_BACKEND='fts5')
+class PostSearchTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.post = Post.objects.create(
+            author=cls.author,
+            text='Старые книги лежали на полке'
+        )
+        cls.post_2 = Post.objects.create(
+            author=cls.author,
+            text='Новая книга о книгах и книжных полках'
+        )
+        cls.post_3 = Post.objects.create(
+            author=cls.author,
+            text='Вечером гуляли у реки'
+        )
+
+    def setUp(self):
+        if settings.SEARCH_BACKEND == 'fts5' and not fts5_available():
+            self.skipTest('SQLite собран без FTS5')
+        self.guest_client = Client()
+
+    def found(self, query):
+        return [post.pk for post in SearchResults(query)[0:10]]
+
+    def test_search_by_word_forms(self):
+        """Поиск находит посты по другим формам слов запроса."""
+        queries = {
+            'книгу': {self.post.pk, self.post_2.pk},
+            'старая книга': {self.post.pk},
+            'гулять': {self.post_3.pk},
+            'река гуляли': {self.post_3.pk},
+            'самолёт': set(),
+            '': set(),
+        }
+        for query, expected in queries.items():
+            with self.subTest(query=query):
+                self.assertEqual(set(self.found(query)), expected)
+                self.assertEqual(SearchResults(query).count(), len(expected))
+
+    def test_results_ranked(self):
+        """Пост с частым словом запроса стоит выше."""
+        self.assertEqual(
+            self.found('книга'),
+            [self.post_2.pk, self.post.pk]
+        )
+
+    def test_index_follows_changes(self):
+        """Индекс обновляется при изменении и удалении поста."""
+        post = Post.objects.get(pk=self.post_3.pk)
+        post.text = 'Утром читали книгу'
+        post.save()
+        self.assertIn(post.pk, self.found('книги'))
+        self.assertNotIn(post.pk, self.found('гуляли'))
+        post.delete()
+        self.assertNotIn(post.pk, self.found('книги'))
+
+    def test_rebuild_command(self):
+        """Команда перестраивает индекс по всем постам."""
+        Post.objects.bulk_create([
+            Post(author=self.author, text='Письмо из города')
+        ])
+        self.assertEqual(self.found('письма'), [])
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(len(self.found('письма')), 1)
+
+    def test_search_page(self):
+        """Страница поиска показывает подсвеченные результаты."""
+        response = self.guest_client.get(
+            reverse('posts:search'), {'q': 'книги'}
+        )
+        self.assertTemplateUsed(response, 'posts/search.html')
+        self.assertEqual(response.context['query'], 'книги')
+        self.assertEqual(response.context['page_obj'].paginator.count, 2)
+        self.assertContains(response, '<mark>книги</mark>')
+        self.assertTemplateUsed(response, 'posts/includes/post_card.html')
+
+    def test_fts5_checked_once(self):
+        """Наличие таблицы FTS5 проверяется один раз на базу."""
+        fts5_available()
+        with self.assertNumQueries(0):
+            fts5_available()
+
+    def test_pagination_keeps_query(self):
+        """Ссылки пагинатора сохраняют поисковый запрос."""
+        Post.objects.bulk_create(
+            Post(author=self.author, text=f'Книга номер {i}')
+            for i in range(12)
+        )
+        call_command('rebuild_search_index', stdout=StringIO())
+        response = self.guest_client.get(
+            reverse('posts:search'), {'q': 'книга'}
+        )
+        self.assertEqual(len(response.context['page_obj']), 10)
+        next_page = urlencode({'q': 'книга', 'page': 2}).replace('&', '&amp;')
+        self.assertContains(response, f'href="?{next_page}"')
+
+
+@override_settings(SEARCH_BACKEND='inverted')
+class InvertedIndexSearchTest(PostSearchTest):
+    def test_terms_stored(self):
+        """Обратный индекс хранит основы слов с их частотой."""
+        term = PostTerm.objects.get(
+            post=self.post_2, term=stem('книга')
+        )
+        self.assertEqual(term.weight, 2)
@@ -0,0 +1,211 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from core.testing import capture_on_commit_callbacks
+from posts import timelines
+from posts.models import Group, Post
+from yatube.settings import PER_PAGE
+
+User = get_user_model()
+
+
+@override_settings(PAGE_CACHE_ENABLED=False)
+class TimelineTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.group_2 = Group.objects.create(
+            title='Тестовая группа 2',
+            slug='test_slug_2',
+            description='Тестовое описание 2',
+        )
+        for i in range(PER_PAGE + 3):
+            cls.post = Post.objects.create(
+                author=cls.author,
+                group=cls.group,
+                text=f'Тестовый пост {i}'
+            )
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.guest_client = Client()
+
+    def page_ids(self, address):
+        response = self.guest_client.get(address)
+        return [post.pk for post in response.context['page_obj']]
+
+    def live_ids(self, queryset, page=1):
+        start = (page - 1) * PER_PAGE
+        return list(
+            queryset.values_list('pk', flat=True)[start:start + PER_PAGE]
+        )
+
+    def test_warm_timeline_reads_posts_by_key(self):
+        """Готовый список читается по ключу без сортировки ленты."""
+        addresses = ('/', '/group/test_slug/', '/profile/author/')
+        for address in addresses:
+            with self.subTest(address=address):
+                self.guest_client.get(address)
+                with CaptureQueriesContext(connection) as context:
+                    self.guest_client.get(address)
+                feed_queries = [
+                    query['sql'] for query in context.captured_queries
+                    if 'ORDER BY "posts_post"."pub_date"' in query['sql']
+                ]
+                self.assertEqual(feed_queries, [])
+
+    def test_pages_match_live_query(self):
+        """Страницы из списка совпадают со страницами живого запроса."""
+        feeds = {
+            '/': Post.objects.all(),
+            '/group/test_slug/': Post.objects.filter(
+                group=TimelineTest.group
+            ),
+            '/profile/author/': Post.objects.filter(
+                author=TimelineTest.author
+            ),
+        }
+        for address, queryset in feeds.items():
+            for page in (1, 2):
+                with self.subTest(address=address, page=page):
+                    self.assertEqual(
+                        self.page_ids(f'{address}?page={page}'),
+                        self.live_ids(queryset, page)
+                    )
+
+    @override_settings(TIMELINE_LENGTH=PER_PAGE + 1)
+    def test_page_beyond_timeline_uses_live_query(self):
+        """Страница за концом списка читается живым запросом."""
+        self.guest_client.get('/')
+        self.assertEqual(
+            self.page_ids('/?page=2'), self.live_ids(Post.objects.all(), 2)
+        )
+
+    def test_new_post_added_to_its_timelines(self):
+        """Новый пост попадает в начало списков своих лент."""
+        for address in ('/', '/group/test_slug/', '/profile/author/'):
+            self.guest_client.get(address)
+        with capture_on_commit_callbacks(execute=True):
+            post = Post.objects.create(
+                author=TimelineTest.author,
+                group=TimelineTest.group,
+                text='Новый пост'
+            )
+        feeds = ('index', f'group:{post.group_id}', f'author:{post.author_id}')
+        for feed in feeds:
+            with self.subTest(feed=feed):
+                entries = timelines.load(feed)['entries']
+                self.assertEqual(-entries[0][1], post.pk)
+                self.assertEqual(len(entries), PER_PAGE + 4)
+
+    def test_edited_post_moves_between_groups(self):
+        """Пост, перенесённый в другую группу, меняет список группы."""
+        group, group_2 = TimelineTest.group, TimelineTest.group_2
+        self.guest_client.get('/group/test_slug/')
+        self.guest_client.get('/group/test_slug_2/')
+        post = Post.objects.get(pk=TimelineTest.post.pk)
+        post.group = group_2
+        with capture_on_commit_callbacks(execute=True):
+            post.save()
+        self.assertNotIn(post.pk, self.page_ids('/group/test_slug/'))
+        self.assertEqual(self.page_ids('/group/test_slug_2/'), [post.pk])
+        self.assertEqual(
+            self.page_ids('/group/test_slug/'),
+            self.live_ids(Post.objects.filter(group=group))
+        )
+
+    def test_deleted_post_removed_from_timelines(self):
+        """Удалённый пост убирается из списков лент."""
+        self.guest_client.get('/')
+        with capture_on_commit_callbacks(execute=True):
+            Post.objects.get(pk=TimelineTest.post.pk).delete()
+        self.assertNotIn(TimelineTest.post.pk, self.page_ids('/'))
+        self.assertEqual(self.page_ids('/'), self.live_ids(Post.objects.all()))
+
+    def test_timelines_updated_after_commit(self):
+        """Списки меняются только после фиксации транзакции."""
+        self.guest_client.get('/')
+        entries = timelines.load('index')['entries']
+        with capture_on_commit_callbacks() as callbacks:
+            post = Post.objects.create(
+                author=TimelineTest.author, text='Новый пост'
+            )
+        self.assertEqual(timelines.load('index')['entries'], entries)
+        for callback in callbacks:
+            callback()
+        self.assertEqual(-timelines.load('index')['entries'][0][1], post.pk)
+
+    def test_timeline_catches_up_with_other_process(self):
+        """Пост, сохранённый другим процессом, дочитывается в список."""
+        addresses = (
+            '/', '/group/test_slug/', '/group/test_slug_2/', '/profile/author/'
+        )
+        for address in addresses:
+            self.guest_client.get(address)
+        # колбэки не выполняются: так запись видит кэш другого процесса
+        with capture_on_commit_callbacks():
+            post = Post.objects.create(
+                author=TimelineTest.author,
+                group=TimelineTest.group_2,
+                text='Новый пост'
+            )
+            moved = Post.objects.get(pk=TimelineTest.post.pk)
+            moved.group = TimelineTest.group_2
+            moved.save()
+        for address in ('/', '/group/test_slug_2/', '/profile/author/'):
+            with self.subTest(address=address):
+                self.assertIn(post.pk, self.page_ids(address))
+        self.assertEqual(
+            self.page_ids('/group/test_slug_2/'), [post.pk, moved.pk]
+        )
+        self.assertNotIn(moved.pk, self.page_ids('/group/test_slug/'))
+
+    def test_missing_post_drops_timeline(self):
+        """Пост из списка, которого нет в базе, сбрасывает список."""
+        self.guest_client.get('/')
+        timeline = timelines.load('index')
+        timeline['entries'].insert(0, (timeline['entries'][0][0], -10 ** 6))
+        timelines.get_cache().set(timelines.timeline_key('index'), timeline)
+        self.assertEqual(self.page_ids('/'), self.live_ids(Post.objects.all()))
+        self.assertIsNone(timelines.load('index'))
+
+    def test_rebuild_timelines(self):
+        """Команда собирает списки всех лент заново."""
+        self.guest_client.get('/')
+        timelines.invalidate_all()
+        self.assertIsNone(timelines.load('index'))
+        call_command('rebuild_timelines', stdout=StringIO())
+        feeds = (
+            'index',
+            f'group:{TimelineTest.group.pk}',
+            f'group:{TimelineTest.group_2.pk}',
+            f'author:{TimelineTest.author.pk}',
+        )
+        for feed in feeds:
+            with self.subTest(feed=feed):
+                self.assertIsNotNone(timelines.load(feed))
+        self.assertEqual(timelines.load(f'group:{TimelineTest.group_2.pk}'), {
+            'generation': timelines.get_cache().get(timelines.GENERATION_KEY),
+            'entries': [],
+            'complete': True,
+            'changed': None,
+        })
+
+    @override_settings(TIMELINE_ENABLED=False)
+    def test_timeline_disabled(self):
+        """Без TIMELINE_ENABLED лента читается живым запросом."""
+        self.guest_client.get(reverse('posts:index'))
+        self.assertIsNone(timelines.load('index'))
@@ -1,9 +1,9 @@
 from django import forms
 from django.contrib.auth import get_user_model
 from django.core.paginator import Page
-from django.db.models.query import QuerySet
 from django.test import TestCase, Client
 from django.urls import reverse
+from core.testing import capture_on_commit_callbacks
 from posts.models import Group, Post
 from posts.forms import PostForm
 from yatube.settings import PER_PAGE
@@ -81,16 +81,15 @@ class PostPagesTest(TestCase):
             'user': User,
             'form': PostForm,
             'is_edit': bool,
-            'post_id': int,
-            'groups': QuerySet
+            'post_id': int
         }
         views_context = {
             '/': ('title', 'page_obj'),
             '/group/test_slug/': ('page_obj', 'group'),
             '/profile/author/': ('title', 'count', 'page_obj', 'author'),
             f'/posts/{id}/': ('title', 'count', 'post', 'user'),
-            f'/posts/{id}/edit/': ('form', 'is_edit', 'post_id', 'groups'),
-            '/create/': ('form', 'groups')
+            f'/posts/{id}/edit/': ('form', 'is_edit', 'post_id'),
+            '/create/': ('form',)
         }
         form_fields = {
             'text': forms.fields.CharField,
@@ -137,16 +136,18 @@ class PostPagesTest(TestCase):
                         paginator_test(address, item_value)
 
     def test_post_create(self):
-        group2 = Group.objects.create(
-            title='Тестовая группа 2',
-            slug='test_slug_2',
-            description='Тестовое описание 2',
-        )
-        post = Post.objects.create(
-            author=PostPagesTest.author,
-            group=group2,
-            text='Тестовый пост 2'
-        )
+        with capture_on_commit_callbacks(execute=True):
+            group2 = Group.objects.create(
+                title='Тестовая группа 2',
+                slug='test_slug_2',
+                description='Тестовое описание 2',
+            )
+        with capture_on_commit_callbacks(execute=True):
+            post = Post.objects.create(
+                author=PostPagesTest.author,
+                group=group2,
+                text='Тестовый пост 2'
+            )
         addresses = ('/', '/group/test_slug_2/', '/profile/author/')
         for address in addresses:
             with self.subTest(address=address):
@@ -0,0 +1,240 @@
+"""Готовые списки первых постов лент в кэше (fan-out on write).
+
+Лента хранится как список пар (-pub_date, -pk) по возрастанию, то есть
+от новых постов к старым, длиной не больше TIMELINE_LENGTH. Списки
+собираются при первом чтении и дальше обновляются после фиксации
+транзакций, сохраняющих и удаляющих посты, поэтому страница ленты
+читает посты по первичному ключу вместо сортировки таблицы.
+
+Список помнит время последнего изменения постов ленты на момент его
+сборки (changed). Если лента менялась позже, например в другом процессе
+со своим кэшем (locmem), перед чтением в список добавляются посты,
+изменённые после этой отметки. Пост, ушедший из ленты, обнаруживается
+при чтении по первичным ключам. Списки живут TIMELINE_TIMEOUT секунд.
+"""
+import bisect
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from posts.conditional import newest_change
+
+GENERATION_KEY = 'timeline_generation'
+# сколько секунд держится блокировка обновления списка
+LOCK_TIMEOUT = 5
+
+
+def get_cache():
+    return caches[settings.TIMELINE_CACHE_ALIAS]
+
+
+def timeline_key(feed):
+    return f'timeline:{feed}'
+
+
+def post_timelines(author_id, group_id):
+    """Ленты, в которые входит пост автора author_id в группе group_id."""
+    feeds = ['index', f'author:{author_id}']
+    if group_id is not None:
+        feeds.append(f'group:{group_id}')
+    return feeds
+
+
+def _entry(pub_date, pk):
+    return (-pub_date.timestamp(), -pk)
+
+
+def load(feed):
+    """Список ленты текущего поколения или None."""
+    key = timeline_key(feed)
+    values = get_cache().get_many([GENERATION_KEY, key])
+    timeline = values.get(key)
+    if timeline is None or timeline['generation'] != values.get(
+        GENERATION_KEY
+    ):
+        return None
+    return timeline
+
+
+def build(feed, queryset, changed=None):
+    """Собирает список ленты из queryset и кладёт его в кэш.
+
+    changed - время последнего изменения ленты, прочитанное до сборки:
+    пост, сохранённый во время сборки, будет дочитан при следующем
+    чтении.
+    """
+    cache = get_cache()
+    generation = cache.get(GENERATION_KEY)
+    if changed is None:
+        changed = newest_change(queryset)
+    rows = queryset.order_by('-pub_date', '-pk').values_list(
+        'pub_date', 'pk'
+    )[:settings.TIMELINE_LENGTH]
+    entries = [_entry(pub_date, pk) for pub_date, pk in rows]
+    timeline = {
+        'generation': generation,
+        'entries': entries,
+        # короткий список содержит всю ленту
+        'complete': len(entries) < settings.TIMELINE_LENGTH,
+        'changed': changed,
+    }
+    cache.set(timeline_key(feed), timeline, settings.TIMELINE_TIMEOUT)
+    return timeline
+
+
+def _update(feed, change):
+    """Меняет список ленты, если он уже собран.
+
+    Параллельное обновление того же списка не ждёт блокировку, а
+    удаляет список: следующее чтение соберёт его заново.
+    """
+    cache = get_cache()
+    key = timeline_key(feed)
+    lock = f'{key}:lock'
+    if not cache.add(lock, 1, LOCK_TIMEOUT):
+        cache.delete(key)
+        return
+    try:
+        timeline = load(feed)
+        if timeline is not None:
+            change(timeline)
+            cache.set(key, timeline, settings.TIMELINE_TIMEOUT)
+    finally:
+        cache.delete(lock)
+
+
+def _remover(pk):
+    def change(timeline):
+        timeline['entries'] = [
+            entry for entry in timeline['entries'] if entry[1] != -pk
+        ]
+    return change
+
+
+def _inserter(post):
+    return _entry_inserter(post.pub_date, post.pk)
+
+
+def _entry_inserter(pub_date, pk):
+    remove = _remover(pk)
+    entry = _entry(pub_date, pk)
+
+    def change(timeline):
+        remove(timeline)
+        entries = timeline['entries']
+        position = bisect.bisect(entries, entry)
+        # за концом неполного списка пост может стоять не на своём месте
+        if position == len(entries) and not timeline['complete']:
+            return
+        entries.insert(position, entry)
+        if len(entries) > settings.TIMELINE_LENGTH:
+            del entries[settings.TIMELINE_LENGTH:]
+            timeline['complete'] = False
+    return change
+
+
+def _apply_on_commit(updates, using):
+    """Применяет изменения списков после фиксации транзакции.
+
+    Изменения собираются сразу, пока пост не изменился, а откаченная
+    транзакция не оставляет в списках несуществующих постов.
+    """
+    def apply():
+        for feed, change in updates:
+            _update(feed, change)
+    transaction.on_commit(apply, using=using)
+
+
+def add(post, previous_owner=None, using=None):
+    """Добавляет сохранённый пост в его ленты и убирает из прежних."""
+    feeds = post_timelines(post.author_id, post.group_id)
+    updates = []
+    if previous_owner is not None:
+        updates.extend(
+            (feed, _remover(post.pk))
+            for feed in post_timelines(*previous_owner)
+            if feed not in feeds
+        )
+    updates.extend((feed, _inserter(post)) for feed in feeds)
+    _apply_on_commit(updates, using)
+
+
+def remove(post, using=None):
+    """Убирает удалённый пост из его лент."""
+    _apply_on_commit([
+        (feed, _remover(post.pk))
+        for feed in post_timelines(post.author_id, post.group_id)
+    ], using)
+
+
+def catch_up(feed, queryset, timeline, changed):
+    """Добавляет в список посты ленты, изменённые после его отметки.
+
+    Если таких постов больше длины списка, он собирается заново.
+    """
+    rows = list(queryset.filter(
+        updated_at__gt=timeline['changed']
+    ).order_by().values_list('pub_date', 'pk')[:settings.TIMELINE_LENGTH + 1])
+    if len(rows) > settings.TIMELINE_LENGTH:
+        return build(feed, queryset, changed)
+    changes = [_entry_inserter(pub_date, pk) for pub_date, pk in rows]
+
+    def change(timeline):
+        for insert in changes:
+            insert(timeline)
+        timeline['changed'] = changed
+
+    change(timeline)
+    _update(feed, change)
+    return timeline
+
+
+def invalidate_all():
+    """Сбрасывает все списки, например после загрузки в обход сигналов."""
+    get_cache().set(GENERATION_KEY, uuid.uuid4().hex, None)
+
+
+class TimelineList:
+    """Посты ленты, которые Paginator читает по срезам.
+
+    Срез внутри готового списка загружается по первичным ключам, срез
+    за его концом - живым запросом queryset. Число постов всегда
+    считается по queryset: список хранит только начало ленты. changed -
+    время последнего изменения ленты, если оно уже прочитано.
+    """
+
+    def __init__(self, feed, queryset, changed=None):
+        self.feed = feed
+        self.queryset = queryset
+        self.changed = changed
+
+    def get_timeline(self):
+        """Список ленты, догнавший её последние изменения."""
+        changed = self.changed or newest_change(self.queryset)
+        timeline = load(self.feed)
+        if timeline is None or timeline.get('changed') is None:
+            return build(self.feed, self.queryset, changed)
+        if changed is not None and changed > timeline['changed']:
+            return catch_up(self.feed, self.queryset, timeline, changed)
+        return timeline
+
+    def count(self):
+        return self.queryset.count()
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, item):
+        timeline = self.get_timeline()
+        entries = timeline['entries']
+        if item.stop > len(entries) and not timeline['complete']:
+            return list(self.queryset[item])
+        ids = [-pk for _, pk in entries[item.start or 0:item.stop]]
+        posts = self.queryset.in_bulk(ids)
+        if len(posts) < len(ids):
+            # пост из списка не сохранился: список собирается заново
+            get_cache().delete(timeline_key(self.feed))
+            return list(self.queryset[item])
+        return [posts[pk] for pk in ids]
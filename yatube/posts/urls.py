@@ -7,8 +7,28 @@ app_name = 'posts'
 urlpatterns = [
     path('', views.index, name='index'),
     path('group/<slug:slug>/', views.group_post, name='group_list'),
+    path('groups/', views.group_index, name='group_index'),
+    path('groups/lookup/', views.group_lookup, name='group_lookup'),
     path('profile/<str:username>/', views.profile, name='profile'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
-    path('create/', views.post_create, name='post_create')
+    path('create/', views.post_create, name='post_create'),
+    path('search/', views.search, name='search'),
+    path('api/posts/', views.api_index, name='api_index'),
+    path('api/group/<slug:slug>/', views.api_group, name='api_group'),
+    path(
+        'api/profile/<str:username>/',
+        views.api_profile,
+        name='api_profile'
+    ),
+    path(
+        'api/posts/<int:post_id>/',
+        views.api_post_detail,
+        name='api_post_detail'
+    ),
+    path(
+        'export/<str:kind>.<str:export_format>',
+        views.export,
+        name='export'
+    ),
 ]
@@ -0,0 +1,66 @@
+import uuid
+
+from django.conf import settings
+from django.db import IntegrityError
+
+from posts.counters import approximate_count
+from posts.models import Post
+from posts.paginators import CountedPaginator, CursorPaginator
+from posts.timelines import TimelineList
+
+
+def paginate(request, post_list, count=None, timeline=None):
+    """Возвращает страницу ленты по параметрам запроса.
+
+    Токены ?after=/?before= (или PAGINATION_MODE = 'cursor') включают
+    постраничный вывод по ключу, иначе используется номер ?page=.
+    Известное заранее число постов count избавляет от COUNT(*), а имя
+    ленты timeline позволяет читать первые страницы из готового списка
+    постов в кэше. С PAGINATION_COUNT = 'approximate' число постов
+    ленты без счётчика берётся приближённо, см. approximate_count.
+    """
+    after = request.GET.get('after')
+    before = request.GET.get('before')
+    if settings.PAGINATION_MODE == 'cursor' or after or before:
+        paginator = CursorPaginator(post_list, settings.PER_PAGE)
+        return paginator.get_page(after=after, before=before)
+    if (
+        count is None and timeline is not None
+        and settings.PAGINATION_COUNT == 'approximate'
+    ):
+        count = approximate_count(timeline, post_list)
+    if timeline is not None and settings.TIMELINE_ENABLED:
+        post_list = TimelineList(
+            timeline, post_list, getattr(request, '_newest_change', None)
+        )
+    paginator = CountedPaginator(post_list, settings.PER_PAGE, count=count)
+    return paginator.get_page(request.GET.get('page'))
+
+
+def parse_idempotency_key(value):
+    """UUID из скрытого поля idempotency_key формы или None."""
+    try:
+        return uuid.UUID(value)
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def save_idempotent(post):
+    """Сохраняет новый пост, если пост с тем же ключом ещё не сохранён.
+
+    Возвращает False для повторной отправки формы. Одновременные
+    запросы с одним ключом останавливает уникальный индекс.
+    """
+    key = post.idempotency_key
+    if key is not None and Post.objects.filter(idempotency_key=key).exists():
+        return False
+    try:
+        post.save()
+    except IntegrityError:
+        if (
+            key is None
+            or not Post.objects.filter(idempotency_key=key).exists()
+        ):
+            raise
+        return False
+    return True
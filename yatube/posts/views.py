@@ -1,16 +1,36 @@
+import logging
+import uuid
+from functools import wraps
+
 from django.shortcuts import redirect, render, get_object_or_404
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
-from posts.models import Post, Group, User
+from django.conf import settings
+from django.http import Http404, HttpResponseBadRequest, StreamingHttpResponse
+from posts import api, conditional, groups
+from posts.conditional import conditional_feed, conditional_post
+from posts.counters import (
+    author_posts_count, group_posts_count, group_posts_counts
+)
+from posts.exporters import (
+    CONTENT_TYPES, EXPORT_FIELDS, ExportError, ExportStats, export_lines,
+    get_queryset
+)
+from posts.models import Post, User
 from posts.forms import PostForm
-from yatube.settings import PER_PAGE
+from posts.page_cache import cache_anonymous_page
+from posts.paginators import CountedPaginator
+from posts.search import SearchResults
+from posts.utils import paginate, parse_idempotency_key, save_idempotent
+
+logger = logging.getLogger(__name__)
 
 
+@conditional_feed(conditional.index_posts, 'index')
+@cache_anonymous_page('index')
 def index(request):
-    post_list = Post.objects.all()
-    paginator = Paginator(post_list, PER_PAGE)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    post_list = Post.objects.feed()
+    page_obj = paginate(request, post_list, timeline='index')
     template = 'posts/index.html'
     title = 'Последние обновления на сайте'
     context = {
@@ -20,13 +40,18 @@ def index(request):
     return render(request, template, context)
 
 
+@conditional_feed(conditional.group_posts, 'group:{slug}')
+@cache_anonymous_page('group:{slug}')
 def group_post(request, slug):
     template = 'posts/group_list.html'
-    group = get_object_or_404(Group, slug=slug)
-    post_list = group.posts.all()
-    paginator = Paginator(post_list, PER_PAGE)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    group = groups.get_by_slug(slug)
+    if group is None:
+        raise Http404('Группа не найдена')
+    post_list = group.posts.feed()
+    page_obj = paginate(
+        request, post_list, count=group_posts_count(group.pk),
+        timeline=f'group:{group.pk}'
+    )
     context = {
         'page_obj': page_obj,
         'group': group
@@ -34,14 +59,19 @@ def group_post(request, slug):
     return render(request, template, context)
 
 
+@conditional_feed(conditional.profile_posts, 'profile:{username}')
+@cache_anonymous_page('profile:{username}')
 def profile(request, username):
     template = 'posts/profile.html'
-    author = get_object_or_404(User, username=username)
-    post_list = author.posts.all()
-    count = post_list.count()
-    paginator = Paginator(post_list, PER_PAGE)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    author = get_object_or_404(
+        User.objects.select_related('stats'),
+        username=username
+    )
+    post_list = author.posts.feed()
+    count = author_posts_count(author)
+    page_obj = paginate(
+        request, post_list, count=count, timeline=f'author:{author.pk}'
+    )
     title = f'Профайл пользователя {author.get_full_name()}'
     context = {
         'title': title,
@@ -52,12 +82,16 @@ def profile(request, username):
     return render(request, template, context)
 
 
+@conditional_post
 def post_detail(request, post_id):
     template = 'posts/post_detail.html'
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_object_or_404(
+        Post.objects.feed().select_related('author__stats'),
+        pk=post_id
+    )
     title = str(post)
     user = post.author
-    count = user.posts.all().count()
+    count = author_posts_count(user)
     context = {
         'title': title,
         'count': count,
@@ -70,41 +104,165 @@ def post_detail(request, post_id):
 @login_required
 def post_edit(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
-    if post.author != request.user:
+    if post.author_id != request.user.pk:
         return redirect('posts:post_detail', post_id)
-    is_edit = True
+    form = PostForm(request.POST or None, instance=post)
+    if form.is_valid():
+        if form.has_changed():
+            # UPDATE только изменённых столбцов, без изменений - без записи
+            form.save(commit=False)
+            post.save(update_fields=[*form.changed_data, 'updated_at'])
+        return redirect('posts:post_detail', post.id)
     template = 'posts/create_post.html'
-    groups = Group.objects.all()
-    form = PostForm(instance=post)
+    is_edit = True
     context = {
         'form': form,
         'is_edit': is_edit,
-        'post_id': post_id,
-        'groups': groups
+        'post_id': post_id
     }
-    if request.method != 'POST':
-        return render(request, template, context)
-    form = PostForm(request.POST, instance=post)
-    if form.is_valid():
-        form.save()
-        return redirect('posts:post_detail', post.id)
+    return render(request, template, context)
 
 
 @login_required
 def post_create(request):
-    template = 'posts/create_post.html'
-    groups = Group.objects.all()
-    form = PostForm()
-    context = {
-        'form': form,
-        'groups': groups
-    }
-    if request.method != 'POST':
-        return render(request, template, context)
-    form = PostForm(request.POST)
+    form = PostForm(request.POST or None)
+    key = parse_idempotency_key(request.POST.get('idempotency_key'))
     if form.is_valid():
         post = form.save(commit=False)
         post.author = request.user
-        post.save()
+        post.idempotency_key = key
+        save_idempotent(post)
         return redirect('posts:profile', request.user.username)
+    template = 'posts/create_post.html'
+    context = {
+        'form': form,
+        'idempotency_key': key or uuid.uuid4()
+    }
+    return render(request, template, context)
+
+
+def group_index(request):
+    template = 'posts/groups.html'
+    title = 'Группы'
+    counts = group_posts_counts()
+    context = {
+        'title': title,
+        # счётчики читаются отдельно: справочник групп общий для потоков
+        'groups': [
+            (group, counts.get(group.pk, 0))
+            for group in groups.get_groups()
+        ]
+    }
     return render(request, template, context)
+
+
+def group_lookup(request):
+    """Подсказки групп по началу названия для GroupAutocomplete."""
+    query = request.GET.get('q', '').strip()
+    try:
+        page = max(int(request.GET.get('page', 1)), 1)
+    except ValueError:
+        page = 1
+    limit = settings.GROUP_LOOKUP_LIMIT
+    found, total = groups.search(query, (page - 1) * limit, limit)
+    return api.json_response({
+        'results': [
+            {'id': group.pk, 'slug': group.slug, 'title': group.title}
+            for group in found
+        ],
+        'next': page + 1 if page * limit < total else None,
+    })
+
+
+def search(request):
+    template = 'posts/search.html'
+    query = request.GET.get('q', '').strip()
+    paginator = CountedPaginator(SearchResults(query), settings.PER_PAGE)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    title = f'Поиск: {query}' if query else 'Поиск'
+    context = {
+        'title': title,
+        'query': query,
+        'page_obj': page_obj
+    }
+    return render(request, template, context)
+
+
+@staff_member_required
+def export(request, kind, export_format):
+    if kind not in EXPORT_FIELDS or export_format not in CONTENT_TYPES:
+        raise Http404
+    try:
+        queryset = get_queryset(
+            kind,
+            author=request.GET.get('author'),
+            group=request.GET.get('group'),
+            since=request.GET.get('since'),
+            until=request.GET.get('until'),
+        )
+    except ExportError as error:
+        return HttpResponseBadRequest(str(error))
+    stats = ExportStats()
+
+    def content():
+        yield from export_lines(kind, export_format, queryset, stats=stats)
+        logger.info('Выгрузка %s: %s', kind, stats)
+
+    response = StreamingHttpResponse(
+        content(), content_type=CONTENT_TYPES[export_format]
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{kind}.{export_format}"'
+    )
+    return response
+
+
+def api_view(view):
+    """Отвечает JSON-ошибкой 400 на некорректные параметры запроса."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view(request, *args, **kwargs)
+        except api.ApiError as error:
+            return api.json_response({'error': str(error)}, 400)
+    return wrapper
+
+
+@conditional_feed(conditional.index_posts, 'index')
+@api_view
+def api_index(request):
+    return api.json_response(api.feed(request, Post.objects.all()))
+
+
+@conditional_feed(conditional.group_posts, 'group:{slug}')
+@api_view
+def api_group(request, slug):
+    found = api.get_group(slug)
+    if found is None:
+        raise Http404('Группа не найдена')
+    pk, group = found
+    data = api.feed(request, Post.objects.filter(group_id=pk))
+    data['group'] = group
+    return api.json_response(data)
+
+
+@conditional_feed(conditional.profile_posts, 'profile:{username}')
+@api_view
+def api_profile(request, username):
+    found = api.get_author(username)
+    if found is None:
+        raise Http404('Автор не найден')
+    pk, author = found
+    data = api.feed(request, Post.objects.filter(author_id=pk))
+    data['author'] = author
+    return api.json_response(data)
+
+
+@conditional_post
+@api_view
+def api_post_detail(request, post_id):
+    fields = api.parse_fields(request.GET.get('fields'))
+    data = api.get_post(post_id, fields)
+    if data is None:
+        raise Http404('Пост не найден')
+    return api.json_response(data)
@@ -0,0 +1,31 @@
+from django import forms
+from django.conf import settings
+from django.urls import reverse
+
+from posts import groups
+
+
+class GroupAutocomplete(forms.Widget):
+    """Поле выбора группы с подсказками вместо списка всех групп.
+
+    id группы хранится в скрытом поле, а название ищется по мере ввода
+    через posts:group_lookup. Страница формы не содержит ни одной
+    группы, кроме уже выбранной.
+    """
+    template_name = 'posts/widgets/group_autocomplete.html'
+
+    class Media:
+        js = ('js/group_autocomplete.js',)
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        try:
+            group = groups.get_by_pk(int(value))
+        except (TypeError, ValueError):
+            group = None
+        context['widget'].update({
+            'title': group.title if group is not None else '',
+            'lookup_url': reverse('posts:group_lookup'),
+            'delay': settings.GROUP_LOOKUP_DELAY,
+        })
+        return context
@@ -0,0 +1,57 @@
+// Подсказки групп для виджета posts.widgets.GroupAutocomplete.
+// Запрос уходит после паузы в наборе, ответы на устаревшие запросы
+// отбрасываются, следующая страница подсказок догружается кнопкой.
+document.addEventListener('DOMContentLoaded', function () {
+  document.querySelectorAll('.group-autocomplete').forEach(function (root) {
+    var hidden = root.querySelector('input[type=hidden]');
+    var input = root.querySelector('input[type=search]');
+    var results = root.querySelector('.group-autocomplete-results');
+    var more = root.querySelector('.group-autocomplete-more');
+    var delay = parseInt(root.dataset.delay, 10);
+    var timer = null;
+    var sequence = 0;
+    var nextPage = null;
+
+    function lookup(page) {
+      var current = ++sequence;
+      var url = root.dataset.lookupUrl + '?q=' +
+        encodeURIComponent(input.value.trim()) + '&page=' + page;
+      fetch(url, {headers: {Accept: 'application/json'}})
+        .then(function (response) { return response.json(); })
+        .then(function (data) {
+          if (current !== sequence) {
+            return;
+          }
+          if (page === 1) {
+            results.innerHTML = '';
+          }
+          data.results.forEach(function (group) {
+            var item = document.createElement('button');
+            item.type = 'button';
+            item.className = 'list-group-item list-group-item-action';
+            item.textContent = group.title;
+            item.addEventListener('click', function () {
+              hidden.value = group.id;
+              input.value = group.title;
+              results.innerHTML = '';
+              more.hidden = true;
+            });
+            results.appendChild(item);
+          });
+          nextPage = data.next;
+          more.hidden = nextPage === null;
+        });
+    }
+
+    input.addEventListener('input', function () {
+      hidden.value = '';
+      clearTimeout(timer);
+      timer = setTimeout(function () { lookup(1); }, delay);
+    });
+    more.addEventListener('click', function () {
+      if (nextPage !== null) {
+        lookup(nextPage);
+      }
+    });
+  });
+});
@@ -0,0 +1,21 @@
+"""
+ASGI config for yatube project.
+
+It exposes the ASGI callable as a module-level variable named
+``application``. Django 2.2 has no ASGI support of its own, so views run
+through the WSGI handler in a bounded thread pool, see core.asgi.
+"""
+
+import os
+
+from django.conf import settings
+
+from core.asgi import get_asgi_application
+from core.warmup import warm_up
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+
+application = get_asgi_application()
+
+if settings.TEMPLATE_WARMUP:
+    warm_up()
@@ -39,6 +39,13 @@ LOGIN_REDIRECT_URL = 'posts:index'
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 PER_PAGE = 10  # количестов постов на странице
+# 'pages' - номера страниц, 'cursor' - токены ?after=/?before=
+PAGINATION_MODE = 'pages'
+# 'exact' - COUNT(*) для лент без счётчика, 'approximate' - число из кэша
+# или статистики БД (для лент в сотни тысяч постов)
+PAGINATION_COUNT = 'exact'
+APPROXIMATE_COUNT_TIMEOUT = 60
+APPROXIMATE_COUNT_MIN_ROWS = 100000
 INSTALLED_APPS = [
     'about.apps.AboutConfig',
     'posts.apps.PostsConfig',
@@ -50,10 +57,16 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.forms',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.RequestMetricsMiddleware',
+    'core.middleware.QueryLogMiddleware',
+    'core.routing.ReplicaRoutingMiddleware',
+    'core.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'django.middleware.http.ConditionalGetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -64,13 +77,23 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'yatube.urls'
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+# загрузчики убирают отступы из исходников шаблонов; профиль
+# yatube.settings_production оборачивает их кэширующим загрузчиком
+TEMPLATE_LOADERS = [
+    'core.template_loaders.FilesystemLoader',
+    'core.template_loaders.AppDirectoriesLoader',
+]
+# компилировать шаблоны TEMPLATES_DIR при старте yatube.wsgi и yatube.asgi
+TEMPLATE_WARMUP = False
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates, который замеряет время отрисовки для метрик
+        'BACKEND': 'core.template_backends.InstrumentedDjangoTemplates',
+        'NAME': 'django',
         'DIRS': [TEMPLATES_DIR],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': TEMPLATE_LOADERS,
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -81,19 +104,204 @@ TEMPLATES = [
         },
     },
 ]
+# виджеты форм ищут шаблоны через TEMPLATES, как и страницы
+FORM_RENDERER = 'django.forms.renderers.TemplatesSetting'
 
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 WSGI_APPLICATION = 'yatube.wsgi.application'
+# размер пула потоков, в котором yatube.asgi выполняет представления
+ASGI_THREADS = int(os.environ.get('ASGI_THREADS', 8))
 
 
 # Database
 # https://docs.djangoproject.com/en/2.2/ref/settings/#databases
 
+# бэкенд БД задаётся переменной окружения DATABASE_BACKEND
+DATABASE_BACKENDS = {
+    'sqlite': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get(
+            'DATABASE_NAME', os.path.join(BASE_DIR, 'db.sqlite3')
+        ),
+        'CONN_MAX_AGE': int(os.environ.get('DATABASE_CONN_MAX_AGE', 60)),
+    },
+    # требует пакет psycopg2; постоянные соединения живут по одному
+    # на поток воркера, общий пул даёт PgBouncer перед сервером
+    'postgresql': {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.environ.get('DATABASE_NAME', 'yatube'),
+        'USER': os.environ.get('DATABASE_USER', 'yatube'),
+        'PASSWORD': os.environ.get('DATABASE_PASSWORD', ''),
+        'HOST': os.environ.get('DATABASE_HOST', '127.0.0.1'),
+        'PORT': os.environ.get('DATABASE_PORT', '5432'),
+        'CONN_MAX_AGE': int(os.environ.get('DATABASE_CONN_MAX_AGE', 600)),
+        # PgBouncer в режиме transaction не поддерживает серверные курсоры
+        'DISABLE_SERVER_SIDE_CURSORS': (
+            os.environ.get('DATABASE_POOLER') == 'pgbouncer'
+        ),
+        'OPTIONS': {
+            'connect_timeout': 5,
+        },
+    },
+}
 DATABASES = {
+    'default': DATABASE_BACKENDS[os.environ.get('DATABASE_BACKEND', 'sqlite')],
+}
+# реплики для чтения: через запятую пути к файлам SQLite или хосты PostgreSQL
+DATABASE_REPLICAS = []
+for number, replica in enumerate(
+    filter(None, os.environ.get('DATABASE_REPLICAS', '').split(',')), 1
+):
+    DATABASES[f'replica_{number}'] = dict(
+        DATABASES['default'],
+        **{'NAME' if 'sqlite' in DATABASES['default']['ENGINE'] else 'HOST':
+           replica},
+        TEST={'MIRROR': 'default'},
+    )
+    DATABASE_REPLICAS.append(f'replica_{number}')
+DATABASE_ROUTERS = ['core.routing.ReplicaRouter']
+# выбор реплики: round_robin или least_loaded (меньше всего запросов в работе)
+REPLICA_SELECTION = os.environ.get('REPLICA_SELECTION', 'round_robin')
+# представления только для чтения, которые читают с реплик
+REPLICA_VIEWS = (
+    'posts:index',
+    'posts:group_list',
+    'posts:group_index',
+    'posts:profile',
+    'posts:post_detail',
+    'posts:api_index',
+    'posts:api_group',
+    'posts:api_profile',
+    'posts:api_post_detail',
+    'about:author',
+    'about:tech',
+)
+# приложения, модели которых читаются с реплик; сессии всегда с основной
+REPLICA_APPS = ('posts', 'auth')
+# сколько секунд после записи клиент читает с основной базы
+REPLICA_STICKY_SECONDS = 10
+# применяются к каждому новому соединению SQLite
+SQLITE_PRAGMAS = {
+    # читатели не блокируют писателя и наоборот
+    'journal_mode': 'WAL',
+    # в режиме WAL fsync нужен только при контрольной точке
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    # писатель ждёт освобождения блокировки вместо ошибки database is locked
+    'busy_timeout': 20000,
+}
+
+
+# бэкенд кэша страниц лент задаётся переменной окружения PAGE_CACHE_BACKEND
+PAGE_CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'pages',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get(
+            'PAGE_CACHE_LOCATION', os.path.join(BASE_DIR, 'cache', 'pages')
+        ),
+    },
+    # требует пакет django-redis и локальный Redis (или совместимый сервер)
+    'redis': {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': os.environ.get(
+            'PAGE_CACHE_LOCATION', 'redis://127.0.0.1:6379/1'
+        ),
+    },
+}
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
-    }
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'pages': PAGE_CACHE_BACKENDS[os.environ.get('PAGE_CACHE_BACKEND', 'locmem')],
+}
+PAGE_CACHE_ENABLED = True
+PAGE_CACHE_ALIAS = 'pages'
+PAGE_CACHE_TIMEOUT = 60 * 5
+# версия кэша карточек постов: увеличить при смене их разметки;
+# ключ карточки включает время изменения поста
+POST_CARD_VERSION = 1
+POST_CARD_TIMEOUT = 60 * 60 * 24
+# готовые списки первых постов лент, обновляемые при записи
+TIMELINE_ENABLED = True
+TIMELINE_CACHE_ALIAS = 'pages'
+TIMELINE_LENGTH = 200
+# срок жизни списка: с кэшем одного процесса (locmem) на столько могут
+# отставать списки других процессов
+TIMELINE_TIMEOUT = 60
+# общий кэш, в котором хранится версия справочника групп
+GROUP_CACHE_ALIAS = 'pages'
+# срок жизни версии справочника: с кэшем одного процесса (locmem) на
+# столько могут отставать справочники других процессов
+GROUP_DIRECTORY_TIMEOUT = 60
+# подсказки групп в форме поста: размер страницы и пауза в наборе, мс
+GROUP_LOOKUP_LIMIT = 20
+GROUP_LOOKUP_DELAY = 250
+
+# фоновые задачи core.tasks: 'eager' - сразу в запросе, 'thread' - в потоке
+# веб-процесса, 'worker' - в процессах manage.py run_tasks
+TASKS_MODE = os.environ.get('TASKS_MODE', 'eager')
+TASKS_BATCH = 100
+TASKS_MAX_ATTEMPTS = 5
+# пауза перед повтором, секунд; удваивается с каждой попыткой
+TASKS_RETRY_DELAY = 2
+# сколько секунд задача занята воркером, прежде чем её возьмёт другой
+TASKS_LEASE = 60
+TASKS_POLL_INTERVAL = 1
+
+
+# сжатие ответов: gzip, а при установленных пакетах brotli и zstandard
+# также brotli и zstd; тела короче COMPRESS_MIN_LENGTH байт не сжимаются
+COMPRESS_MIN_LENGTH = 200
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+ZSTD_LEVEL = 3
+
+
+# бэкенд поиска: fts5 (SQLite FTS5), inverted (таблица PostTerm) или auto;
+# после смены бэкенда или первого migrate с постами выполнить
+# manage.py rebuild_search_index
+SEARCH_BACKEND = 'auto'
+
+
+# доля запросов, для которых считаются запросы к БД и время шаблонов
+METRICS_SAMPLE_RATE = float(os.environ.get('METRICS_SAMPLE_RATE', 0.1))
+# адреса, которым открыт /metrics
+METRICS_ALLOWED_IPS = ('127.0.0.1', '::1')
+
+
+# журнал медленных и повторяющихся запросов, включается явно
+QUERY_LOG_ENABLED = os.environ.get('QUERY_LOG_ENABLED') == '1'
+QUERY_LOG_SLOW_MS = 100
+QUERY_LOG_DUPLICATES = 3
+QUERY_LOG_FILE = os.path.join(BASE_DIR, 'logs', 'queries.log')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json': {'()': 'core.query_log.JsonFormatter'},
+    },
+    'handlers': {
+        'query_log': {
+            'class': 'core.query_log.RotatingFileHandler',
+            'filename': QUERY_LOG_FILE,
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 5,
+            'delay': True,
+            'formatter': 'json',
+        },
+    },
+    'loggers': {
+        'yatube.queries': {
+            'handlers': ['query_log'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
 }
 
 
@@ -0,0 +1,31 @@
+"""
+Production settings for yatube project.
+
+Usage: DJANGO_SETTINGS_MODULE=yatube.settings_production. SECRET_KEY is
+required in the environment, ALLOWED_HOSTS is an optional comma
+separated list.
+"""
+
+import copy
+import os
+
+from yatube.settings import *  # noqa: F401,F403
+from yatube.settings import ALLOWED_HOSTS, TEMPLATE_LOADERS, TEMPLATES
+
+DEBUG = False
+
+SECRET_KEY = os.environ['SECRET_KEY']
+
+ALLOWED_HOSTS = os.environ.get(
+    'ALLOWED_HOSTS', ','.join(ALLOWED_HOSTS)
+).split(',')
+
+# шаблоны компилируются один раз на процесс и при старте
+TEMPLATES = copy.deepcopy(TEMPLATES)
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS),
+]
+TEMPLATE_WARMUP = os.environ.get('TEMPLATE_WARMUP', '1') == '1'
+
+# побочная работа записи постов не задерживает ответ
+TASKS_MODE = os.environ.get('TASKS_MODE', 'thread')